@@ -0,0 +1,46 @@
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+# Created: 2026/10/17
+# Last modified: 2026/10/17
+
+# Load a PDB topology and a DCD trajectory, write each selected frame as OUTPUT_PREFIX_XXXXX.xyz, and unload them
+# 'outputs' is a list of pairs: {frame indexes} output_prefix
+proc extract_frames {topology_file trajectory_file outputs} {
+    set molid [mol new $topology_file waitfor all]
+    animate delete all $molid
+    mol addfile $trajectory_file type dcd first 0 last -1 step 1 waitfor all $molid
+    set frame_count [molinfo $molid get numframes]
+    set written_count 0
+    foreach {frames output_prefix} $outputs {
+        foreach frame $frames {
+            if {$frame >= $frame_count} {
+                error "frame $frame out of range ($frame_count frames)"
+            }
+            set j [format "%05d" $frame]
+            animate write xyz ${output_prefix}_$j.xyz beg $frame end $frame skip 0 waitfor all $molid
+            incr written_count
+        }
+    }
+    mol delete $molid
+    return [list $frame_count $written_count]
+}
+
+# One line per trajectory in the results file: JOB_INDEX OK FRAME_COUNT WRITTEN_COUNT, or JOB_INDEX ERROR MESSAGE
+proc run_job {results_file job_index topology_file trajectory_file outputs} {
+    if {[catch {extract_frames $topology_file $trajectory_file $outputs} result]} {
+        catch {mol delete all}
+        puts $results_file "$job_index ERROR [string map {"\n" " "} $result]"
+    } else {
+        puts $results_file "$job_index OK $result"
+    }
+    flush $results_file
+}
+
+set results_file [open {_R_RESULTS_FILE_} w]
+_R_JOBS_
+close $results_file
+quit
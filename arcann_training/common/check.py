@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 
 This module contains functions for checking the availability of certain commands on the system, as well as a function for validating the current working directory during the execution of a specific step.
 
@@ -18,6 +18,10 @@ check_vmd(vmd_path: str = None) -> str
     Check if the VMD command is available on the system.
 validate_step_folder(step_name: str) -> None
     Check if the current directory matches the expected directory for the given step.
+check_dcd_is_valid(dcd_path: Path, full_scan: bool = False) -> bool
+    Check if the dcd file is valid.
+check_nc_is_valid(nc_path: Path) -> bool
+    Check if the nc file is valid.
 """
 
 # TODO: Homogenize the docstrings for this module
@@ -25,13 +29,16 @@ validate_step_folder(step_name: str) -> None
 # Standard library modules
 import logging
 import os
-import re
-import subprocess
 import shutil
 from pathlib import Path
 
+# Third-party modules
+import numpy as np
+
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
+from arcann_training.common.dcd import check_dcd_records, read_dcd_header
+from arcann_training.common.netcdf import read_netcdf_header
 
 
 # Unittested
@@ -180,87 +187,86 @@ def validate_step_folder(step_name: str) -> None:
         raise ValueError(error_msg)
 
 
-# TODO: Add tests for this function
+# Unittested
 @catch_errors_decorator
-def check_dcd_is_valid(dcd_path: Path, vmd_bin: Path) -> bool:
+def check_dcd_is_valid(dcd_path: Path, full_scan: bool = False) -> bool:
     """
     Check if the dcd file is valid.
 
+    The check only reads the header: the file must be a DCD file with at least one frame, its size must be a whole number
+    of frames, and the number of frames stored in the header (if not zero) must match it. With 'full_scan', the record
+    markers of every frame are also checked.
+
+    Parameters
+    ----------
+    dcd_path : Path
+        The path to the dcd file.
+    full_scan : bool, optional
+        If True, also check the record markers of every frame (reads the whole file). Default is False.
+
     Returns
     -------
     bool
         True if the dcd file is valid, False otherwise.
     """
-    vmd_script = f"""
-    # Load your trajectory file
-    mol addfile {dcd_path} type dcd waitfor all
-
-    # Get the number of frames
-    set numFrames [molinfo top get numframes]
+    try:
+        header = read_dcd_header(dcd_path)
+    except (FileNotFoundError, ValueError):
+        return False
+    if header["frame_count"] == 0 or header["atom_count"] <= 0:
+        return False
+    if (header["file_size"] - header["header_size"]) % header["frame_size"] != 0:
+        return False
+    if header["stored_frame_count"] not in [0, header["frame_count"]]:
+        return False
 
-    # Output the number of frames
-    puts "Number of frames: $numFrames"
+    if full_scan:
+        frames = np.memmap(
+            dcd_path,
+            dtype=header["frame_dtype"],
+            mode="r",
+            offset=header["header_size"],
+            shape=(header["frame_count"],),
+        )
+        try:
+            # By blocks of ~64 MB, so the memory used does not depend on the length of the trajectory
+            block_size = max(1, 2**26 // header["frame_size"])
+            for block_start in range(0, header["frame_count"], block_size):
+                if not np.all(
+                    check_dcd_records(frames[block_start : block_start + block_size])
+                ):
+                    return False
+        finally:
+            del frames
 
-    # Quit VMD
-    quit
-    """
-    # Run VMD script from command line
-    result = subprocess.run(
-        [vmd_bin, "-dispdev", "text", "-e", "/dev/stdin"],
-        input=vmd_script,
-        text=True,
-        capture_output=True,
-    )
-
-    # Check if the output contains "Unable to load file "
-    if "Unable to load file " in result.stdout:
-        return False
-    else:
-        match = re.search(r"Number of frames: (\d+)", result.stdout)
-        if match:
-            return True
-        else:
-            return False
+    return True
 
 
-# TODO: Add tests for this function
+# Unittested
 @catch_errors_decorator
-def check_nc_is_valid(nc_path: Path, vmd_bin: Path) -> bool:
+def check_nc_is_valid(nc_path: Path) -> bool:
     """
     Check if the nc file is valid.
 
+    The check only reads the header: the file must be a NetCDF file with at least one record (frame), and it must be at
+    least as large as the data described by its header. A NetCDF-4 (HDF5) file is only checked by its signature.
+
+    Parameters
+    ----------
+    nc_path : Path
+        The path to the nc file.
+
     Returns
     -------
     bool
         True if the nc file is valid, False otherwise.
     """
-    vmd_script = f"""
-    # Load your trajectory file
-    mol addfile {nc_path} type netcdf waitfor all
-
-    # Get the number of frames
-    set numFrames [molinfo top get numframes]
-
-    # Output the number of frames
-    puts "Number of frames: $numFrames"
-
-    # Quit VMD
-    quit
-    """
-    # Run VMD script from command line
-    result = subprocess.run(
-        [vmd_bin, "-dispdev", "text", "-e", "/dev/stdin"],
-        input=vmd_script,
-        text=True,
-        capture_output=True,
-    )
-
-    # Check if the output contains "Unable to load file "
-    if "Unable to load file " in result.stdout:
+    try:
+        header = read_netcdf_header(nc_path)
+    except (FileNotFoundError, ValueError, IndexError):
         return False
-    else:
-        match = re.search(r"Number of frames: (\d+)", result.stdout)
-        if match:
-            return True
-        else:
-            return False
+    if header["format"] == "hdf5":
+        return True
+    if header["record_count"] == 0:
+        return False
+    return header["file_size"] >= header["expected_size"]
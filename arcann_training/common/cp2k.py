@@ -0,0 +1,351 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The cp2k module provides functions to read the outputs of CP2K labeling calculations (each file is read once, as bytes).
+
+Functions
+---------
+read_cp2k_energy(energy_file: Path, tail_size: int = 4096) -> float
+    Read the last energy written in a CP2K FORCE_EVAL energy file (from its end).
+read_cp2k_forces(forces_file: Path, version: float) -> np.ndarray
+    Read the atomic forces written in a CP2K forces file.
+read_cp2k_stress_tensor(stress_file: Path, version: float) -> Union[np.ndarray, None]
+    Read the stress tensor written in a CP2K stress tensor file.
+read_cp2k_input_cell(input_lines: List[str]) -> Tuple[List[float], bool]
+    Read the cell lengths and the periodicity of a CP2K input, in a single pass.
+read_cp2k_input_abc(input_file: Path) -> List[float]
+    Read only the cell lengths of a CP2K input (its first 'ABC' line).
+read_cp2k_labeling_step(labeling_step_path: Path, atom_count: int, version: float, is_periodic: bool = None) -> Dict
+    Read all the CP2K outputs of a labeling step (energy, forces, cell, stress tensor and Wannier centers).
+"""
+
+# Standard library modules
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+# The patterns are compiled once, at import
+ENERGY_PATTERN = re.compile(rb"ENERGY\|.*?([-+]?\d*\.\d+(?:[eE][-+]?\d+)?)")
+# The stress tensor layouts: CP2K 6 to 8 (excluded) and CP2K 8 to 2024 (excluded)
+STRESS_HEADER_PATTERN_V6 = re.compile(rb"^.*\bX\b.*\bY\b.*\bZ\b.*$", re.MULTILINE)
+STRESS_ROW_PATTERNS_V6 = [
+    re.compile(axis + rb"\s*(-?\d+\.\d+)\s*(-?\d+\.\d+)\s*(-?\d+\.\d+)")
+    for axis in [b"X", b"Y", b"Z"]
+]
+STRESS_HEADER_PATTERN_V8 = re.compile(rb"^.*\bx\b.*\by\b.*\bz\b.*$", re.MULTILINE)
+STRESS_ROW_PATTERNS_V8 = [
+    re.compile(
+        axis + rb"\s+(-?\d+\.\d+E[+-]\d+)\s+(-?\d+\.\d+E[+-]\d+)\s+(-?\d+\.\d+E[+-]\d+)"
+    )
+    for axis in [b"x", b"y", b"z"]
+]
+ABC_PATTERN = re.compile(r"\d+\.\d+")
+ABC_BYTES_PATTERN = re.compile(rb"\d+\.\d+")
+PERIODIC_PATTERN = re.compile(r"PERIODIC\s+(\S+)")
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_energy(energy_file: Path, tail_size: int = 4096) -> float:
+    """
+    Read the last energy written in a CP2K FORCE_EVAL energy file (from its end).
+
+    Only the last 'tail_size' bytes are read, unless they hold no energy line.
+
+    Parameters
+    ----------
+    energy_file : Path
+        The path to the energy file ('-Force_Eval.fe').
+    tail_size : int, optional
+        The number of bytes read from the end of the file. Defaults to 4096.
+
+    Returns
+    -------
+    float
+        The energy (in Hartree).
+
+    Raises
+    ------
+    ValueError
+        If the file holds no energy line.
+    """
+    with Path(energy_file).open("rb") as file:
+        file.seek(0, 2)
+        file_size = file.tell()
+        file.seek(max(0, file_size - tail_size))
+        data = file.read()
+        # The tail may start in the middle of a line: only complete lines are searched
+        if file_size > tail_size:
+            data = data[data.find(b"\n") + 1 :]
+        matches = ENERGY_PATTERN.findall(data)
+        if not matches and file_size > tail_size:
+            file.seek(0)
+            matches = ENERGY_PATTERN.findall(file.read())
+    if not matches:
+        error_msg = f"No energy found in '{energy_file}'."
+        raise ValueError(error_msg)
+    return float(matches[-1])
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_forces(forces_file: Path, version: float) -> np.ndarray:
+    """
+    Read the atomic forces written in a CP2K forces file.
+
+    The block of forces (without its header and footer lines, which depend on the version) is converted at once.
+
+    Parameters
+    ----------
+    forces_file : Path
+        The path to the forces file ('-Forces.for').
+    version : float
+        The version of CP2K.
+
+    Returns
+    -------
+    np.ndarray
+        The forces (in Hartree/Bohr), with shape (atom count, 3).
+    """
+    lines = Path(forces_file).read_bytes().splitlines()
+    # The columns before the forces: 'Atom Kind Element' (or 'Atom Kind' and a norm column after, from 2025.1)
+    if version >= 2025.1:
+        lines, first_column, last_column = lines[3:-2], 2, -1
+    else:
+        lines, first_column, last_column = lines[4:-1], 3, None
+    column_count = len(lines[0].split())
+    return np.loadtxt(
+        lines,
+        dtype=np.float64,
+        usecols=range(first_column, column_count + (last_column or 0)),
+        ndmin=2,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_stress_tensor(
+    stress_file: Path, version: float
+) -> Union[np.ndarray, None]:
+    """
+    Read the stress tensor written in a CP2K stress tensor file.
+
+    Parameters
+    ----------
+    stress_file : Path
+        The path to the stress tensor file ('-Stress_Tensor.st').
+    version : float
+        The version of CP2K (from 6 to 2024, excluded).
+
+    Returns
+    -------
+    Union[np.ndarray, None]
+        The stress tensor (in GPa), with shape (3, 3), or None if it was not found or if the version is not supported.
+    """
+    if 8 > version >= 6:
+        header_pattern, row_patterns = STRESS_HEADER_PATTERN_V6, STRESS_ROW_PATTERNS_V6
+    elif 2024 > version >= 8:
+        header_pattern, row_patterns = STRESS_HEADER_PATTERN_V8, STRESS_ROW_PATTERNS_V8
+    else:
+        logging.getLogger("ArcaNN").info(
+            f"This version of CP2K is not supported for tensor: {version}"
+        )
+        return None
+
+    data = Path(stress_file).read_bytes()
+    header = header_pattern.search(data)
+    if header is None:
+        return None
+    rows = data[header.end() + 1 :].splitlines()[:3]
+    return np.array(
+        [pattern.findall(row)[0] for pattern, row in zip(row_patterns, rows)],
+        dtype=np.float64,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_input_cell(input_lines: List[str]) -> Tuple[List[float], bool]:
+    """
+    Read the cell lengths and the periodicity of a CP2K input, in a single pass.
+
+    The cell lengths are read on the first 'ABC' line. The periodicity is read in the '&POISSON' and '&CELL' sections
+    (the first 'PERIODIC' keyword of each): the system is periodic unless it is 'NONE'.
+
+    Parameters
+    ----------
+    input_lines : List[str]
+        The lines of the CP2K input.
+
+    Returns
+    -------
+    Tuple[List[float], bool]
+        The cell lengths (ABC) and True if the system is periodic.
+
+    Raises
+    ------
+    ValueError
+        If the input has no 'ABC' line, or if the periodicity of the '&POISSON' and '&CELL' sections do not match.
+    """
+    cell = None
+    periodic = {"&POISSON": None, "&CELL": None}
+    section = None
+    for line in input_lines:
+        if cell is None and "ABC" in line:
+            cell = [float(_) for _ in ABC_PATTERN.findall(line)]
+        for section_start in periodic:
+            if section_start in line:
+                section = section_start
+        if "&END" in line and section is not None:
+            section = None
+        if section is not None and periodic[section] is None and "PERIODIC" in line:
+            match = PERIODIC_PATTERN.search(line)
+            if match:
+                periodic[section] = match.group(1).strip().upper()
+    if cell is None:
+        error_msg = f"No 'ABC' line found in the CP2K input."
+        raise ValueError(error_msg)
+
+    periodic_poisson, periodic_cell = periodic["&POISSON"], periodic["&CELL"]
+    if periodic_poisson and periodic_cell and periodic_poisson != periodic_cell:
+        error_msg = f"The periodicity in the cell and poisson sections do not match."
+        raise ValueError(error_msg)
+    periodicity = periodic_poisson or periodic_cell
+    return cell, periodicity != "NONE"
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_input_abc(input_file: Path) -> List[float]:
+    """
+    Read only the cell lengths of a CP2K input (its first 'ABC' line).
+
+    The inputs of the labeling steps of a system only differ by their cell lengths, so the rest of the input (the
+    periodicity) can be read once per system with 'read_cp2k_input_cell'.
+
+    Parameters
+    ----------
+    input_file : Path
+        The path to the CP2K input.
+
+    Returns
+    -------
+    List[float]
+        The cell lengths (ABC).
+
+    Raises
+    ------
+    ValueError
+        If the input has no 'ABC' line.
+    """
+    data = Path(input_file).read_bytes()
+    abc_index = data.find(b"ABC")
+    if abc_index == -1:
+        error_msg = f"No 'ABC' line found in '{input_file}'."
+        raise ValueError(error_msg)
+    line_end = data.find(b"\n", abc_index)
+    line = data[
+        data.rfind(b"\n", 0, abc_index) + 1 : None if line_end == -1 else line_end
+    ]
+    return [float(_) for _ in ABC_BYTES_PATTERN.findall(line)]
+
+
+# Unittested
+@catch_errors_decorator
+def read_cp2k_labeling_step(
+    labeling_step_path: Path,
+    atom_count: int,
+    version: float,
+    is_periodic: bool = None,
+) -> Dict:
+    """
+    Read all the CP2K outputs of a labeling step (energy, forces, cell, stress tensor and Wannier centers).
+
+    The files are named after the labeling step folder ('XXXXX'): '1_labeling_XXXXX.inp',
+    '2_labeling_XXXXX-Force_Eval.fe', '2_labeling_XXXXX-Forces.for' and, if present,
+    '2_labeling_XXXXX-Stress_Tensor.st' and '2_labeling_XXXXX-Wannier.xyz' (with '2_labeling_XXXXX.out').
+
+    Parameters
+    ----------
+    labeling_step_path : Path
+        The path to the labeling step folder.
+    atom_count : int
+        The number of atoms (the Wannier centers follow the atoms).
+    version : float
+        The version of CP2K.
+    is_periodic : bool, optional
+        The periodicity of the system, if already known: only the cell lengths are then read from the input. Defaults
+        to None (the whole input is read).
+
+    Returns
+    -------
+    Dict
+        - energy: The energy (Hartree).
+        - forces: The forces (Hartree/Bohr), with shape (atom count, 3).
+        - cell: The cell lengths (ABC).
+        - is_periodic: True if the system is periodic.
+        - is_stress_tensor_file: True if the stress tensor file is present.
+        - stress_tensor: The stress tensor (GPa), None if not read.
+        - wannier: The Wannier centers, with shape (center count, 3), None if the Wannier file is not present.
+        - is_wannier_not_converged: True if the localization of the Wannier centers did not converge.
+    """
+    labeling_step_path = Path(labeling_step_path)
+    padded_labeling_step = labeling_step_path.name
+    input_file = labeling_step_path / f"1_labeling_{padded_labeling_step}.inp"
+    if is_periodic is None:
+        cell, is_periodic = read_cp2k_input_cell(input_file.read_text().splitlines())
+    else:
+        cell = read_cp2k_input_abc(input_file)
+    step = {
+        "energy": read_cp2k_energy(
+            labeling_step_path / f"2_labeling_{padded_labeling_step}-Force_Eval.fe"
+        ),
+        "forces": read_cp2k_forces(
+            labeling_step_path / f"2_labeling_{padded_labeling_step}-Forces.for",
+            version,
+        ),
+        "cell": cell,
+        "is_periodic": is_periodic,
+        "is_stress_tensor_file": False,
+        "stress_tensor": None,
+        "wannier": None,
+        "is_wannier_not_converged": False,
+    }
+
+    stress_file = (
+        labeling_step_path / f"2_labeling_{padded_labeling_step}-Stress_Tensor.st"
+    )
+    if stress_file.is_file():
+        step["is_stress_tensor_file"] = True
+        step["stress_tensor"] = read_cp2k_stress_tensor(stress_file, version)
+
+    wannier_file = labeling_step_path / f"2_labeling_{padded_labeling_step}-Wannier.xyz"
+    if wannier_file.is_file():
+        lines = wannier_file.read_bytes().splitlines()[2 + atom_count :]
+        step["wannier"] = np.loadtxt(
+            lines,
+            dtype=np.float64,
+            usecols=range(1, len(lines[0].split())),
+            ndmin=2,
+        )
+        step["is_wannier_not_converged"] = (
+            b"LOCALIZATION! loop did not converge within the maximum number of iterations"
+            in (
+                labeling_step_path / f"2_labeling_{padded_labeling_step}.out"
+            ).read_bytes()
+        )
+    return step
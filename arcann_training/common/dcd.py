@@ -0,0 +1,273 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The dcd module provides functions to read DCD trajectories (CHARMM/LAMMPS binary format) and their PDB topology.
+
+Functions
+---------
+read_dcd_header(file_path: Path) -> Dict[str, Union[int, bool, str, np.dtype]]
+    Read the header of a DCD file and return the layout of its frame records.
+read_dcd_frames(file_path: Path, frame_indexes: Union[List[int], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]
+    Read a set of frames (coordinates and unit cells) of a DCD file.
+check_dcd_records(frames: np.ndarray) -> np.ndarray
+    Check the record markers of DCD frames.
+read_pdb_atomic_symbols(file_path: Path) -> np.ndarray
+    Read the atomic symbols of a PDB file.
+"""
+
+# Standard library modules
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+
+# Unittested
+@catch_errors_decorator
+def read_dcd_header(file_path: Path) -> Dict[str, Union[int, bool, str, np.dtype]]:
+    """
+    Read the header of a DCD file and return the layout of its frame records.
+
+    The header is made of three Fortran records (the 'CORD' control block, the titles and the number of atoms). Each frame
+    is a record with the unit cell (if present) followed by one record for each of the X, Y and Z coordinates (float32).
+    The byte order is detected from the first record marker. The number of frames is computed from the size of the file
+    (a truncated last frame is ignored), as the frame count stored in the header is not updated by all codes.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the DCD file.
+
+    Returns
+    -------
+    Dict[str, Union[int, bool, str, np.dtype]]
+        The byte order ('<' or '>'), the number of atoms, the number of complete frames and the one stored in the header,
+        the unit cell and fourth dimension flags, the sizes (in bytes) of the header, of a frame and of the file, and the
+        structured dtype of a frame record.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the file is not a DCD file, or if it has fixed atoms (not supported).
+    """
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        error_msg = f"File not found: '{file_path}'."
+        raise FileNotFoundError(error_msg)
+
+    with file_path.open("rb") as file:
+        control_record = file.read(92)
+        if len(control_record) < 92 or control_record[4:8] != b"CORD":
+            error_msg = f"'{file_path}' is not a DCD file."
+            raise ValueError(error_msg)
+        for byteorder in ["<", ">"]:
+            if np.frombuffer(control_record, dtype=f"{byteorder}i4", count=1)[0] == 84:
+                break
+        else:
+            error_msg = f"'{file_path}' is not a DCD file (unexpected record marker)."
+            raise ValueError(error_msg)
+        control = np.frombuffer(
+            control_record, dtype=f"{byteorder}i4", count=20, offset=8
+        )
+        title_size = int(np.frombuffer(file.read(4), dtype=f"{byteorder}i4")[0])
+        file.seek(title_size + 4, 1)
+        atoms_record = np.frombuffer(file.read(12), dtype=f"{byteorder}i4")
+        header_size = file.tell()
+
+    if len(atoms_record) != 3 or atoms_record[0] != 4:
+        error_msg = f"'{file_path}' is not a DCD file (invalid number of atoms record)."
+        raise ValueError(error_msg)
+    if control[8] != 0:
+        error_msg = f"'{file_path}' has fixed atoms, which is not supported."
+        raise ValueError(error_msg)
+
+    # The unit cell and fourth dimension flags only exist in the CHARMM flavour (non-zero version)
+    is_charmm = control[19] != 0
+    atom_count = int(atoms_record[1])
+    has_unit_cell = bool(is_charmm and control[10] != 0)
+    has_fourth_dimension = bool(is_charmm and control[11] != 0)
+
+    # Each frame record (unit cell, then X, Y, Z and W) is framed by two markers holding its size
+    frame_fields = []
+    if has_unit_cell:
+        frame_fields += [
+            ("cell_start", f"{byteorder}i4"),
+            ("cell", f"{byteorder}f8", (6,)),
+            ("cell_end", f"{byteorder}i4"),
+        ]
+    for axis in ["x", "y", "z", "w"][: 3 + has_fourth_dimension]:
+        frame_fields += [
+            (f"{axis}_start", f"{byteorder}i4"),
+            (axis, f"{byteorder}f4", (atom_count,)),
+            (f"{axis}_end", f"{byteorder}i4"),
+        ]
+    frame_dtype = np.dtype(frame_fields)
+    file_size = file_path.stat().st_size
+    return {
+        "byteorder": byteorder,
+        "atom_count": atom_count,
+        "frame_count": (file_size - header_size) // frame_dtype.itemsize,
+        "stored_frame_count": int(control[0]),
+        "has_unit_cell": has_unit_cell,
+        "has_fourth_dimension": has_fourth_dimension,
+        "header_size": header_size,
+        "frame_size": frame_dtype.itemsize,
+        "frame_dtype": frame_dtype,
+        "file_size": file_size,
+    }
+
+
+# Unittested
+@catch_errors_decorator
+def read_dcd_frames(
+    file_path: Path, frame_indexes: Union[List[int], np.ndarray]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Read a set of frames (coordinates and unit cells) of a DCD file.
+
+    The frame records are mapped in memory (as a structured array), so only the selected frames are read from the disk.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the DCD file.
+    frame_indexes : Union[List[int], np.ndarray]
+        The indexes of the frames to read (the first frame of the file is 0), in any order.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The atomic coordinates (float64, shape (len(frame_indexes), atom_count, 3)) and the unit cells as stored in the
+        file (float64, shape (len(frame_indexes), 6), [A, gamma, B, beta, alpha, C], empty rows if the file has none).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the file is not a DCD file, or if a selected frame record is corrupted.
+    IndexError
+        If a frame index is out of range.
+    """
+    header = read_dcd_header(file_path)
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
+    if np.any(frame_indexes < 0) or np.any(frame_indexes >= header["frame_count"]):
+        error_msg = f"Frame index out of range: '{file_path}' has {header['frame_count']} frames."
+        raise IndexError(error_msg)
+
+    atom_count = header["atom_count"]
+    coordinates = np.empty((len(frame_indexes), atom_count, 3), dtype=np.float64)
+    cells = np.empty(
+        (len(frame_indexes), 6 if header["has_unit_cell"] else 0), dtype=np.float64
+    )
+    if len(frame_indexes) == 0:
+        return coordinates, cells
+
+    frames = np.memmap(
+        file_path,
+        dtype=header["frame_dtype"],
+        mode="r",
+        offset=header["header_size"],
+        shape=(header["frame_count"],),
+    )
+    try:
+        selected_frames = frames[frame_indexes]
+    finally:
+        del frames
+    if not np.all(check_dcd_records(selected_frames)):
+        error_msg = f"Corrupted frame record in '{file_path}'."
+        raise ValueError(error_msg)
+    for axis_index, axis in enumerate(["x", "y", "z"]):
+        coordinates[:, :, axis_index] = selected_frames[axis]
+    if header["has_unit_cell"]:
+        cells[:] = selected_frames["cell"]
+
+    return coordinates, cells
+
+
+# Unittested
+@catch_errors_decorator
+def check_dcd_records(frames: np.ndarray) -> np.ndarray:
+    """
+    Check the record markers of DCD frames.
+
+    Parameters
+    ----------
+    frames : np.ndarray
+        The frames, as a structured array with the 'frame_dtype' of 'read_dcd_header'.
+
+    Returns
+    -------
+    np.ndarray
+        For each frame, True if every record is framed by two markers holding its size, False otherwise.
+    """
+    is_valid = np.ones(len(frames), dtype=bool)
+    for name in frames.dtype.names:
+        if name.endswith(("_start", "_end")):
+            continue
+        record_size = frames.dtype.fields[name][0].itemsize
+        is_valid &= frames[f"{name}_start"] == record_size
+        is_valid &= frames[f"{name}_end"] == record_size
+    return is_valid
+
+
+# Unittested
+@catch_errors_decorator
+def read_pdb_atomic_symbols(file_path: Path) -> np.ndarray:
+    """
+    Read the atomic symbols of a PDB file.
+
+    The symbol of each ATOM/HETATM record is read from the element columns (77-78), or from the atom name (columns 13-16,
+    without digits) if they are empty, and capitalized ('CL' -> 'Cl'). Only the first model is read.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the PDB file.
+
+    Returns
+    -------
+    np.ndarray
+        The atomic symbols (dtype '<U3').
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the file has no atom records.
+    """
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        error_msg = f"File not found: '{file_path}'."
+        raise FileNotFoundError(error_msg)
+
+    atomic_symbols = []
+    with file_path.open("r") as file:
+        for line in file:
+            if line.startswith("ENDMDL"):
+                break
+            if not line.startswith(("ATOM", "HETATM")):
+                continue
+            symbol = line[76:78].strip()
+            if not symbol:
+                symbol = "".join(_ for _ in line[12:16] if _.isalpha())
+            atomic_symbols.append(symbol.capitalize())
+
+    if not atomic_symbols:
+        error_msg = f"No atom records found in '{file_path}'."
+        raise ValueError(error_msg)
+    return np.array(atomic_symbols, dtype="<U3")
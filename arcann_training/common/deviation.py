@@ -0,0 +1,244 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The deviation module provides functions to read model deviation files (as np.ndarray).
+
+Functions
+---------
+get_model_deviation_cache_paths(model_deviation_file_path: Path) -> Tuple[Path, Path]
+    A function to get the paths of the cache files (array and key) of a model deviation file.
+
+get_model_deviation_cache_key(model_deviation_file_path: Path) -> Dict[str, int]
+    A function to get the cache key of a model deviation file (its size and modification time).
+
+is_model_deviation_cache_valid(model_deviation_file_path: Path) -> bool
+    A function to check if the binary cache of a model deviation file exists and matches the current file.
+
+read_model_deviation_file(model_deviation_file_path: Path, use_cache: bool = True) -> np.ndarray
+    A function to read a model deviation file (LAMMPS/i-PI), using a binary cache when it is up to date.
+
+read_model_deviation_file_by_chunks(model_deviation_file_path: Path, chunk_size: int) -> Iterator[np.ndarray]
+    A function to read a model deviation file (LAMMPS/i-PI) by blocks of rows, with a memory use independent of the file length.
+"""
+
+# Standard library modules
+import json
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+
+# Unittested
+@catch_errors_decorator
+def get_model_deviation_cache_paths(
+    model_deviation_file_path: Path,
+) -> Tuple[Path, Path]:
+    """
+    Get the paths of the cache files (array and key) of a model deviation file.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+
+    Returns
+    -------
+    Tuple[Path, Path]
+        - The path to the cached array (.npy).
+        - The path to the cache key (.json), holding the size and modification time of the source file.
+    """
+    return (
+        model_deviation_file_path.with_name(
+            f"{model_deviation_file_path.name}.cache.npy"
+        ),
+        model_deviation_file_path.with_name(
+            f"{model_deviation_file_path.name}.cache.json"
+        ),
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def get_model_deviation_cache_key(model_deviation_file_path: Path) -> Dict[str, int]:
+    """
+    Get the cache key of a model deviation file (its size and modification time).
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+
+    Returns
+    -------
+    Dict[str, int]
+        The size (bytes) and modification time (ns) of the file.
+    """
+    file_stat = model_deviation_file_path.stat()
+    return {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+
+
+# Unittested
+@catch_errors_decorator
+def is_model_deviation_cache_valid(model_deviation_file_path: Path) -> bool:
+    """
+    Check if the binary cache of a model deviation file exists and matches the current file.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+
+    Returns
+    -------
+    bool
+        True if the cache can be used, False otherwise.
+    """
+    cache_array_path, cache_key_path = get_model_deviation_cache_paths(
+        model_deviation_file_path
+    )
+    if not (cache_array_path.is_file() and cache_key_path.is_file()):
+        return False
+    try:
+        return json.loads(cache_key_path.read_text()) == get_model_deviation_cache_key(
+            model_deviation_file_path
+        )
+    except ValueError:
+        return False
+
+
+# Unittested
+@catch_errors_decorator
+def read_model_deviation_file(
+    model_deviation_file_path: Path, use_cache: bool = True
+) -> np.ndarray:
+    """
+    Read a model deviation file (LAMMPS/i-PI), using a binary cache when it is up to date.
+
+    The text file is parsed with the C parser of np.loadtxt (lines starting with '#' are skipped).
+    A sidecar .npy file is written next to it, together with the size and modification time of the text file,
+    so the next reads are memory-mapped loads. The cache is rebuilt as soon as the text file changes.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+    use_cache : bool, optional
+        Whether to read/write the binary cache. Defaults to True.
+
+    Returns
+    -------
+    np.ndarray
+        The model deviation array (one row per frame), read-only when loaded from the cache.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model deviation file does not exist.
+    """
+    if not model_deviation_file_path.is_file():
+        error_msg = f"File not found: '{model_deviation_file_path}'."
+        raise FileNotFoundError(error_msg)
+
+    if not use_cache:
+        return np.loadtxt(model_deviation_file_path, comments="#", ndmin=2)
+
+    cache_array_path, cache_key_path = get_model_deviation_cache_paths(
+        model_deviation_file_path
+    )
+    cache_key = get_model_deviation_cache_key(model_deviation_file_path)
+
+    if is_model_deviation_cache_valid(model_deviation_file_path):
+        return np.load(cache_array_path, mmap_mode="r")
+
+    model_deviation = np.loadtxt(model_deviation_file_path, comments="#", ndmin=2)
+
+    # The key is written last: an interrupted write leaves an outdated (or no) key, so the cache is rebuilt
+    try:
+        if cache_key_path.is_file():
+            cache_key_path.unlink()
+        temporary_array_path = cache_array_path.with_name(
+            f"{cache_array_path.stem}.tmp.npy"
+        )
+        np.save(temporary_array_path, model_deviation)
+        os.replace(temporary_array_path, cache_array_path)
+        cache_key_path.write_text(json.dumps(cache_key))
+    except OSError:
+        # Read-only folder: the array is still returned, only without cache
+        pass
+
+    return model_deviation
+
+
+# Unittested
+@catch_errors_decorator
+def read_model_deviation_file_by_chunks(
+    model_deviation_file_path: Path, chunk_size: int
+) -> Iterator[np.ndarray]:
+    """
+    Read a model deviation file (LAMMPS/i-PI) by blocks of rows, with a memory use independent of the file length.
+
+    If the binary cache is up to date, the blocks are slices of the memory-mapped array.
+    Otherwise, the text file is parsed block by block (lines starting with '#' are skipped) and no cache is written.
+
+    Parameters
+    ----------
+    model_deviation_file_path : Path
+        The path to the model deviation file.
+    chunk_size : int
+        The number of lines read at once (comment lines included for the text file).
+
+    Returns
+    -------
+    Iterator[np.ndarray]
+        The blocks of rows, in the order of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model deviation file does not exist.
+    ValueError
+        If chunk_size is not strictly positive.
+    """
+    if not model_deviation_file_path.is_file():
+        error_msg = f"File not found: '{model_deviation_file_path}'."
+        raise FileNotFoundError(error_msg)
+    if chunk_size < 1:
+        error_msg = f"The chunk size must be strictly positive ('{chunk_size}')."
+        raise ValueError(error_msg)
+
+    # Generator defined inside, so the checks above are done at the call
+    def chunks():
+        if is_model_deviation_cache_valid(model_deviation_file_path):
+            model_deviation = np.load(
+                get_model_deviation_cache_paths(model_deviation_file_path)[0],
+                mmap_mode="r",
+            )
+            for start in range(0, model_deviation.shape[0], chunk_size):
+                yield np.array(model_deviation[start : start + chunk_size])
+            return
+        with model_deviation_file_path.open("r") as model_deviation_file:
+            while True:
+                lines = list(islice(model_deviation_file, chunk_size))
+                if not lines:
+                    return
+                lines = [
+                    _ for _ in lines if _.strip() and not _.lstrip().startswith("#")
+                ]
+                if lines:
+                    yield np.loadtxt(lines, ndmin=2)
+
+    return chunks()
@@ -0,0 +1,226 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The fingerprint module provides functions to compare structures (as np.ndarray) with rotation/permutation-invariant fingerprints.
+
+Functions
+---------
+compute_pair_distance_fingerprints(atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_lengths: Optional[np.ndarray] = None, cutoff: float = 6.0, bin_count: int = 24) -> np.ndarray
+    A function to compute the pair-distance histograms (per pair of elements) of a set of frames.
+
+find_near_duplicate_frames(fingerprints: np.ndarray, threshold: float) -> np.ndarray
+    A function to flag the frames whose fingerprint is within a distance threshold of an earlier kept frame.
+"""
+
+# Standard library modules
+from typing import Optional
+
+# Third-party modules
+import numpy as np
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+
+# Unittested
+@catch_errors_decorator
+def compute_pair_distance_fingerprints(
+    atomic_symbols: np.ndarray,
+    atomic_coordinates: np.ndarray,
+    cell_lengths: Optional[np.ndarray] = None,
+    cutoff: float = 6.0,
+    bin_count: int = 24,
+) -> np.ndarray:
+    """
+    Compute the pair-distance histograms (per pair of elements) of a set of frames.
+
+    The histograms only depend on the interatomic distances and the element of each atom, so they do not change
+    with a rotation, a translation or a permutation of the atoms. Each distance is shared between its two closest bins
+    (linear interpolation), so the fingerprint changes smoothly with the coordinates. The histograms are divided by the number of atoms.
+
+    Parameters
+    ----------
+    atomic_symbols : np.ndarray
+        The atomic symbols, shape (nb_frames, nb_atoms).
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, shape (nb_frames, nb_atoms, 3).
+    cell_lengths : np.ndarray, optional
+        The orthorhombic cell lengths, shape (nb_frames, 3), for the minimum image convention. Defaults to None (no periodicity).
+        Non-finite (or non-positive) values disable the periodicity along that axis.
+    cutoff : float, optional
+        The largest distance taken into account. Defaults to 6.0.
+    bin_count : int, optional
+        The number of bins of each histogram. Defaults to 24.
+
+    Returns
+    -------
+    np.ndarray
+        The fingerprints, shape (nb_frames, nb_elements**2 * bin_count).
+
+    Raises
+    ------
+    ValueError
+        If the shapes of the symbols, coordinates and cell lengths do not match, or if the cutoff or the bin count is not strictly positive.
+    """
+    atomic_symbols = np.asarray(atomic_symbols)
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=float)
+    if (
+        atomic_coordinates.ndim != 3
+        or atomic_coordinates.shape[2] != 3
+        or atomic_symbols.shape != atomic_coordinates.shape[:2]
+    ):
+        error_msg = f"Shape mismatch between the symbols '{atomic_symbols.shape}' and the coordinates '{atomic_coordinates.shape}'."
+        raise ValueError(error_msg)
+    if cutoff <= 0 or bin_count < 1:
+        error_msg = f"The cutoff ('{cutoff}') and the bin count ('{bin_count}') must be strictly positive."
+        raise ValueError(error_msg)
+
+    nb_frames, nb_atoms = atomic_symbols.shape
+    if cell_lengths is None:
+        cell_lengths = np.zeros((nb_frames, 3))
+    else:
+        cell_lengths = np.asarray(cell_lengths, dtype=float)
+        if cell_lengths.shape != (nb_frames, 3):
+            error_msg = f"Shape mismatch: the cell lengths should be '{(nb_frames, 3)}', not '{cell_lengths.shape}'."
+            raise ValueError(error_msg)
+        cell_lengths = np.where(np.isfinite(cell_lengths), cell_lengths, 0.0)
+    # A zero length (and inverse) leaves the axis non-periodic
+    inverse_cell_lengths = np.divide(
+        1.0, cell_lengths, out=np.zeros_like(cell_lengths), where=cell_lengths > 0
+    )
+
+    elements, atomic_types = np.unique(atomic_symbols, return_inverse=True)
+    atomic_types = atomic_types.reshape(nb_frames, nb_atoms)
+    element_count = elements.shape[0]
+    fingerprint_size = element_count * element_count * bin_count
+
+    fingerprints = np.zeros((nb_frames, fingerprint_size))
+    first_atoms, second_atoms = np.triu_indices(nb_atoms, k=1)
+    pair_count = first_atoms.shape[0]
+    if pair_count == 0:
+        return fingerprints
+
+    # Frames are processed by blocks, to bound the size of the (frames x pairs) arrays
+    block_size = max(1, 2_000_000 // pair_count)
+    for block_start in range(0, nb_frames, block_size):
+        block = slice(block_start, min(block_start + block_size, nb_frames))
+        block_frames = block.stop - block.start
+
+        vectors = (
+            atomic_coordinates[block, second_atoms]
+            - atomic_coordinates[block, first_atoms]
+        )
+        vectors -= cell_lengths[block, np.newaxis, :] * np.round(
+            vectors * inverse_cell_lengths[block, np.newaxis, :]
+        )
+        distances = np.sqrt(np.einsum("fpi,fpi->fp", vectors, vectors))
+
+        first_types = atomic_types[block, first_atoms]
+        second_types = atomic_types[block, second_atoms]
+        pair_types = np.minimum(first_types, second_types) * element_count + np.maximum(
+            first_types, second_types
+        )
+
+        in_cutoff = distances < cutoff
+        positions = distances[in_cutoff] / cutoff * bin_count - 0.5
+        lower_bins = np.floor(positions)
+        upper_weights = positions - lower_bins
+        lower_bins = lower_bins.astype(int)
+        offsets = (
+            np.arange(block_frames)[:, np.newaxis] * fingerprint_size
+            + pair_types * bin_count
+        )[in_cutoff]
+
+        block_fingerprints = np.bincount(
+            offsets + np.clip(lower_bins, 0, bin_count - 1),
+            weights=1.0 - upper_weights,
+            minlength=block_frames * fingerprint_size,
+        )
+        block_fingerprints += np.bincount(
+            offsets + np.clip(lower_bins + 1, 0, bin_count - 1),
+            weights=upper_weights,
+            minlength=block_frames * fingerprint_size,
+        )
+        fingerprints[block] = block_fingerprints.reshape(block_frames, fingerprint_size)
+
+    return fingerprints / nb_atoms
+
+
+# Unittested
+@catch_errors_decorator
+def find_near_duplicate_frames(
+    fingerprints: np.ndarray, threshold: float
+) -> np.ndarray:
+    """
+    Flag the frames whose fingerprint is within a distance threshold of an earlier kept frame.
+
+    The frames are visited in order: a frame is kept unless it is a near-duplicate (Euclidean distance lower or equal to the threshold)
+    of a frame already kept. The close pairs are found with a KD-tree (scipy) if available, otherwise by blocks with NumPy.
+
+    Parameters
+    ----------
+    fingerprints : np.ndarray
+        The fingerprints, shape (nb_frames, fingerprint_size).
+    threshold : float
+        The distance under which two frames are duplicates.
+
+    Returns
+    -------
+    np.ndarray
+        A boolean array, True for the frames to remove.
+
+    Raises
+    ------
+    ValueError
+        If the threshold is negative.
+    """
+    fingerprints = np.asarray(fingerprints, dtype=float)
+    if threshold < 0:
+        error_msg = f"The threshold must be positive ('{threshold}')."
+        raise ValueError(error_msg)
+
+    nb_frames = fingerprints.shape[0]
+    is_duplicate = np.zeros(nb_frames, dtype=bool)
+    if nb_frames < 2:
+        return is_duplicate
+
+    if cKDTree is not None:
+        pairs = cKDTree(fingerprints).query_pairs(threshold, output_type="ndarray")
+    else:
+        pairs = []
+        block_size = max(1, 4_000_000 // (nb_frames * max(1, fingerprints.shape[1])))
+        for block_start in range(0, nb_frames, block_size):
+            block = slice(block_start, min(block_start + block_size, nb_frames))
+            distances = np.linalg.norm(
+                fingerprints[block, np.newaxis, :] - fingerprints[np.newaxis, :, :],
+                axis=2,
+            )
+            first_frames, second_frames = np.nonzero(distances <= threshold)
+            first_frames += block_start
+            upper = second_frames > first_frames
+            pairs.append(np.column_stack((first_frames[upper], second_frames[upper])))
+        pairs = np.concatenate(pairs)
+
+    if pairs.shape[0] == 0:
+        return is_duplicate
+
+    # Neighbors (later frames) of each frame, then a greedy pass in the order of the frames
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    bounds = np.searchsorted(pairs[:, 0], np.arange(nb_frames + 1))
+    for frame in np.unique(pairs[:, 0]):
+        if not is_duplicate[frame]:
+            is_duplicate[pairs[bounds[frame] : bounds[frame + 1], 1]] = True
+
+    return is_duplicate
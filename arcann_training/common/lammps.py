@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 
 The lammps module provides functions to manipulate LAMMPS data (as list of strings).
 
@@ -14,6 +14,12 @@ Functions
 ---------
 read_lammps_data(lines: List[str],) -> Tuple(int, int, np.ndarray, Dict[int], np.ndarray)
     Read LAMMPS data file and extract required information.
+write_lammps_data(data_file: Path, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell: Union[List[float], np.ndarray], properties: Dict, comment: str = "") -> None
+    Write a LAMMPS data file (atomic style) from the atomic symbols and coordinates of a structure.
+write_cell_lengths_file(cell_file: Path, cell_lengths_file: Path) -> bool
+    Convert the box bounds printed by LAMMPS ('cell.txt') into a compact NumPy file of cell lengths.
+read_cell_lengths_file(cell_lengths_file: Path) -> Tuple[np.ndarray, bool]
+    Read (memory-mapped) the cell lengths written by 'write_cell_lengths_file'.
 """
 
 # TODO: Homogenize the docstrings for this module
@@ -167,3 +173,170 @@ def read_lammps_data(
         masses,
         atoms,
     )
+
+
+# Unittested
+@catch_errors_decorator
+def write_lammps_data(
+    data_file: Path,
+    atomic_symbols: np.ndarray,
+    atomic_coordinates: np.ndarray,
+    cell: Union[List[float], np.ndarray],
+    properties: Dict,
+    comment: str = "",
+) -> None:
+    """
+    Write a LAMMPS data file (atomic style) from the atomic symbols and coordinates of a structure.
+
+    The atom types and masses come from the properties (as in 'properties.txt'), so every type is written, even if it is
+    not present in the structure. A cell given by its lattice vectors is rotated to the LAMMPS orientation (a along x,
+    b in the xy plane) with the coordinates, and the tilt factors are written if it is not orthogonal.
+
+    Parameters
+    ----------
+    data_file : Path
+        The path to the LAMMPS data file to write.
+    atomic_symbols : np.ndarray
+        The atomic symbols, shape (atom_count,).
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, shape (atom_count, 3).
+    cell : Union[List[float], np.ndarray]
+        The cell, as its three lengths (orthogonal box) or its three lattice vectors (shape (3, 3) or (9,)).
+    properties : Dict
+        The atom types (int or str keys), each with its 'symbol' and 'mass'.
+    comment : str, optional
+        The comment written on the first line. Defaults to "".
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError
+        If the cell does not have 3 or 9 values, or if a symbol is not in the properties.
+    """
+    cell = np.asarray(cell, dtype=np.float64)
+    if cell.size == 3:
+        cell = np.diag(cell.ravel())
+    elif cell.size == 9:
+        cell = cell.reshape(3, 3)
+    else:
+        error_msg = f"The cell must have 3 or 9 values, not '{cell.size}'."
+        raise ValueError(error_msg)
+    atomic_coordinates = np.asarray(atomic_coordinates, dtype=np.float64)
+
+    # LAMMPS cell (lower triangular), the coordinates are moved with the cell if it had to be rotated
+    lx = np.linalg.norm(cell[0])
+    xy = cell[1] @ cell[0] / lx
+    ly = np.sqrt(cell[1] @ cell[1] - xy**2)
+    xz = cell[2] @ cell[0] / lx
+    yz = (cell[1] @ cell[2] - xy * xz) / ly
+    lz = np.sqrt(cell[2] @ cell[2] - xz**2 - yz**2)
+    lammps_cell = np.array([[lx, 0.0, 0.0], [xy, ly, 0.0], [xz, yz, lz]])
+    if not np.array_equal(cell, lammps_cell):
+        atomic_coordinates = (
+            np.linalg.solve(cell.T, atomic_coordinates.T).T @ lammps_cell
+        )
+
+    symbol_types = {properties[_]["symbol"]: int(_) for _ in properties}
+    unknown_symbols = set(np.asarray(atomic_symbols).tolist()) - set(symbol_types)
+    if unknown_symbols:
+        error_msg = (
+            f"Atomic symbols not found in the properties: '{sorted(unknown_symbols)}'."
+        )
+        raise ValueError(error_msg)
+    atom_types = [symbol_types[_] for _ in np.asarray(atomic_symbols).tolist()]
+    atom_count = len(atom_types)
+
+    lines = [
+        f"# {comment}",
+        "",
+        f"{atom_count:12d}  atoms",
+        f"{max(symbol_types.values()):12d}  atom types",
+        "",
+        f"{0.0:20.12f} {lx:20.12f}  xlo xhi",
+        f"{0.0:20.12f} {ly:20.12f}  ylo yhi",
+        f"{0.0:20.12f} {lz:20.12f}  zlo zhi",
+    ]
+    if xy != 0.0 or xz != 0.0 or yz != 0.0:
+        lines.append(f"{xy:20.12f} {xz:20.12f} {yz:20.12f}  xy xz yz")
+    lines += ["", "Masses", ""]
+    for atom_type in sorted(symbol_types.values()):
+        type_properties = properties[
+            atom_type if atom_type in properties else str(atom_type)
+        ]
+        lines.append(
+            f"{atom_type:13d}   {type_properties['mass']:<24.8f}# {type_properties['symbol']}"
+        )
+    lines += ["", "Atoms # atomic", ""]
+
+    values = [None] * (5 * atom_count)
+    values[0::5] = range(1, atom_count + 1)
+    values[1::5] = atom_types
+    for axis in range(3):
+        values[axis + 2 :: 5] = atomic_coordinates[:, axis].tolist()
+    with Path(data_file).open("w") as file:
+        file.write("\n".join(lines) + "\n")
+        file.write("%10d%5d  %20.12f %20.12f %20.12f\n" * atom_count % tuple(values))
+
+
+# Unittested
+@catch_errors_decorator
+def write_cell_lengths_file(cell_file: Path, cell_lengths_file: Path) -> bool:
+    """
+    Convert the box bounds printed by LAMMPS ('cell.txt') into a compact NumPy file of cell lengths.
+
+    Each line of the print output holds the bounds 'xlo xhi ylo yhi zlo zhi' of one printed step. The NumPy file holds
+    the lengths of each step (one row per step), or a single row if the cell is constant.
+
+    Parameters
+    ----------
+    cell_file : Path
+        The path to the print output of LAMMPS.
+    cell_lengths_file : Path
+        The path to the NumPy file to write.
+
+    Returns
+    -------
+    bool
+        True if the cell is constant, False otherwise.
+
+    Raises
+    ------
+    ValueError
+        If the print output does not have six columns.
+    """
+    with Path(cell_file).open() as file:
+        cell_bounds = np.loadtxt(file, comments="#", ndmin=2)
+    if cell_bounds.shape[1] != 6:
+        error_msg = f"'{cell_file}' should have 6 columns (xlo xhi ylo yhi zlo zhi)."
+        raise ValueError(error_msg)
+    cell_lengths = cell_bounds[:, 1::2] - cell_bounds[:, 0::2]
+    is_cell_constant = bool(np.all(cell_lengths == cell_lengths[0]))
+    np.save(cell_lengths_file, cell_lengths[:1] if is_cell_constant else cell_lengths)
+    return is_cell_constant
+
+
+# Unittested
+@catch_errors_decorator
+def read_cell_lengths_file(cell_lengths_file: Path) -> Tuple[np.ndarray, bool]:
+    """
+    Read (memory-mapped) the cell lengths written by 'write_cell_lengths_file'.
+
+    Only the rows that are indexed are read from the disk.
+
+    Parameters
+    ----------
+    cell_lengths_file : Path
+        The path to the NumPy file.
+
+    Returns
+    -------
+    Tuple[np.ndarray, bool]
+        The cell lengths (shape (3,) if the cell is constant, (step count, 3) otherwise) and True if the cell is constant.
+    """
+    cell_lengths = np.load(cell_lengths_file, mmap_mode="r")
+    if cell_lengths.shape[0] == 1:
+        return np.array(cell_lengths[0]), True
+    return cell_lengths, False
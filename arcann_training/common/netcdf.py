@@ -0,0 +1,152 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The netcdf module provides functions to inspect NetCDF files (such as AMBER trajectories) without reading their data.
+
+Functions
+---------
+read_netcdf_header(file_path: Path) -> Dict[str, Any]
+    Read the header of a NetCDF (classic or 64-bit offset) file.
+"""
+
+# Standard library modules
+import struct
+from pathlib import Path
+from typing import Any, Dict
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+
+
+# Unittested
+@catch_errors_decorator
+def read_netcdf_header(file_path: Path) -> Dict[str, Any]:
+    """
+    Read the header of a NetCDF (classic or 64-bit offset) file.
+
+    The header lists the dimensions, the global attributes and the variables, with the offset ('begin') and size
+    ('vsize') of their data. The size of the file implied by the header is the end of the data of the last variable
+    (for the record variables, in the last record). A NetCDF-4 (HDF5) file is only identified by its signature.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path to the NetCDF file.
+
+    Returns
+    -------
+    Dict[str, Any]
+        The format ('classic', '64bit_offset' or 'hdf5'), the number of records (None if streaming), the dimensions
+        (name: length, 0 for the record dimension), the variables (name: dimensions, type, vsize and begin), the size of
+        the file implied by the header, and the size of the file (the first two only for HDF5).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If the file is not a NetCDF file, or if its header is truncated or invalid.
+    """
+    file_path = Path(file_path)
+    if not file_path.is_file():
+        error_msg = f"File not found: '{file_path}'."
+        raise FileNotFoundError(error_msg)
+
+    file_size = file_path.stat().st_size
+    with file_path.open("rb") as file:
+        magic = file.read(4)
+        if magic == b"\x89HDF":
+            return {"format": "hdf5", "file_size": file_size}
+        if magic not in [b"CDF\x01", b"CDF\x02"]:
+            error_msg = f"'{file_path}' is not a NetCDF file."
+            raise ValueError(error_msg)
+        offset_format = ">i" if magic == b"CDF\x01" else ">q"
+        type_sizes = {1: 1, 2: 1, 3: 2, 4: 4, 5: 4, 6: 8}
+
+        def read(fmt: str):
+            size = struct.calcsize(fmt)
+            data = file.read(size)
+            if len(data) != size:
+                error_msg = f"Truncated NetCDF header in '{file_path}'."
+                raise ValueError(error_msg)
+            return struct.unpack(fmt, data)[0]
+
+        def read_name() -> str:
+            length = read(">i")
+            name = file.read(length).decode("utf-8", errors="replace")
+            file.seek(-length % 4, 1)
+            return name
+
+        def read_list(expected_tag: int) -> int:
+            tag, count = read(">i"), read(">i")
+            if tag not in [0, expected_tag] or (tag == 0 and count != 0):
+                error_msg = f"Invalid NetCDF header in '{file_path}'."
+                raise ValueError(error_msg)
+            return count
+
+        def skip_attributes():
+            for _ in range(read_list(12)):
+                read_name()
+                nc_type, count = read(">i"), read(">i")
+                if nc_type not in type_sizes:
+                    error_msg = f"Invalid NetCDF attribute type in '{file_path}'."
+                    raise ValueError(error_msg)
+                file.seek(
+                    count * type_sizes[nc_type] + (-count * type_sizes[nc_type]) % 4, 1
+                )
+
+        record_count = read(">I")
+        dimensions = {}
+        for _ in range(read_list(10)):
+            name = read_name()
+            dimensions[name] = read(">i")
+        skip_attributes()
+        variables = {}
+        for _ in range(read_list(11)):
+            name = read_name()
+            dimension_ids = [read(">i") for _ in range(read(">i"))]
+            skip_attributes()
+            nc_type, vsize, begin = read(">i"), read(">i"), read(offset_format)
+            variables[name] = {
+                "dimensions": [list(dimensions)[_] for _ in dimension_ids],
+                "type": nc_type,
+                "vsize": vsize,
+                "begin": begin,
+            }
+
+    # 'numrecs' is 0xFFFFFFFF while a file is being written (streaming)
+    record_count = None if record_count == 0xFFFFFFFF else record_count
+    record_names = [
+        name
+        for name, variable in variables.items()
+        if variable["dimensions"] and dimensions[variable["dimensions"][0]] == 0
+    ]
+    record_size = sum(variables[_]["vsize"] for _ in record_names)
+    expected_size = 0
+    for name, variable in variables.items():
+        if name in record_names:
+            if record_count:
+                expected_size = max(
+                    expected_size,
+                    variable["begin"]
+                    + (record_count - 1) * record_size
+                    + variable["vsize"],
+                )
+        else:
+            expected_size = max(expected_size, variable["begin"] + variable["vsize"])
+
+    return {
+        "format": "classic" if magic == b"CDF\x01" else "64bit_offset",
+        "record_count": record_count,
+        "dimensions": dimensions,
+        "variables": variables,
+        "expected_size": expected_size,
+        "file_size": file_size,
+    }
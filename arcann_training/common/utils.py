@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 
 Utility module providing helper functions.
 
@@ -18,12 +18,17 @@ convert_seconds_to_hh_mm_ss(seconds: float) -> str
     Converts a time duration in seconds to the format HH:MM:SS.
 natural_sort_key(s: str) -> List[Union[int, str]]
     Provides a natural sorting key for alphanumeric strings.
+run_in_parallel(func: Callable[..., Any], args_list: List[Tuple], nb_jobs: int = 1) -> List[Any]
+    Calls a function on a list of argument tuples, optionally with a pool of worker processes.
 """
 
 # Standard library modules
+import functools
 import logging
+import os
 import re
-from typing import Any, Callable, List, Union
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Tuple, Union
 
 
 # Unittested
@@ -48,6 +53,8 @@ def catch_errors_decorator(func: Callable[..., Any]) -> Callable[..., Any]:
     """
     logger = logging.getLogger("ArcaNN")
 
+    # Keep the name of the wrapped function so it can be pickled (worker processes)
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
         try:
             return func(*args, **kwargs)
@@ -119,3 +126,49 @@ def natural_sort_key(s: str) -> List[Union[int, str]]:
         for text in re.split(_nsre, s)
         if text
     ]
+
+
+# Unittested
+@catch_errors_decorator
+def run_in_parallel(
+    func: Callable[..., Any], args_list: List[Tuple], nb_jobs: int = 1
+) -> List[Any]:
+    """
+    Calls a function on a list of argument tuples, optionally with a pool of worker processes.
+
+    The results are returned in the same order as the argument tuples, whatever the number of jobs.
+    With one job (or a single argument tuple), everything is done in the current process.
+
+    Parameters
+    ----------
+    func : Callable[..., Any]
+        The function to call. It must be defined at the module level to be sent to the worker processes.
+    args_list : List[Tuple]
+        The list of positional arguments, one tuple per call.
+    nb_jobs : int, optional
+        The number of worker processes. A value lower than 1 uses all the available cores. Defaults to 1.
+
+    Returns
+    -------
+    List[Any]
+        The list of the values returned by each call.
+
+    Raises
+    ------
+    TypeError
+        If nb_jobs is not an integer.
+    """
+    if not isinstance(nb_jobs, int) or isinstance(nb_jobs, bool):
+        error_msg = f"The number of jobs must be a '{type(1)}'."
+        raise TypeError(error_msg)
+
+    if nb_jobs < 1:
+        nb_jobs = os.cpu_count() or 1
+    nb_jobs = min(nb_jobs, len(args_list))
+
+    if nb_jobs <= 1:
+        return [func(*args) for args in args_list]
+
+    chunksize = max(1, len(args_list) // (4 * nb_jobs))
+    with ProcessPoolExecutor(max_workers=nb_jobs) as executor:
+        return list(executor.map(func, *zip(*args_list), chunksize=chunksize))
@@ -0,0 +1,207 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+The vmd module provides functions to extract frames of many trajectories with a single VMD session (batch mode).
+
+Functions
+---------
+write_vmd_batch_script(master_vmd_tcl: List[str], jobs: List[Dict], results_file: Path) -> List[str]
+    Generate the Tcl driver script extracting the selected frames of a list of trajectories.
+read_vmd_batch_results(results_file: Path, job_count: int) -> List[Dict[str, Union[str, int]]]
+    Read the per-trajectory results written by a VMD batch script.
+run_vmd_batch(vmd_bin: str, master_vmd_tcl: List[str], jobs: List[Dict], work_path: Path, nb_jobs: int = 1) -> List[Dict[str, Union[str, int]]]
+    Extract the selected frames of a list of trajectories with one VMD process (or a small pool of them).
+"""
+
+# Standard library modules
+import os
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Union
+
+# Local imports
+from arcann_training.common.utils import catch_errors_decorator
+from arcann_training.common.list import (
+    replace_substring_in_string_list,
+    string_list_to_textfile,
+)
+from arcann_training.common.filesystem import remove_file
+
+
+# Unittested
+@catch_errors_decorator
+def write_vmd_batch_script(
+    master_vmd_tcl: List[str], jobs: List[Dict], results_file: Path
+) -> List[str]:
+    """
+    Generate the Tcl driver script extracting the selected frames of a list of trajectories.
+
+    Each job loads a PDB topology and a DCD trajectory, writes each selected frame as 'OUTPUT_PREFIX_XXXXX.xyz' (frame
+    index padded to 5 digits) and unloads them. A failing job is reported and does not stop the next ones.
+
+    Parameters
+    ----------
+    master_vmd_tcl : List[str]
+        The lines of the template script (with the '_R_RESULTS_FILE_' and '_R_JOBS_' placeholders).
+    jobs : List[Dict]
+        One job per trajectory: 'topology_file' (Path), 'trajectory_file' (Path) and 'outputs', a list of
+        (frame indexes, output prefix) pairs.
+    results_file : Path
+        The path to the file where the per-trajectory results are written.
+
+    Returns
+    -------
+    List[str]
+        The lines of the driver script.
+
+    Raises
+    ------
+    ValueError
+        If the template has no '_R_JOBS_' line.
+    """
+    job_lines = []
+    for job_index, job in enumerate(jobs):
+        outputs = " ".join(
+            f"{{{' '.join(str(int(_)) for _ in frame_indexes)}}} {{{output_prefix}}}"
+            for frame_indexes, output_prefix in job["outputs"]
+        )
+        job_lines.append(
+            f"run_job $results_file {job_index} {{{job['topology_file']}}} {{{job['trajectory_file']}}} {{{outputs}}}"
+        )
+
+    vmd_tcl = replace_substring_in_string_list(
+        master_vmd_tcl, "_R_RESULTS_FILE_", str(results_file)
+    )
+    if "_R_JOBS_" not in vmd_tcl:
+        error_msg = f"The VMD batch template has no '_R_JOBS_' line."
+        raise ValueError(error_msg)
+    jobs_line_index = vmd_tcl.index("_R_JOBS_")
+    return vmd_tcl[:jobs_line_index] + job_lines + vmd_tcl[jobs_line_index + 1 :]
+
+
+# Unittested
+@catch_errors_decorator
+def read_vmd_batch_results(
+    results_file: Path, job_count: int
+) -> List[Dict[str, Union[str, int]]]:
+    """
+    Read the per-trajectory results written by a VMD batch script.
+
+    Parameters
+    ----------
+    results_file : Path
+        The path to the results file (one line per job: 'JOB_INDEX OK FRAME_COUNT WRITTEN_COUNT' or
+        'JOB_INDEX ERROR MESSAGE').
+    job_count : int
+        The number of jobs of the script.
+
+    Returns
+    -------
+    List[Dict[str, Union[str, int]]]
+        For each job, its 'status' ('OK', 'ERROR', or 'MISSING' if VMD stopped before it) and the 'frame_count' and
+        'written_count' (OK) or the 'message' (ERROR, MISSING).
+    """
+    results = [
+        {"status": "MISSING", "message": "No result (VMD stopped before this job)."}
+        for _ in range(job_count)
+    ]
+    if not Path(results_file).is_file():
+        return results
+    for line in Path(results_file).read_text().splitlines():
+        fields = line.split(maxsplit=2)
+        if len(fields) < 2 or not fields[0].isdigit() or int(fields[0]) >= job_count:
+            continue
+        if fields[1] == "OK":
+            frame_count, written_count = fields[2].split()
+            results[int(fields[0])] = {
+                "status": "OK",
+                "frame_count": int(frame_count),
+                "written_count": int(written_count),
+            }
+        else:
+            results[int(fields[0])] = {
+                "status": "ERROR",
+                "message": fields[2] if len(fields) > 2 else "",
+            }
+    return results
+
+
+# Unittested
+@catch_errors_decorator
+def run_vmd_batch(
+    vmd_bin: str,
+    master_vmd_tcl: List[str],
+    jobs: List[Dict],
+    work_path: Path,
+    nb_jobs: int = 1,
+) -> List[Dict[str, Union[str, int]]]:
+    """
+    Extract the selected frames of a list of trajectories with one VMD process (or a small pool of them).
+
+    The jobs are dealt between the processes, which run at the same time. The driver scripts and the results files are
+    written in 'work_path' and removed once read.
+
+    Parameters
+    ----------
+    vmd_bin : str
+        The path to the VMD binary.
+    master_vmd_tcl : List[str]
+        The lines of the template script (see 'write_vmd_batch_script').
+    jobs : List[Dict]
+        One job per trajectory (see 'write_vmd_batch_script').
+    work_path : Path
+        The folder where the driver scripts and the results files are written.
+    nb_jobs : int, optional
+        The number of VMD processes. A value lower than 1 uses all the available cores. Defaults to 1.
+
+    Returns
+    -------
+    List[Dict[str, Union[str, int]]]
+        The result of each job, in the order of the jobs (see 'read_vmd_batch_results').
+    """
+    if nb_jobs < 1:
+        nb_jobs = os.cpu_count() or 1
+    nb_processes = max(1, min(nb_jobs, len(jobs)))
+
+    processes = []
+    for process_index in range(nb_processes):
+        process_jobs = jobs[process_index::nb_processes]
+        script_file = work_path / f"vmd_batch_{process_index}.tcl"
+        results_file = work_path / f"vmd_batch_{process_index}.results"
+        remove_file(results_file)
+        string_list_to_textfile(
+            script_file,
+            write_vmd_batch_script(master_vmd_tcl, process_jobs, results_file),
+        )
+        processes.append(
+            (
+                subprocess.Popen(
+                    [vmd_bin, "-e", str(script_file), "-dispdev", "text"],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.STDOUT,
+                ),
+                script_file,
+                results_file,
+                len(process_jobs),
+            )
+        )
+
+    results = [None] * len(jobs)
+    for process_index, (process, script_file, results_file, job_count) in enumerate(
+        processes
+    ):
+        process.wait()
+        results[process_index::nb_processes] = read_vmd_batch_results(
+            results_file, job_count
+        )
+        remove_file(script_file)
+        remove_file(results_file)
+    return results
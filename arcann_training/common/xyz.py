@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 
 The xyz module provides functions to manipulate XYZ data (as np.ndarray).
 
@@ -15,19 +15,33 @@ Functions
 parse_xyz_trajectory_file(trajectory_file_path: Path, is_extended: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, List]
     A function to parse an extended XYZ format trajectory file, returning information about the atomic structure throughout the trajectory.
 
+parse_xyz_lines(lines: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List, List, List, List]
+    A function to parse the lines of one or several XYZ frames (same outputs as parse_xyz_trajectory_file).
+
+index_xyz_trajectory_file(trajectory_file_path: Path, use_cache: bool = True) -> np.ndarray
+    A function to build (and cache in a sidecar file) the byte offsets of the frames of an XYZ trajectory file.
+
+read_xyz_frames(trajectory_file_path: Path, frame_indexes: List[int], use_cache: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], List, List, List, List]
+    A function to read selected frames of an XYZ trajectory file, without parsing the other ones.
+
 parse_extended_format(comment_line: str) -> Tuple[List[float], bool]
     A function to parse the comment line of an extended XYZ file for lattice and properties information.
 
 write_xyz_frame(trajectory_file_path: Path, frame_idx: int, atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str]) -> None
     A function to write the XYZ coordinates of a specific frame from a trajectory to a file, including extended format lattice information if provided.
+
+write_xyz_frames(trajectory_file_paths: Union[Path, List[Path]], frame_indexes: List[int], atom_counts: np.ndarray, atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_info: np.ndarray, comments: List[str], append: bool = False) -> None
+    A function to write several frames of a trajectory at once, in one multi-frame file or in one file per frame.
 """
 
 # TODO: Homogenize the docstrings for this module
 
 # Standard library modules
+import mmap
+import os
 import re
 from pathlib import Path
-from typing import Tuple, List, Optional
+from typing import Tuple, List, Optional, Union
 
 # Third-party modules
 import numpy as np
@@ -35,8 +49,14 @@ import numpy as np
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
 
+# The patterns of the extended XYZ comment line are compiled once, at import
+LATTICE_PATTERN = re.compile(r"Lattice=\"((?:[-\d\.]+\s+){8}[-\d\.]+)\"")
+PROPERTIES_PATTERN = re.compile(r"Properties=species:S:1:pos:R:3")
+PBC_PATTERN = re.compile(r'pbc="([^"]*)"')
+MAX_F_STD_PATTERN = re.compile(r"max_f_std=([\d.]+)")
 
-# TODO: Add tests for this function
+
+# Unittested
 @catch_errors_decorator
 def parse_xyz_trajectory_file(
     trajectory_file_path: Path,
@@ -54,6 +74,8 @@ def parse_xyz_trajectory_file(
     Parses an XYZ format trajectory file, extracting atomic structure and optional extended properties such as lattice information,
     periodic boundary conditions (PBC), and additional properties if they are provided in the comments.
 
+    All the frames must have the same number of atoms, so the atom lines of the whole file are parsed in a single call.
+
     Parameters
     ----------
     trajectory_file_path : Path
@@ -83,36 +105,84 @@ def parse_xyz_trajectory_file(
     if not trajectory_file_path.is_file():
         raise FileNotFoundError(f"File not found: {trajectory_file_path}")
 
-    (
-        atom_counts,
-        atomic_symbols,
-        atomic_coordinates,
-        comments,
-        lattice_info,
-        pbc_info,
-        properties_info,
-        max_f_std_info,
-    ) = ([], [], [], [], [], [], [], [])
-
     with trajectory_file_path.open("r") as file:
-        lines = file.readlines()
-
-    i = 0
-    while i < len(lines):
-        atom_count_str = lines[i].strip()
-        if not atom_count_str.isdigit():
-            raise TypeError(
-                "Incorrect file format: number of atoms must be an integer."
-            )
-        atom_count = int(atom_count_str)
-        atom_counts.append(atom_count)
+        lines = file.read().splitlines()
+
+    return parse_xyz_lines(lines)
+
+
+# Unittested
+@catch_errors_decorator
+def parse_xyz_lines(
+    lines: List[str],
+) -> Tuple[
+    np.ndarray,
+    np.ndarray,
+    np.ndarray,
+    List[str],
+    Optional[np.ndarray],
+    Optional[List[bool]],
+    Optional[bool],
+    Optional[float],
+]:
+    """
+    Parses the lines of one or several XYZ frames (same outputs as 'parse_xyz_trajectory_file').
+
+    Parameters
+    ----------
+    lines : List[str]
+        The lines of the frames (without the line endings).
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Optional[np.ndarray], Optional[List[bool]], Optional[bool], Optional[float]]
+        See 'parse_xyz_trajectory_file'.
+
+    Raises
+    ------
+    TypeError
+        If the number of atoms is not an integer.
+    ValueError
+        If the number of atoms changes between the frames or if the format is incorrect.
+    """
+    # Shallow copy, the header lines are deleted below
+    lines = list(lines)
+    if not lines:
+        return np.array([]), np.array([]), np.array([]), [], [], [], [], []
+
+    # All the frames have the same size (atom count, comment and one line per atom)
+    atom_count_str = lines[0].strip()
+    if not atom_count_str.isdigit():
+        raise TypeError("Incorrect file format: number of atoms must be an integer.")
+    atom_count = int(atom_count_str)
+    frame_size = atom_count + 2
+
+    if len(lines) % frame_size != 0 or any(
+        line.strip() != atom_count_str for line in lines[::frame_size]
+    ):
+        # Walk the frames one by one to report the error
+        i = 0
+        while i < len(lines):
+            frame_atom_count_str = lines[i].strip()
+            if not frame_atom_count_str.isdigit():
+                raise TypeError(
+                    "Incorrect file format: number of atoms must be an integer."
+                )
+            if int(frame_atom_count_str) != atom_count:
+                raise ValueError(
+                    "Number of atoms is not constant throughout the trajectory file."
+                )
+            i += frame_size
+        raise ValueError("Incorrect file format: the last frame is incomplete.")
 
-        comment = lines[i + 1].strip()
-        comments.append(comment)
+    frame_count = len(lines) // frame_size
+    comments = [line.strip() for line in lines[1::frame_size]]
 
+    lattice_info, pbc_info, properties_info, max_f_std_info = [], [], [], []
+    for comment in comments:
         lattice, properties, pbc, max_f_std = parse_extended_format(comment)
 
-        lattice_info.append(np.array([float(x) for x in lattice]) if lattice else None)
+        lattice_info.append(np.array(lattice, dtype=float) if lattice else None)
         if pbc:
             if len(pbc) == 3:
                 pbc_info.append(pbc)
@@ -126,33 +196,30 @@ def parse_xyz_trajectory_file(
         properties_info.append(properties if properties else None)
         max_f_std_info.append(max_f_std if max_f_std else None)
 
-        symbols_frame = np.zeros(atom_count, dtype="<U3")
-        coordinates_frame = np.zeros((atom_count, 3))
-
-        for j in range(atom_count):
-            line_elements = lines[i + 2 + j].split()
-            if len(line_elements) != 4:
-                raise ValueError(
-                    "Incorrect file format: expected an atomic symbol followed by three coordinates."
-                )
-            symbol, x, y, z = line_elements
-            symbols_frame[j] = symbol
-            coordinates_frame[j] = [float(x), float(y), float(z)]
-
-        atomic_symbols.append(symbols_frame)
-        atomic_coordinates.append(coordinates_frame)
-
-        i += atom_count + 2
-
-    if len(set(atom_counts)) > 1:
-        raise ValueError(
-            "Number of atoms is not constant throughout the trajectory file."
-        )
+    # Drop the comment then the atom count lines, and parse all the atoms at once
+    del lines[1::frame_size]
+    del lines[:: frame_size - 1]
+    atomic_symbols = np.zeros((frame_count, atom_count), dtype="<U3")
+    atomic_coordinates = np.zeros((frame_count, atom_count, 3))
+    if atom_count > 0:
+        try:
+            atoms = np.loadtxt(
+                lines,
+                dtype=[("symbol", "<U3"), ("coordinates", np.float64, (3,))],
+                comments=None,
+                ndmin=1,
+            )
+        except ValueError as e:
+            raise ValueError(
+                f"Incorrect file format: expected an atomic symbol followed by three coordinates ({e})."
+            ) from e
+        atomic_symbols[:] = atoms["symbol"].reshape(frame_count, atom_count)
+        atomic_coordinates[:] = atoms["coordinates"].reshape(frame_count, atom_count, 3)
 
     return (
-        np.array(atom_counts),
-        np.array(atomic_symbols),
-        np.array(atomic_coordinates),
+        np.full(frame_count, atom_count),
+        atomic_symbols,
+        atomic_coordinates,
         comments,
         lattice_info,
         pbc_info,
@@ -161,6 +228,174 @@ def parse_xyz_trajectory_file(
     )
 
 
+# Unittested
+@catch_errors_decorator
+def index_xyz_trajectory_file(
+    trajectory_file_path: Path, use_cache: bool = True
+) -> np.ndarray:
+    """
+    Builds the byte offsets of the frames of an XYZ trajectory file, using a sidecar cache when it is up to date.
+
+    The file is memory-mapped and its line endings are found by blocks, then only the atom count line of each frame is read.
+    The offsets are saved next to the file ('<name>.index.npy', prefixed by the size and modification time of the file),
+    so the next calls only load them. The cache is rebuilt as soon as the file changes.
+
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+    use_cache : bool, optional
+        Whether to read/write the sidecar cache. Defaults to True.
+
+    Returns
+    -------
+    np.ndarray
+        The byte offset of the start of each frame, followed by the size of the file (nb_frames + 1 values).
+
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    TypeError
+        If the number of atoms of a frame is not an integer.
+    ValueError
+        If the last frame is incomplete.
+    """
+    if not trajectory_file_path.is_file():
+        raise FileNotFoundError(f"File not found: {trajectory_file_path}")
+
+    file_stat = trajectory_file_path.stat()
+    file_size = file_stat.st_size
+    cache_key = np.array([file_size, file_stat.st_mtime_ns], dtype=np.int64)
+    cache_path = trajectory_file_path.with_name(
+        f"{trajectory_file_path.name}.index.npy"
+    )
+    if use_cache and cache_path.is_file():
+        try:
+            cached_offsets = np.load(cache_path)
+            if cached_offsets.shape[0] > 2 and np.array_equal(
+                cached_offsets[:2], cache_key
+            ):
+                return cached_offsets[2:]
+        except (OSError, ValueError):
+            pass
+
+    offsets = np.zeros(1, dtype=np.int64)
+    if file_size > 0:
+        with trajectory_file_path.open("rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped_file:
+            # Start of each line (the blocks bound the memory of the comparison)
+            line_starts = [np.zeros(1, dtype=np.int64)]
+            block_size = 1 << 26
+            for block_start in range(0, file_size, block_size):
+                block = np.frombuffer(
+                    mapped_file,
+                    dtype=np.uint8,
+                    count=min(block_size, file_size - block_start),
+                    offset=block_start,
+                )
+                line_starts.append(np.flatnonzero(block == 10) + (block_start + 1))
+                # The mmap cannot be closed while an array uses its buffer
+                del block
+            line_starts = np.concatenate(line_starts)
+            if line_starts[-1] == file_size:
+                line_starts = line_starts[:-1]
+            line_ends = np.append(line_starts[1:], file_size)
+
+            # Jump from one atom count line to the next one
+            frame_starts = []
+            line_index = 0
+            while line_index < line_starts.shape[0]:
+                atom_count_str = mapped_file[
+                    line_starts[line_index] : line_ends[line_index]
+                ].strip()
+                if not atom_count_str.isdigit():
+                    raise TypeError(
+                        "Incorrect file format: number of atoms must be an integer."
+                    )
+                frame_starts.append(line_starts[line_index])
+                line_index += int(atom_count_str) + 2
+            if line_index > line_starts.shape[0]:
+                raise ValueError("Incorrect file format: the last frame is incomplete.")
+            offsets = np.array(frame_starts + [file_size], dtype=np.int64)
+
+    # The cache is replaced in one step, an interrupted write leaves the previous (outdated) one
+    if use_cache:
+        try:
+            temporary_path = cache_path.with_name(
+                f"{trajectory_file_path.name}.index.tmp.npy"
+            )
+            np.save(temporary_path, np.concatenate((cache_key, offsets)))
+            os.replace(temporary_path, cache_path)
+        except OSError:
+            # Read-only folder: the offsets are still returned, only without cache
+            pass
+
+    return offsets
+
+
+# Unittested
+@catch_errors_decorator
+def read_xyz_frames(
+    trajectory_file_path: Path, frame_indexes: List[int], use_cache: bool = True
+) -> Tuple[
+    np.ndarray,
+    np.ndarray,
+    np.ndarray,
+    List[str],
+    Optional[np.ndarray],
+    Optional[List[bool]],
+    Optional[bool],
+    Optional[float],
+]:
+    """
+    Reads selected frames of an XYZ trajectory file, without parsing the other ones (see 'index_xyz_trajectory_file').
+
+    Parameters
+    ----------
+    trajectory_file_path : Path
+        The path to the trajectory file.
+    frame_indexes : List[int]
+        The indexes of the frames to read (the outputs follow this order).
+    use_cache : bool, optional
+        Whether to read/write the sidecar cache of the frame offsets. Defaults to True.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, List[str], Optional[np.ndarray], Optional[List[bool]], Optional[bool], Optional[float]]
+        See 'parse_xyz_trajectory_file', for the selected frames only.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the trajectory file does not exist.
+    IndexError
+        If a frame index is out of range.
+    """
+    offsets = index_xyz_trajectory_file(trajectory_file_path, use_cache)
+    frame_count = offsets.shape[0] - 1
+    frame_indexes = np.asarray(frame_indexes, dtype=np.int64).reshape(-1)
+    if np.any((frame_indexes < 0) | (frame_indexes >= frame_count)):
+        raise IndexError(
+            f"Frame index out of range: {frame_indexes.tolist()} (total frames: {frame_count})"
+        )
+
+    lines = []
+    if frame_indexes.shape[0] > 0:
+        with trajectory_file_path.open("rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped_file:
+            for frame_index in frame_indexes:
+                lines.extend(
+                    mapped_file[offsets[frame_index] : offsets[frame_index + 1]]
+                    .decode()
+                    .splitlines()
+                )
+
+    return parse_xyz_lines(lines)
+
+
 # TODO: Add tests for this function
 @catch_errors_decorator
 def parse_extended_format(
@@ -183,15 +418,19 @@ def parse_extended_format(
         - PBC as an optional list of booleans.
         - Max force standard deviation as an optional float.
     """
-    lattice_regex = r"Lattice=\"((?:[-\d\.]+\s+){8}[-\d\.]+)\""
-    properties_regex = r"Properties=species:S:1:pos:R:3"
-    pbc_regex = r'pbc="([^"]*)"'
-    max_f_std_regex = r"max_f_std=([\d.]+)"
-
-    lattice_match = re.search(lattice_regex, comment_line)
-    properties_match = re.search(properties_regex, comment_line)
-    pbc_match = re.search(pbc_regex, comment_line)
-    max_f_std_match = re.search(max_f_std_regex, comment_line)
+    # The searches are skipped when the key is absent (plain XYZ comments)
+    lattice_match = (
+        LATTICE_PATTERN.search(comment_line) if "Lattice=" in comment_line else None
+    )
+    properties_match = (
+        PROPERTIES_PATTERN.search(comment_line)
+        if "Properties=" in comment_line
+        else None
+    )
+    pbc_match = PBC_PATTERN.search(comment_line) if "pbc=" in comment_line else None
+    max_f_std_match = (
+        MAX_F_STD_PATTERN.search(comment_line) if "max_f_std=" in comment_line else None
+    )
 
     lattice_values = (
         [float(value) for value in lattice_match.group(1).split()]
@@ -209,7 +448,7 @@ def parse_extended_format(
     return lattice_values, properties_present, pbc_values, max_f_std_value
 
 
-# TODO: Add tests for this function
+# Unittested
 @catch_errors_decorator
 def write_xyz_frame(
     trajectory_file_path: Path,
@@ -246,28 +485,103 @@ def write_xyz_frame(
         If the specified frame index is out of range.
     """
 
-    # Validate frame index
-    if frame_idx >= atom_counts.shape[0]:
-        raise IndexError(
-            f"Frame index out of range: {frame_idx} (total frames: {atom_counts.shape[0]})"
+    write_xyz_frames(
+        trajectory_file_path,
+        [frame_idx],
+        atom_counts,
+        atomic_symbols,
+        atomic_coordinates,
+        cell_info,
+        comments,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def write_xyz_frames(
+    trajectory_file_paths: Union[Path, List[Path]],
+    frame_indexes: List[int],
+    atom_counts: np.ndarray,
+    atomic_symbols: np.ndarray,
+    atomic_coordinates: np.ndarray,
+    cell_info: np.ndarray,
+    comments: List[str],
+    append: bool = False,
+) -> None:
+    """
+    Writes the XYZ coordinates of several frames of a trajectory, either in one multi-frame file or in one file per frame.
+
+    The frames are formatted as with 'write_xyz_frame', but each frame is formatted in a single operation (one format string for all its atoms).
+
+    Parameters
+    ----------
+    trajectory_file_paths : Union[Path, List[Path]]
+        The file where all the frames are written (in the order of frame_indexes), or one file per frame.
+    frame_indexes : List[int]
+        The indexes of the frames to write.
+    atom_counts : np.ndarray
+        An array containing the number of atoms in each frame of the trajectory.
+    atomic_symbols : np.ndarray
+        An array containing the atomic symbols for each atom in each frame of the trajectory.
+    atomic_coordinates : np.ndarray
+        An array containing the coordinates of each atom in each frame of the trajectory.
+    cell_info : np.ndarray
+        An array containing the cell lattice information for each frame.
+    comments : List[str]
+        A list of comments for each frame.
+    append : bool, optional
+        If True, the frames are appended to the file(s) instead of overwriting them. Defaults to False.
+
+    Raises
+    ------
+    IndexError
+        If a frame index is out of range.
+    ValueError
+        If the number of files does not match the number of frames.
+    """
+    frame_indexes = [int(_) for _ in frame_indexes]
+    atom_counts = np.asarray(atom_counts)
+    for frame_idx in frame_indexes:
+        if frame_idx >= atom_counts.shape[0]:
+            raise IndexError(
+                f"Frame index out of range: {frame_idx} (total frames: {atom_counts.shape[0]})"
+            )
+    is_single_file = isinstance(trajectory_file_paths, (str, Path))
+    if not is_single_file and len(trajectory_file_paths) != len(frame_indexes):
+        raise ValueError(
+            f"Mismatch between the number of files ({len(trajectory_file_paths)}) and of frames ({len(frame_indexes)})."
         )
 
-    # Start writing to the file
-    with trajectory_file_path.open("w") as file:
-        # Write the atom count for the frame
-        file.write(f"{atom_counts[frame_idx]}\n")
+    # Python lists of the selected frames (symbols, and x, y and z columns), formatted with one string per atom count
+    symbols = atomic_symbols[frame_indexes].tolist()
+    coordinates = np.transpose(atomic_coordinates[frame_indexes], (0, 2, 1)).tolist()
+    atom_formats = {}
 
-        # Write the comment line with cell information if available
+    def format_frame(position: int, frame_idx: int) -> str:
+        atom_count = int(atom_counts[frame_idx])
+        if atom_count not in atom_formats:
+            atom_formats[atom_count] = "%s %.6f %.6f %.6f\n" * atom_count
         if len(cell_info) > 0:
             cell_line = " ".join(map(str, cell_info[frame_idx]))
             comment_line = f'Lattice="{cell_line}" Properties=species:S:1:pos:R:3'
         else:
             comment_line = comments[frame_idx] if frame_idx < len(comments) else ""
-        file.write(f"{comment_line}\n")
-
-        # Write atomic symbols and coordinates for the frame
-        for atom_index in range(atom_counts[frame_idx]):
-            symbol = atomic_symbols[frame_idx, atom_index]
-            coords = atomic_coordinates[frame_idx, atom_index]
-            coords_line = " ".join(f"{coord:.6f}" for coord in coords)
-            file.write(f"{symbol} {coords_line}\n")
+        values = [None] * (4 * atom_count)
+        values[0::4] = symbols[position][:atom_count]
+        for axis in range(3):
+            values[axis + 1 :: 4] = coordinates[position][axis][:atom_count]
+        return f"{atom_counts[frame_idx]}\n{comment_line}\n" + atom_formats[
+            atom_count
+        ] % tuple(values)
+
+    mode = "a" if append else "w"
+    if is_single_file:
+        with Path(trajectory_file_paths).open(mode) as file:
+            for position, frame_idx in enumerate(frame_indexes):
+                file.write(format_frame(position, frame_idx))
+    else:
+        for position, (trajectory_file_path, frame_idx) in enumerate(
+            zip(trajectory_file_paths, frame_indexes)
+        ):
+            with Path(trajectory_file_path).open(mode) as file:
+                file.write(format_frame(position, frame_idx))
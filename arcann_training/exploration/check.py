@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -22,17 +22,16 @@ import numpy as np
 from arcann_training.common.json import (
     load_json_file,
     write_json_file,
-    get_key_in_dict,
     load_default_json_file,
     backup_and_overwrite_json_file,
 )
 from arcann_training.common.list import textfile_to_string_list, string_list_to_textfile
 from arcann_training.common.check import (
     validate_step_folder,
-    check_vmd,
     check_dcd_is_valid,
     check_nc_is_valid,
 )
+from arcann_training.common.lammps import write_cell_lengths_file
 
 
 def main(
@@ -123,16 +122,6 @@ def main(
         arcann_logger.error(f"Aborting...")
         return 1
 
-    # Check if the vmd package is installed
-    vmd_bin = check_vmd(
-        get_key_in_dict(
-            "vmd_path", user_input_json, previous_exploration_json, default_input_json
-        )
-    )
-    current_input_json["vmd_path"] = vmd_bin
-
-    exploration_json["vmd_path"] = vmd_bin
-
     # Check the normal termination of the exploration phase
     # Counters
     completed_count = 0
@@ -203,7 +192,7 @@ def main(
                         continue
 
                     # Check if DCD is unreadable
-                    if not check_dcd_is_valid(traj_file, vmd_bin):
+                    if not check_dcd_is_valid(traj_file):
                         (local_path / "skip").touch(exist_ok=True)
                         skipped_count += 1
                         exploration_json["systems_auto"][system_auto][
@@ -214,6 +203,12 @@ def main(
                         del lammps_output_file, traj_file, model_deviation_filename
                         continue
 
+                    # Compact cell lengths (one row per printed step, a single row if constant), read by extract
+                    if (local_path / "cell.txt").is_file():
+                        write_cell_lengths_file(
+                            local_path / "cell.txt", local_path / "cell_lengths.npy"
+                        )
+
                     # Check if output is valid (or forced)
                     lammps_output = textfile_to_string_list(lammps_output_file)
                     if (local_path / "force").is_file():
@@ -275,7 +270,7 @@ def main(
                         continue
 
                     # Check if NC is unreadable
-                    if not check_nc_is_valid(traj_file, vmd_bin):
+                    if not check_nc_is_valid(traj_file):
                         (local_path / "skip").touch(exist_ok=True)
                         skipped_count += 1
                         exploration_json["systems_auto"][system_auto][
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -120,6 +120,11 @@ def main(
     remove_files_matching_glob(current_path, "**/emle_port.txt")
     remove_files_matching_glob(current_path, "**/mdinfo")
     remove_files_matching_glob(current_path, "**/old.*")
+    arcann_logger.info("Deleting model deviation cache files...")
+    remove_files_matching_glob(current_path, "**/*.cache.npy")
+    remove_files_matching_glob(current_path, "**/*.cache.json")
+    arcann_logger.info("Deleting XYZ frame index files...")
+    remove_files_matching_glob(current_path, "**/*.xyz.index.npy")
 
     if prev_iter > 0:
         arcann_logger.info(f"Compressing into a bzip2 tar archive...")
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/08/05
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -21,16 +21,20 @@ import numpy as np
 from arcann_training.common.json import (
     load_json_file,
     write_json_file,
+    get_key_in_dict,
     load_default_json_file,
     backup_and_overwrite_json_file,
 )
 from arcann_training.common.check import validate_step_folder
+from arcann_training.common.utils import run_in_parallel
 from arcann_training.exploration.utils import (
-    get_last_frame_number,
+    compute_trajectory_deviation,
     generate_input_exploration_deviation_json,
+    get_minimum_deviation_index,
     get_system_deviation,
+    select_system_candidates,
+    write_qbc_store_file,
 )
-from arcann_training.common.xyz import parse_xyz_trajectory_file
 
 
 def main(
@@ -136,6 +140,23 @@ def main(
     )
     arcann_logger.debug(f"current_input_json: {current_input_json}")
 
+    # Number of worker processes, block size (0: whole file in memory) for the deviation analysis and legacy per-trajectory JSON export
+    for key in ["nb_jobs", "deviation_chunk_size", "write_qbc_json"]:
+        current_input_json[key] = get_key_in_dict(
+            key,
+            user_input_json if key in user_input_json else current_input_json,
+            previous_exploration_json,
+            default_input_json,
+        )
+    nb_jobs = current_input_json["nb_jobs"]
+    deviation_chunk_size = current_input_json["deviation_chunk_size"]
+    arcann_logger.debug(f"nb_jobs: {nb_jobs}")
+    write_qbc_json = current_input_json["write_qbc_json"]
+    arcann_logger.debug(f"deviation_chunk_size: {deviation_chunk_size}")
+    arcann_logger.debug(f"write_qbc_json: {write_qbc_json}")
+
+    # Gather the trajectories of every system, so they can be analyzed by a pool of workers
+    trajectories = []
     for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
         # Set the system params for deviation selection
         (
@@ -144,6 +165,8 @@ def main(
             sigma_high,
             sigma_high_limit,
             ignore_first_x_ps,
+            selection_strategy,
+            allocation_objective,
         ) = get_system_deviation(current_input_json, system_auto_index)
 
         # Initialize
@@ -154,6 +177,8 @@ def main(
             "sigma_high": sigma_high,
             "sigma_high_limit": sigma_high_limit,
             "ignore_first_x_ps": ignore_first_x_ps,
+            "selection_strategy": selection_strategy,
+            "allocation_objective": allocation_objective,
             "mean_deviation_max_f": 0,
             "median_deviation_max_f": 0,
             "stdeviation_deviation_max_f": 0,
@@ -162,8 +187,6 @@ def main(
             "rejected_count": 0,
         }
 
-        skipped_traj_user = 0
-        skipped_traj_stats = 0
         start_row_number = 0
 
         arcann_logger.debug(
@@ -194,12 +217,21 @@ def main(
             )
             arcann_logger.warning(f"Temporarily setting it to 0.")
 
+        # Get the number of exptected steps
+        nb_steps_expected = (
+            (
+                exploration_json["systems_auto"][system_auto]["nb_steps"]
+                // exploration_json["systems_auto"][system_auto]["print_every_x_steps"]
+            )
+            + 1
+            - start_row_number
+        )
+        arcann_logger.debug(f"nb_steps_expected: {nb_steps_expected}")
+
         for it_nnp in range(1, main_json["nnp_count"] + 1):
             for it_number in range(
                 1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1
             ):
-                arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
-
                 # Get the local path and the name of model_deviation file
                 local_path = (
                     Path(".").resolve()
@@ -212,515 +244,137 @@ def main(
                 )
                 xyz_qm_filename = f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
 
-                # Create the JSON data for Query-by-Committee
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", False, False)
-                QbC_indexes = load_json_file(
-                    local_path / "QbC_indexes.json", False, False
-                )
-                QbC_stats = {
-                    **QbC_stats,
-                    "sigma_low": sigma_low,
-                    "sigma_high": sigma_high,
-                    "sigma_high_limit": sigma_high_limit,
-                }
-
-                # Get the number of exptected steps
-                nb_steps_expected = (
+                trajectories.append(
                     (
-                        exploration_json["systems_auto"][system_auto]["nb_steps"]
-                        // exploration_json["systems_auto"][system_auto][
-                            "print_every_x_steps"
-                        ]
-                    )
-                    + 1
-                    - start_row_number
-                )
-                arcann_logger.debug(f"nb_steps_expected: {nb_steps_expected}")
-
-                # If it was not skipped
-                if not (local_path / "skip").is_file():
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
+                        system_auto,
+                        it_nnp,
+                        it_number,
                         (
-                            num_atoms,
-                            atom_symbols,
-                            atom_coords,
-                            comments,
-                            cell_info,
-                            pbc_info,
-                            properties_info,
-                            max_f_std_info,
-                        ) = parse_xyz_trajectory_file(local_path / xyz_qm_filename)
-                        model_deviation = np.vstack(
-                            (
-                                [
-                                    _
-                                    for _ in range(
-                                        0,
-                                        len(max_f_std_info),
-                                        exploration_json["systems_auto"][system_auto][
-                                            "print_every_x_steps"
-                                        ],
-                                    )
-                                ],
-                                max_f_std_info,
-                            )
-                        ).T
-                        total_row_number = len(max_f_std_info)
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        model_deviation = np.genfromtxt(
-                            str(local_path / model_deviation_filename)
-                        )
-                        if (
+                            local_path,
                             exploration_json["systems_auto"][system_auto][
                                 "exploration_type"
-                            ]
-                            == "lammps"
-                        ):
-                            total_row_number = model_deviation.shape[0]
-                        elif (
+                            ],
+                            model_deviation_filename,
+                            xyz_qm_filename,
                             exploration_json["systems_auto"][system_auto][
-                                "exploration_type"
-                            ]
-                            == "i-PI"
-                        ):
-                            total_row_number = model_deviation.shape[0] + 1
-                    else:
-                        arcann_logger.error(
-                            "Unknown exploration type. Please BUG REPORT!"
-                        )
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    if nb_steps_expected > (total_row_number - start_row_number):
-                        QbC_stats["total_count"] = nb_steps_expected
-                        arcann_logger.critical(
-                            f"Exploration '{system_auto}' / '{it_nnp}' / '{it_number}'."
-                        )
-                        arcann_logger.critical(
-                            f"Mismatch between expected ('{nb_steps_expected}') number of steps."
-                        )
-                        arcann_logger.critical(
-                            f"and actual ('{total_row_number - start_row_number}') number of steps in the deviation file."
-                        )
-                        if (local_path / "force").is_file():
-                            arcann_logger.warning(
-                                "but it has been forced, so it should be ok."
-                            )
-                    elif nb_steps_expected == (total_row_number - start_row_number):
-                        QbC_stats["total_count"] = total_row_number - start_row_number
-                    else:
-                        arcann_logger.error("Unknown error. Please BUG REPORT!")
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    end_row_number = get_last_frame_number(
-                        model_deviation,
-                        sigma_high_limit,
-                        exploration_json["systems_auto"][system_auto][
-                            "disturbed_start"
-                        ],
-                    )
-
-                    if (local_path / "force").is_file():
-                        end_row_number = model_deviation.shape[0] - 1
-
-                    arcann_logger.debug(
-                        f"end_row_number: {end_row_number}, start_row_number: {start_row_number}"
+                                "print_every_x_steps"
+                            ],
+                            start_row_number,
+                            nb_steps_expected,
+                            sigma_low,
+                            sigma_high,
+                            sigma_high_limit,
+                            exploration_json["systems_auto"][system_auto][
+                                "disturbed_start"
+                            ],
+                            deviation_chunk_size,
+                            False,
+                        ),
                     )
+                )
+                del local_path, model_deviation_filename, xyz_qm_filename
+            del it_number
+        del it_nnp
+        del (
+            max_candidates,
+            sigma_low,
+            sigma_high,
+            sigma_high_limit,
+            ignore_first_x_ps,
+            selection_strategy,
+            allocation_objective,
+            start_row_number,
+            nb_steps_expected,
+        )
 
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-
-                        # This part is when sigma_high_limit was never crossed
-                        if end_row_number < 0:
-                            mean_deviation_max_f = np.mean(
-                                model_deviation[start_row_number:, 4]
-                            )
-                            median_deviation_max_f = np.median(
-                                model_deviation[start_row_number:, 4]
-                            )
-                            stdeviation_deviation_max_f = np.std(
-                                model_deviation[start_row_number:, 4]
-                            )
-                            good = model_deviation[start_row_number:, :][
-                                model_deviation[start_row_number:, 4] <= sigma_low
-                            ]
-                            rejected = model_deviation[start_row_number:, :][
-                                model_deviation[start_row_number:, 4] >= sigma_high
-                            ]
-                            candidates = model_deviation[start_row_number:, :][
-                                (model_deviation[start_row_number:, 4] > sigma_low)
-                                & (model_deviation[start_row_number:, 4] < sigma_high)
-                            ]
-
-                        # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
-                        elif end_row_number <= start_row_number:
-                            mean_deviation_max_f = 999.0
-                            median_deviation_max_f = 999.0
-                            stdeviation_deviation_max_f = 999.0
-                            good = np.array([])
-                            rejected = model_deviation[start_row_number:, :]
-                            candidates = np.array([])
-                            # In this case, it is skipped
-                            skipped_traj_stats += 1
-
-                        # This part is when sigma_high_limit was crossed (Gets stats before)
-                        else:
-                            mean_deviation_max_f = np.mean(
-                                model_deviation[start_row_number:end_row_number, 4]
-                            )
-                            median_deviation_max_f = np.median(
-                                model_deviation[start_row_number:end_row_number, 4]
-                            )
-                            stdeviation_deviation_max_f = np.std(
-                                model_deviation[start_row_number:end_row_number, 4]
-                            )
-                            good = model_deviation[start_row_number:end_row_number, :][
-                                model_deviation[start_row_number:end_row_number, 4]
-                                <= sigma_low
-                            ]
-                            rejected = model_deviation[
-                                start_row_number:end_row_number, :
-                            ][
-                                model_deviation[start_row_number:end_row_number, 4]
-                                >= sigma_high
-                            ]
-                            candidates = model_deviation[
-                                start_row_number:end_row_number, :
-                            ][
-                                (
-                                    model_deviation[start_row_number:end_row_number, 4]
-                                    > sigma_low
-                                )
-                                & (
-                                    model_deviation[start_row_number:end_row_number, 4]
-                                    < sigma_high
-                                )
-                            ]
-                            # Add the rest to rejected
-                            rejected = np.vstack(
-                                (rejected, model_deviation[end_row_number:, :])
-                            )
-
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-
-                        # This part is when sigma_high_limit was never crossed
-                        if end_row_number < 0:
-                            mean_deviation_max_f = np.mean(
-                                model_deviation[start_row_number:]
-                            )
-                            median_deviation_max_f = np.median(
-                                model_deviation[start_row_number:]
-                            )
-                            stdeviation_deviation_max_f = np.std(
-                                model_deviation[start_row_number:]
-                            )
-                            good = model_deviation[start_row_number:, :][
-                                model_deviation[start_row_number:, 1] <= sigma_low
-                            ]
-                            rejected = model_deviation[start_row_number:, :][
-                                model_deviation[start_row_number:, 1] >= sigma_high
-                            ]
-                            candidates = model_deviation[start_row_number:, :][
-                                (model_deviation[start_row_number:, 1] > sigma_low)
-                                & (model_deviation[start_row_number:, 1] < sigma_high)
-                            ]
-
-                        # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
-                        elif end_row_number <= start_row_number:
-                            mean_deviation_max_f = 999.0
-                            median_deviation_max_f = 999.0
-                            stdeviation_deviation_max_f = 999.0
-                            good = np.array([])
-                            rejected = model_deviation[start_row_number:, :]
-                            candidates = np.array([])
-                            # In this case, it is skipped
-                            skipped_traj_stats += 1
-
-                        # This part is when sigma_high_limit was crossed (Gets stats before)
-                        else:
-                            mean_deviation_max_f = np.mean(
-                                model_deviation[start_row_number:end_row_number]
-                            )
-                            median_deviation_max_f = np.median(
-                                model_deviation[start_row_number:end_row_number]
-                            )
-                            stdeviation_deviation_max_f = np.std(
-                                model_deviation[start_row_number:end_row_number]
-                            )
-                            good = model_deviation[start_row_number:end_row_number][
-                                model_deviation[start_row_number:end_row_number]
-                                <= sigma_low
-                            ]
-                            rejected = model_deviation[start_row_number:end_row_number][
-                                model_deviation[start_row_number:end_row_number]
-                                >= sigma_high
-                            ]
-                            candidates = model_deviation[
-                                start_row_number:end_row_number
-                            ][
-                                (
-                                    model_deviation[start_row_number:end_row_number]
-                                    > sigma_low
-                                )
-                                & (
-                                    model_deviation[start_row_number:end_row_number]
-                                    < sigma_high
-                                )
-                            ]
-                            # Add the rest to rejected
-                            rejected = np.vstack(
-                                (rejected, model_deviation[end_row_number:, :])
-                            )
-                    else:
-                        arcann_logger.error(
-                            "Unknown exploration type. Please BUG REPORT!"
-                        )
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    # Fill JSON files
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-                        QbC_indexes = {
-                            **QbC_indexes,
-                            "good_indexes": (
-                                good[:, 0].astype(int).tolist() if good.size > 0 else []
-                            ),
-                            "rejected_indexes": (
-                                rejected[:, 0].astype(int).tolist()
-                                if rejected.size > 0
-                                else []
-                            ),
-                            "candidate_indexes": (
-                                candidates[:, 0].astype(int).tolist()
-                                if candidates.size > 0
-                                else []
-                            ),
-                        }
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        QbC_indexes = {
-                            **QbC_indexes,
-                            "good_indexes": (
-                                good[:, 0].astype(int).tolist() if good.size > 0 else []
-                            ),
-                            "rejected_indexes": (
-                                rejected[:, 0].astype(int).tolist()
-                                if rejected.size > 0
-                                else []
-                            ),
-                            "candidate_indexes": (
-                                candidates[:, 0].astype(int).tolist()
-                                if candidates.size > 0
-                                else []
-                            ),
-                        }
-                    else:
-                        arcann_logger.error(
-                            "Unknown exploration type. Please BUG REPORT!"
-                        )
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-                        QbC_stats = {
-                            **QbC_stats,
-                            "mean_deviation_max_f": mean_deviation_max_f,
-                            "median_deviation_max_f": median_deviation_max_f,
-                            "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
-                            "good_count": (
-                                len(good.astype(int).tolist()) if good.size > 0 else 0
-                            ),
-                            "rejected_count": (
-                                len(rejected.astype(int).tolist())
-                                if rejected.size > 0
-                                else 0
-                            ),
-                            "candidates_count": (
-                                len(candidates.astype(int).tolist())
-                                if candidates.size > 0
-                                else 0
-                            ),
-                        }
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        QbC_stats = {
-                            **QbC_stats,
-                            "mean_deviation_max_f": mean_deviation_max_f,
-                            "median_deviation_max_f": median_deviation_max_f,
-                            "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
-                            "good_count": (
-                                len(good[:, 0].astype(int).tolist())
-                                if good.size > 0
-                                else 0
-                            ),
-                            "rejected_count": (
-                                len(rejected[:, 0].astype(int).tolist())
-                                if rejected.size > 0
-                                else 0
-                            ),
-                            "candidates_count": (
-                                len(candidates[:, 0].astype(int).tolist())
-                                if candidates.size > 0
-                                else 0
-                            ),
-                        }
-                    else:
-                        arcann_logger.error(
-                            "Unknown exploration type. Please BUG REPORT!"
-                        )
-                        arcann_logger.error("Aborting...")
-                        return 1
-
-                    # If the traj is smaller than expected (forced case) add the missing as rejected
-                    if (
-                        QbC_stats["good_count"]
-                        + QbC_stats["rejected_count"]
-                        + QbC_stats["candidates_count"]
-                    ) < nb_steps_expected:
-                        QbC_stats["rejected_count"] = (
-                            QbC_stats["rejected_count"]
-                            + nb_steps_expected
-                            - (
-                                QbC_stats["good_count"]
-                                + QbC_stats["rejected_count"]
-                                + QbC_stats["candidates_count"]
-                            )
-                        )
-
-                    # Only if we have corect stats, add it
-                    if (end_row_number > start_row_number) or (end_row_number == -1):
-                        exploration_json["systems_auto"][system_auto][
-                            "mean_deviation_max_f"
-                        ] = (
-                            exploration_json["systems_auto"][system_auto][
-                                "mean_deviation_max_f"
-                            ]
-                            + QbC_stats["mean_deviation_max_f"]
-                        )
-                        exploration_json["systems_auto"][system_auto][
-                            "median_deviation_max_f"
-                        ] = (
-                            exploration_json["systems_auto"][system_auto][
-                                "median_deviation_max_f"
-                            ]
-                            + QbC_stats["median_deviation_max_f"]
-                        )
-                        exploration_json["systems_auto"][system_auto][
-                            "stdeviation_deviation_max_f"
-                        ] = (
-                            exploration_json["systems_auto"][system_auto][
-                                "stdeviation_deviation_max_f"
-                            ]
-                            + QbC_stats["stdeviation_deviation_max_f"]
-                        )
-                    del end_row_number
+    del system_auto_index, system_auto
 
-                else:
-                    # If the trajectory was used skiped, count everything as a failure
-                    skipped_traj_user = skipped_traj_user + 1
-                    # Fill JSON files
-                    QbC_indexes = {
-                        **QbC_indexes,
-                        "good_indexes": [],
-                        "rejected_indexes": [],
-                        "candidate_indexes": [],
-                    }
+    # Analyze the trajectories (the QbC data is written once, after the selection)
+    arcann_logger.info(
+        f"Analyzing {len(trajectories)} trajectories with {nb_jobs if nb_jobs > 0 else 'all available'} job(s)."
+    )
+    trajectories_results = run_in_parallel(
+        compute_trajectory_deviation,
+        [_[3] for _ in trajectories],
+        nb_jobs,
+    )
 
-                    QbC_stats = {
-                        **QbC_stats,
-                        "total_count": nb_steps_expected,
-                        "mean_deviation_max_f": 999.0,
-                        "median_deviation_max_f": 999.0,
-                        "stdeviation_deviation_max_f": 999.0,
-                        "good_count": 0,
-                        "rejected_count": nb_steps_expected,
-                        "candidates_count": 0,
-                    }
+    # Reduce the per-trajectory results (in the same order as the serial loop)
+    # The QbC data and the deviation of the candidates are kept in memory for the selection
+    trajectories_QbC = {}
+    skipped_traj_user = {system_auto: 0 for system_auto in main_json["systems_auto"]}
+    skipped_traj_stats = {system_auto: 0 for system_auto in main_json["systems_auto"]}
+    for (system_auto, it_nnp, it_number, trajectory_args), (
+        QbC_stats,
+        is_skipped_user,
+        is_skipped_stats,
+        row_count,
+        trajectory_candidate_deviations,
+        QbC_indexes,
+    ) in zip(trajectories, trajectories_results):
+        arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
+        local_path = trajectory_args[0]
+        nb_steps_expected = trajectory_args[6]
+        trajectories_QbC[(system_auto, it_nnp, it_number)] = (
+            QbC_stats,
+            QbC_indexes,
+            trajectory_candidate_deviations,
+            is_skipped_user,
+        )
 
-                exploration_json["systems_auto"][system_auto]["total_count"] = (
-                    exploration_json["systems_auto"][system_auto]["total_count"]
-                    + QbC_stats["total_count"]
+        if is_skipped_user:
+            skipped_traj_user[system_auto] += 1
+        else:
+            if nb_steps_expected > row_count:
+                arcann_logger.critical(
+                    f"Exploration '{system_auto}' / '{it_nnp}' / '{it_number}'."
                 )
-                exploration_json["systems_auto"][system_auto]["candidates_count"] = (
-                    exploration_json["systems_auto"][system_auto]["candidates_count"]
-                    + QbC_stats["candidates_count"]
+                arcann_logger.critical(
+                    f"Mismatch between expected ('{nb_steps_expected}') number of steps."
                 )
-                exploration_json["systems_auto"][system_auto]["rejected_count"] = (
-                    exploration_json["systems_auto"][system_auto]["rejected_count"]
-                    + QbC_stats["rejected_count"]
+                arcann_logger.critical(
+                    f"and actual ('{row_count}') number of steps in the deviation file."
                 )
+                if (local_path / "force").is_file():
+                    arcann_logger.warning("but it has been forced, so it should be ok.")
+
+            # Only if we have corect stats, add it
+            if is_skipped_stats:
+                skipped_traj_stats[system_auto] += 1
+            else:
+                for key in [
+                    "mean_deviation_max_f",
+                    "median_deviation_max_f",
+                    "stdeviation_deviation_max_f",
+                ]:
+                    exploration_json["systems_auto"][system_auto][key] = (
+                        exploration_json["systems_auto"][system_auto][key]
+                        + QbC_stats[key]
+                    )
 
-                write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
-                write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
-                del (
-                    local_path,
-                    model_deviation_filename,
-                    QbC_stats,
-                    QbC_indexes,
-                    nb_steps_expected,
-                )
+        for key in ["total_count", "candidates_count", "rejected_count"]:
+            exploration_json["systems_auto"][system_auto][key] = (
+                exploration_json["systems_auto"][system_auto][key] + QbC_stats[key]
+            )
 
-            del it_number
+        del (
+            local_path,
+            nb_steps_expected,
+            QbC_stats,
+            is_skipped_user,
+            is_skipped_stats,
+            row_count,
+            trajectory_candidate_deviations,
+            QbC_indexes,
+        )
+    del trajectories, trajectories_results
 
+    for system_auto in main_json["systems_auto"]:
         # Average for the system (with adjustment, remove the skipped ones)
         exploitable_traj = (
             exploration_json["nnp_count"]
             * exploration_json["systems_auto"][system_auto]["traj_count"]
-        ) - (skipped_traj_user + skipped_traj_stats)
+        ) - (skipped_traj_user[system_auto] + skipped_traj_stats[system_auto])
         if exploitable_traj == 0:
             arcann_logger.critical(
                 "All trajectories were skipped (either by you or discarded by ArcaNN)."
@@ -745,35 +399,18 @@ def main(
                 arcann_logger.warning(
                     "Less than 25% of your exploration trajectories are exploitable. Be careful for the next one."
                 )
-            exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"] = (
-                exploration_json["systems_auto"][system_auto]["mean_deviation_max_f"]
-                / exploitable_traj
-            )
-            exploration_json["systems_auto"][system_auto]["median_deviation_max_f"] = (
-                exploration_json["systems_auto"][system_auto]["median_deviation_max_f"]
-                / exploitable_traj
-            )
-            exploration_json["systems_auto"][system_auto][
-                "stdeviation_deviation_max_f"
-            ] = (
-                exploration_json["systems_auto"][system_auto][
-                    "stdeviation_deviation_max_f"
-                ]
-                / exploitable_traj
-            )
-
-        del it_nnp
-        del (
-            max_candidates,
-            sigma_low,
-            sigma_high,
-            sigma_high_limit,
-            ignore_first_x_ps,
-            skipped_traj_user,
-            start_row_number,
-        )
+            for key in [
+                "mean_deviation_max_f",
+                "median_deviation_max_f",
+                "stdeviation_deviation_max_f",
+            ]:
+                exploration_json["systems_auto"][system_auto][key] = (
+                    exploration_json["systems_auto"][system_auto][key]
+                    / exploitable_traj
+                )
+        del exploitable_traj
 
-    del system_auto_index, system_auto
+    del skipped_traj_user, skipped_traj_stats
 
     exploration_json["total_simulation_time_ps"] = 0
     exploration_json["total_count"] = 0
@@ -782,6 +419,8 @@ def main(
     exploration_json["selected_count"] = 0
     exploration_json["discarded_count"] = 0
 
+    # QbC data of every trajectory, written in a single store (control/QbC_XXX.npz)
+    QbC_data = {}
     for system_auto_index, system_auto in enumerate(exploration_json["systems_auto"]):
         # Set the system params for deviation selection
         (
@@ -790,6 +429,8 @@ def main(
             sigma_high,
             sigma_high_limit,
             ignore_first_x_ps,
+            selection_strategy,
+            allocation_objective,
         ) = get_system_deviation(current_input_json, system_auto_index)
 
         # Initialize
@@ -799,201 +440,215 @@ def main(
             "discarded_count": 0,
         }
 
-        for it_nnp in range(1, main_json["nnp_count"] + 1):
+        # In-memory table of all the candidates of the system (trajectory, frame id, deviation)
+        system_trajectories = [
+            (it_nnp, it_number)
+            for it_nnp in range(1, main_json["nnp_count"] + 1)
             for it_number in range(
                 1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1
-            ):
-                # Get the local path and the name of model_deviation file
-                local_path = (
-                    Path(".").resolve()
-                    / str(system_auto)
-                    / str(it_nnp)
-                    / str(it_number).zfill(5)
-                )
+            )
+        ]
+        candidate_tables = [
+            np.array(
+                trajectories_QbC[(system_auto, it_nnp, it_number)][1][
+                    "candidate_indexes"
+                ],
+                dtype=np.int64,
+            )
+            for it_nnp, it_number in system_trajectories
+        ]
+        candidate_offsets = np.concatenate(
+            ([0], np.cumsum([_.shape[0] for _ in candidate_tables]))
+        )
 
-                model_deviation_filename = (
-                    f"model_devi_{system_auto}_{it_nnp}_{padded_curr_iter}.out"
-                )
-                xyz_qm_filename = f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
+        # Selection of candidates for the whole system in one step (seeded, so a rerun gives the same selection)
+        is_selected, candidate_quotas = select_system_candidates(
+            np.repeat(
+                np.arange(len(system_trajectories)),
+                [_.shape[0] for _ in candidate_tables],
+            ),
+            np.concatenate(candidate_tables),
+            np.concatenate(
+                [
+                    trajectories_QbC[(system_auto, it_nnp, it_number)][2]
+                    for it_nnp, it_number in system_trajectories
+                ]
+            ),
+            len(system_trajectories),
+            max_candidates,
+            allocation_objective,
+            selection_strategy,
+            [
+                [curr_iter, system_auto_index, it_nnp, it_number]
+                for it_nnp, it_number in system_trajectories
+            ],
+        )
 
-                # Create the JSON data for Query-by-Committee
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", True, False)
-                QbC_indexes = load_json_file(
-                    local_path / "QbC_indexes.json", True, False
-                )
+        for trajectory_index, (it_nnp, it_number) in enumerate(system_trajectories):
+            # Get the local path
+            local_path = (
+                Path(".").resolve()
+                / str(system_auto)
+                / str(it_nnp)
+                / str(it_number).zfill(5)
+            )
+
+            QbC_stats, QbC_indexes, trajectory_candidate_deviations, is_skipped_user = (
+                trajectories_QbC[(system_auto, it_nnp, it_number)]
+            )
 
-                # If it was not skipped
-                if not (local_path / "skip").is_file():
-                    # If candidates_count is over max_candidates
-                    if (
-                        exploration_json["systems_auto"][system_auto][
+            # If it was not skipped
+            if not is_skipped_user:
+                # If candidates_count is over max_candidates
+                if (
+                    exploration_json["systems_auto"][system_auto]["candidates_count"]
+                    <= max_candidates
+                ):
+                    selection_factor = 1
+                else:
+                    selection_factor = (
+                        QbC_stats["candidates_count"]
+                        / exploration_json["systems_auto"][system_auto][
                             "candidates_count"
                         ]
-                        <= max_candidates
-                    ):
-                        selection_factor = 1
-                    else:
-                        selection_factor = (
-                            QbC_stats["candidates_count"]
-                            / exploration_json["systems_auto"][system_auto][
-                                "candidates_count"
-                            ]
-                        )
-
-                    # Get the local max_candidates
-                    QbC_stats["selection_factor"] = selection_factor
-                    max_candidates_local = int(
-                        np.ceil(max_candidates * selection_factor)
                     )
 
-                    if selection_factor == 1:
-                        QbC_stats["max_candidates_local"] = -1
-                    else:
-                        QbC_stats["max_candidates_local"] = max_candidates_local
-
-                    candidate_indexes = np.array(QbC_indexes["candidate_indexes"])
+                # Get the local max_candidates
+                QbC_stats["selection_factor"] = selection_factor
 
-                    # Selection of candidates (as linearly as possible, keeping the first and the last ones)
-                    if len(candidate_indexes) > max_candidates_local:
-                        selected_indexes = candidate_indexes[
-                            np.round(
-                                np.linspace(
-                                    0, len(candidate_indexes) - 1, max_candidates_local
-                                )
-                            ).astype(int)
-                        ]
-                    else:
-                        selected_indexes = candidate_indexes
-                    discarded_indexes = np.setdiff1d(
-                        candidate_indexes, selected_indexes
+                if selection_factor == 1:
+                    QbC_stats["max_candidates_local"] = -1
+                else:
+                    QbC_stats["max_candidates_local"] = int(
+                        candidate_quotas[trajectory_index]
                     )
 
-                    QbC_indexes = {
-                        **QbC_indexes,
-                        "selected_indexes": (
-                            selected_indexes.astype(int).tolist()
-                            if selected_indexes.size > 0
-                            else []
-                        ),
-                        "discarded_indexes": (
-                            discarded_indexes.astype(int).tolist()
-                            if discarded_indexes.size > 0
-                            else []
-                        ),
-                    }
-                    QbC_stats = {
-                        **QbC_stats,
-                        "selected_count": (
-                            len(selected_indexes.astype(int).tolist())
-                            if selected_indexes.size > 0
-                            else 0
-                        ),
-                        "discarded_count": (
-                            len(discarded_indexes.astype(int).tolist())
-                            if discarded_indexes.size > 0
-                            else 0
-                        ),
-                    }
-
-                    # Now we get the starting point (the min of selected, or the last good)
-                    # Min of selected
-                    if selected_indexes.shape[0] > 0:
-                        if (
-                            exploration_json["systems_auto"][system_auto][
-                                "exploration_type"
-                            ]
-                            == "sander_emle"
-                        ):
-                            (
-                                num_atoms,
-                                atom_symbols,
-                                atom_coords,
-                                comments,
-                                cell_info,
-                                pbc_info,
-                                properties_info,
-                                max_f_std_info,
-                            ) = parse_xyz_trajectory_file(local_path / xyz_qm_filename)
-                            model_deviation = np.array(max_f_std_info)
-                        elif (
-                            exploration_json["systems_auto"][system_auto][
-                                "exploration_type"
-                            ]
-                            == "lammps"
-                            or exploration_json["systems_auto"][system_auto][
-                                "exploration_type"
-                            ]
-                            == "i-PI"
-                        ):
-                            model_deviation = np.genfromtxt(
-                                str(local_path / model_deviation_filename)
-                            )
-                        min_val = 1e30
-                        for selected_idx in selected_indexes:
-                            if (
-                                exploration_json["systems_auto"][system_auto][
-                                    "exploration_type"
-                                ]
-                                == "sander_emle"
-                            ):
-                                temp_min = model_deviation[selected_idx]
-                            else:
-                                temp_min = model_deviation[:, 4][
-                                    np.where(model_deviation[:, 0] == selected_idx)
-                                ]
-                            if temp_min < min_val:
-                                min_val = temp_min
-                                min_index = selected_idx
-                        QbC_stats["minimum_index"] = int(min_index)
-                    # Last of good
-                    elif len(QbC_indexes["good_indexes"]) > 0:
-                        QbC_stats["minimum_index"] = int(
-                            QbC_indexes["good_indexes"][-1]
-                        )
-                    # Nothing
-                    else:
-                        QbC_stats["minimum_index"] = -1
+                candidate_indexes = candidate_tables[trajectory_index]
+                selected_indexes = candidate_indexes[
+                    is_selected[
+                        candidate_offsets[trajectory_index] : candidate_offsets[
+                            trajectory_index + 1
+                        ]
+                    ]
+                ]
+                discarded_indexes = np.setdiff1d(candidate_indexes, selected_indexes)
+
+                QbC_indexes = {
+                    **QbC_indexes,
+                    "selected_indexes": (
+                        selected_indexes.astype(int).tolist()
+                        if selected_indexes.size > 0
+                        else []
+                    ),
+                    "discarded_indexes": (
+                        discarded_indexes.astype(int).tolist()
+                        if discarded_indexes.size > 0
+                        else []
+                    ),
+                }
+                QbC_stats = {
+                    **QbC_stats,
+                    "selected_count": (
+                        len(selected_indexes.astype(int).tolist())
+                        if selected_indexes.size > 0
+                        else 0
+                    ),
+                    "discarded_count": (
+                        len(discarded_indexes.astype(int).tolist())
+                        if discarded_indexes.size > 0
+                        else 0
+                    ),
+                }
 
+                # Now we get the starting point (the min of selected, or the last good)
+                # Min of selected
+                if selected_indexes.shape[0] > 0:
+                    QbC_stats["minimum_index"] = get_minimum_deviation_index(
+                        candidate_indexes,
+                        trajectory_candidate_deviations,
+                        selected_indexes,
+                    )
+                # Last of good
+                elif len(QbC_indexes["good_indexes"]) > 0:
+                    QbC_stats["minimum_index"] = int(QbC_indexes["good_indexes"][-1])
+                # Nothing
                 else:
-                    QbC_indexes = {
-                        **QbC_indexes,
-                        "selected_indexes": [],
-                        "discarded_indexes": [],
-                    }
-                    QbC_stats = {
-                        **QbC_stats,
-                        "selection_factor": 0,
-                        "max_candidates_local": 0,
-                        "selected_count": 0,
-                        "discarded_count": 0,
-                        "minimum_index": -1,
-                    }
+                    QbC_stats["minimum_index"] = -1
 
-                exploration_json["systems_auto"][system_auto][
-                    "selected_count"
-                ] += QbC_stats["selected_count"]
-                exploration_json["systems_auto"][system_auto][
-                    "discarded_count"
-                ] += QbC_stats["discarded_count"]
+            else:
+                QbC_indexes = {
+                    **QbC_indexes,
+                    "selected_indexes": [],
+                    "discarded_indexes": [],
+                }
+                QbC_stats = {
+                    **QbC_stats,
+                    "selection_factor": 0,
+                    "max_candidates_local": 0,
+                    "selected_count": 0,
+                    "discarded_count": 0,
+                    "minimum_index": -1,
+                }
 
-                exploration_json["total_simulation_time_ps"] += (
-                    exploration_json["systems_auto"][system_auto]["nb_steps"]
-                    * exploration_json["systems_auto"][system_auto]["timestep_ps"]
-                )
-                exploration_json["total_count"] += QbC_stats["total_count"]
-                exploration_json["candidates_count"] += QbC_stats["candidates_count"]
-                exploration_json["rejected_count"] += QbC_stats["rejected_count"]
-                exploration_json["selected_count"] += QbC_stats["selected_count"]
-                exploration_json["discarded_count"] += QbC_stats["discarded_count"]
+            exploration_json["systems_auto"][system_auto][
+                "selected_count"
+            ] += QbC_stats["selected_count"]
+            exploration_json["systems_auto"][system_auto][
+                "discarded_count"
+            ] += QbC_stats["discarded_count"]
 
-                write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
-                write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
-                del local_path, model_deviation_filename, QbC_stats, QbC_indexes
-            del it_number
-        del it_nnp
+            exploration_json["total_simulation_time_ps"] += (
+                exploration_json["systems_auto"][system_auto]["nb_steps"]
+                * exploration_json["systems_auto"][system_auto]["timestep_ps"]
+            )
+            exploration_json["total_count"] += QbC_stats["total_count"]
+            exploration_json["candidates_count"] += QbC_stats["candidates_count"]
+            exploration_json["rejected_count"] += QbC_stats["rejected_count"]
+            exploration_json["selected_count"] += QbC_stats["selected_count"]
+            exploration_json["discarded_count"] += QbC_stats["discarded_count"]
+
+            QbC_data[(system_auto, it_nnp, it_number)] = (QbC_stats, QbC_indexes)
+            # Legacy JSON files: updated as before (the keys of a previous run are kept in them only)
+            if write_qbc_json:
+                for QbC_data_json, QbC_filename in [
+                    (QbC_stats, "QbC_stats.json"),
+                    (QbC_indexes, "QbC_indexes.json"),
+                ]:
+                    write_json_file(
+                        {
+                            **load_json_file(local_path / QbC_filename, False, False),
+                            **QbC_data_json,
+                        },
+                        local_path / QbC_filename,
+                        False,
+                    )
+                del QbC_data_json, QbC_filename
+            del (
+                local_path,
+                QbC_stats,
+                QbC_indexes,
+                trajectory_candidate_deviations,
+                is_skipped_user,
+            )
+        del trajectory_index, it_nnp, it_number
+        del system_trajectories, candidate_tables, candidate_offsets
+        del is_selected, candidate_quotas
 
-        del max_candidates, sigma_low, sigma_high, sigma_high_limit, ignore_first_x_ps
+        del (
+            max_candidates,
+            sigma_low,
+            sigma_high,
+            sigma_high_limit,
+            ignore_first_x_ps,
+            selection_strategy,
+            allocation_objective,
+        )
     del system_auto_index, system_auto
+    del trajectories_QbC
+
+    write_qbc_store_file(QbC_data, control_path / f"QbC_{padded_curr_iter}.npz")
+    arcann_logger.info(f"QbC data written in 'control/QbC_{padded_curr_iter}.npz'.")
+    del QbC_data
 
     # Print the stats
     arcann_logger.info(f"-" * 88)
@@ -6,14 +6,13 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 """
 
 # Standard library modules
 import logging
 import sys
 from pathlib import Path
-from copy import deepcopy
 import subprocess
 
 # Non-standard library imports
@@ -30,19 +29,20 @@ from arcann_training.common.json import (
 from arcann_training.common.filesystem import (
     check_file_existence,
     remove_file,
-    remove_files_matching_glob,
-)
-from arcann_training.common.list import (
-    replace_substring_in_string_list,
-    string_list_to_textfile,
-    textfile_to_string_list,
 )
+from arcann_training.common.list import textfile_to_string_list
 from arcann_training.common.check import validate_step_folder, check_atomsk, check_vmd
+from arcann_training.common.utils import run_in_parallel
 from arcann_training.exploration.utils import (
+    extract_trajectory_structures,
+    find_new_duplicate_candidates,
     generate_input_exploration_disturbed_json,
     get_system_disturb,
+    load_qbc_store_file,
 )
-from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frame
+from arcann_training.common.xyz import write_xyz_frames
+from arcann_training.common.dcd import read_pdb_atomic_symbols
+from arcann_training.common.vmd import run_vmd_batch
 
 
 def main(
@@ -147,7 +147,47 @@ def main(
             )
         )
         current_input_json["atomsk_path"] = atomsk_bin
-    if "vmd_path" not in user_input_json:
+    # DCD frames are read natively, VMD is only needed (and checked) as a fallback, with a pool of 'nb_jobs' processes
+    for key in ["dcd_reader", "nb_jobs"]:
+        current_input_json[key] = get_key_in_dict(
+            key,
+            user_input_json if key in user_input_json else current_input_json,
+            previous_exploration_json,
+            default_input_json,
+        )
+    dcd_reader = current_input_json["dcd_reader"]
+    nb_jobs = current_input_json["nb_jobs"]
+    # The random displacements of the disturbed structures are reproducible from this seed (a new one is drawn if negative)
+    # The seed is not inherited from the previous iteration (only from the user input or a previous run of this one)
+    current_input_json["disturbed_seed"] = get_key_in_dict(
+        "disturbed_seed",
+        (
+            user_input_json
+            if "disturbed_seed" in user_input_json
+            else current_input_json
+        ),
+        {},
+        default_input_json,
+    )
+    if current_input_json["disturbed_seed"] < 0:
+        current_input_json["disturbed_seed"] = int(
+            np.random.RandomState().randint(2**31)
+        )
+    disturbed_seed = current_input_json["disturbed_seed"]
+    if dcd_reader not in ["native", "vmd"]:
+        arcann_logger.error(
+            f"Invalid 'dcd_reader': '{dcd_reader}'. It should be 'native' or 'vmd'."
+        )
+        arcann_logger.error(f"Aborting...")
+        return 1
+    if dcd_reader == "native":
+        vmd_bin = get_key_in_dict(
+            "vmd_path",
+            user_input_json if "vmd_path" in user_input_json else current_input_json,
+            previous_exploration_json,
+            default_input_json,
+        )
+    elif "vmd_path" not in user_input_json:
         vmd_bin = check_vmd(
             get_key_in_dict(
                 "vmd_path",
@@ -167,6 +207,9 @@ def main(
         )
         current_input_json["vmd_path"] = vmd_bin
     arcann_logger.debug(f"atomsk_bin: {atomsk_bin}")
+    arcann_logger.debug(f"dcd_reader: {dcd_reader}")
+    arcann_logger.debug(f"nb_jobs: {nb_jobs}")
+    arcann_logger.debug(f"disturbed_seed: {disturbed_seed}")
     arcann_logger.debug(f"vmd_bin: {vmd_bin}")
 
     # Check if we can continue
@@ -183,6 +226,8 @@ def main(
     # Update the current exploration JSON
     exploration_json["atomsk_path"] = atomsk_bin
     exploration_json["vmd_path"] = vmd_bin
+    exploration_json["dcd_reader"] = dcd_reader
+    exploration_json["disturbed_seed"] = disturbed_seed
     arcann_logger.debug(f"exploration_json: {exploration_json}")
 
     # Generate/update the merged input JSON
@@ -197,38 +242,35 @@ def main(
     arcann_logger.debug(f"current_input_json: {current_input_json}")
 
     check_file_existence(
-        deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_index.tcl"
+        deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_batch.tcl"
     )
     master_vmd_tcl = textfile_to_string_list(
-        deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_index.tcl"
+        deepmd_iterative_path / "assets" / "others" / "vmd_dcd_selection_batch.tcl"
     )
     arcann_logger.debug(f"{master_vmd_tcl}")
 
     starting_structures_path = training_path / "starting_structures"
     starting_structures_path.mkdir(exist_ok=True)
 
-    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
-        arcann_logger.info(
-            f"Processing system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})"
-        )
-        candidates_files = []
-        candidates_disturbed_files = []
-
-        print_every_x_steps = exploration_json["systems_auto"][system_auto][
-            "print_every_x_steps"
-        ]
-        # Set the system params for disburbed selection
-        (
-            disturbed_start_value,
-            disturbed_start_indexes,
-            disturbed_candidate_value,
-            disturbed_candidate_indexes,
-        ) = get_system_disturb(current_input_json, system_auto_index)
+    exploration_json["duplicates_count"] = 0
 
-        if (
-            exploration_json["systems_auto"][system_auto]["exploration_type"]
-            == "lammps"
-        ):
+    # QbC data from the deviate store (or from the legacy per-trajectory JSON files, for older iterations)
+    QbC_store_path = control_path / f"QbC_{padded_curr_iter}.npz"
+    if QbC_store_path.is_file():
+        QbC_data = load_qbc_store_file(QbC_store_path)
+    else:
+        arcann_logger.warning(
+            f"No 'control/QbC_{padded_curr_iter}.npz' found. Reading the QbC JSON files of each trajectory."
+        )
+        QbC_data = None
+    del QbC_store_path
+
+    # PDB topologies of the DCD trajectories (LAMMPS and i-PI)
+    for system_auto in main_json["systems_auto"]:
+        if exploration_json["systems_auto"][system_auto]["exploration_type"] in [
+            "lammps",
+            "i-PI",
+        ]:
             check_file_existence(training_path / "user_files" / f"{system_auto}.lmp")
             subprocess.run(
                 [
@@ -241,29 +283,128 @@ def main(
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.STDOUT,
             )
-            topo_file = training_path / "user_files" / f"{system_auto}.pdb"
-        elif (
-            exploration_json["systems_auto"][system_auto]["exploration_type"] == "i-PI"
-        ):
-            check_file_existence(training_path / "user_files" / f"{system_auto}.lmp")
-            subprocess.run(
-                [
-                    atomsk_bin,
-                    str(training_path / "user_files" / f"{system_auto}.lmp"),
-                    "pdb",
-                    str(training_path / "user_files" / system_auto),
-                    "-ow",
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.STDOUT,
+
+    # With VMD, the selected frames of all the DCD trajectories are written by a single VMD process (or 'nb_jobs' of them)
+    if dcd_reader == "vmd":
+        vmd_jobs = []
+        for system_auto in main_json["systems_auto"]:
+            exploration_type = exploration_json["systems_auto"][system_auto][
+                "exploration_type"
+            ]
+            if exploration_type not in ["lammps", "i-PI"]:
+                continue
+            frame_stride = (
+                exploration_json["systems_auto"][system_auto]["print_every_x_steps"]
+                if exploration_type == "lammps"
+                else 1
             )
+            for it_nnp in range(1, main_json["nnp_count"] + 1):
+                for it_number in range(
+                    1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1
+                ):
+                    local_path = (
+                        Path(".").resolve()
+                        / str(system_auto)
+                        / str(it_nnp)
+                        / str(it_number).zfill(5)
+                    )
+                    if QbC_data is not None:
+                        QbC_stats, QbC_indexes = QbC_data[
+                            (system_auto, it_nnp, it_number)
+                        ]
+                    else:
+                        QbC_stats = load_json_file(
+                            local_path / "QbC_stats.json", True, False
+                        )
+                        QbC_indexes = load_json_file(
+                            local_path / "QbC_indexes.json", True, False
+                        )
+                    outputs = []
+                    if QbC_stats["minimum_index"] != -1:
+                        min_index = int(QbC_stats["minimum_index"] / frame_stride)
+                        min_file_name = f"{padded_curr_iter}_{system_auto}_{it_nnp}_{str(it_number).zfill(5)}"
+                        remove_file(
+                            starting_structures_path
+                            / f"{min_file_name}_{str(min_index).zfill(5)}.xyz"
+                        )
+                        outputs.append(
+                            ([min_index], starting_structures_path / min_file_name)
+                        )
+                        del min_index, min_file_name
+                    if QbC_stats["selected_count"] > 0:
+                        outputs.append(
+                            (
+                                (
+                                    np.array(QbC_indexes["selected_indexes"])
+                                    / frame_stride
+                                )
+                                .astype(int)
+                                .tolist(),
+                                local_path / "candidates",
+                            )
+                        )
+                    if outputs:
+                        vmd_jobs.append(
+                            {
+                                "topology_file": training_path
+                                / "user_files"
+                                / f"{system_auto}.pdb",
+                                "trajectory_file": local_path
+                                / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd",
+                                "outputs": outputs,
+                            }
+                        )
+                    del local_path, QbC_stats, QbC_indexes, outputs
+            del exploration_type, frame_stride
+
+        arcann_logger.info(
+            f"Extracting the selected frames of {len(vmd_jobs)} DCD trajectories with VMD."
+        )
+        vmd_results = run_vmd_batch(
+            vmd_bin, master_vmd_tcl, vmd_jobs, Path(".").resolve(), nb_jobs
+        )
+        failed_vmd_jobs = [
+            (job, result)
+            for job, result in zip(vmd_jobs, vmd_results)
+            if result["status"] != "OK"
+        ]
+        for job, result in failed_vmd_jobs:
+            arcann_logger.error(
+                f"VMD failed on '{job['trajectory_file']}': {result['message']}"
+            )
+        if failed_vmd_jobs:
+            arcann_logger.error(f"Aborting...")
+            return 1
+        del vmd_jobs, vmd_results, failed_vmd_jobs
+
+    # The trajectories are independent: the starting structures are written, and the candidates read, by the workers
+    trajectories = []
+    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
+        exploration_type = exploration_json["systems_auto"][system_auto][
+            "exploration_type"
+        ]
+        # Set the system params for disburbed selection
+        (
+            disturbed_start_value,
+            disturbed_start_indexes,
+            disturbed_candidate_value,
+            disturbed_candidate_indexes,
+            deduplication_threshold,
+        ) = get_system_disturb(current_input_json, system_auto_index)
+        if exploration_type in ["lammps", "i-PI"]:
+            trajectory_suffix = ".dcd"
             topo_file = training_path / "user_files" / f"{system_auto}.pdb"
+            topo_symbols = (
+                read_pdb_atomic_symbols(topo_file) if dcd_reader == "native" else None
+            )
+        else:
+            trajectory_suffix = "_QM.xyz"
+            topo_file, topo_symbols = None, None
 
         for it_nnp in range(1, main_json["nnp_count"] + 1):
             for it_number in range(
                 1, exploration_json["systems_auto"][system_auto]["traj_count"] + 1
             ):
-                arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
                 # Get the local path
                 local_path = (
                     Path(".").resolve()
@@ -271,637 +412,263 @@ def main(
                     / str(it_nnp)
                     / str(it_number).zfill(5)
                 )
-                QbC_stats = load_json_file(local_path / "QbC_stats.json", True, False)
-                QbC_indexes = load_json_file(
-                    local_path / "QbC_indexes.json", True, False
-                )
-                arcann_logger.debug(QbC_stats)
-
-                if (local_path / "cell.txt").is_file():
-                    cell_array = np.genfromtxt(local_path / "cell.txt")
-                    cella = cell_array[:, 1] - cell_array[:, 0]
-                    cellb = cell_array[:, 3] - cell_array[:, 2]
-                    cellc = cell_array[:, 5] - cell_array[:, 4]
-                    is_cell_constant = False
-                    del cell_array
+                if QbC_data is not None:
+                    QbC_stats, QbC_indexes = QbC_data[(system_auto, it_nnp, it_number)]
                 else:
-                    cella = main_json["systems_auto"][system_auto]["cell"][0]
-                    cellb = main_json["systems_auto"][system_auto]["cell"][1]
-                    cellc = main_json["systems_auto"][system_auto]["cell"][2]
-                    is_cell_constant = True
-                arcann_logger.debug(f"is_cell_constant: {is_cell_constant}")
-
-                # Selection of the structure for the next iteration starting point
-                if QbC_stats["minimum_index"] != -1:
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                    ):
-                        traj_file = (
-                            local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd"
-                        )
-                        min_index = int(
-                            QbC_stats["minimum_index"] / print_every_x_steps
-                        )
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        traj_file = (
-                            local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd"
-                        )
-                        min_index = int(QbC_stats["minimum_index"])
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-                        traj_file = (
+                    QbC_stats = load_json_file(
+                        local_path / "QbC_stats.json", True, False
+                    )
+                    QbC_indexes = load_json_file(
+                        local_path / "QbC_indexes.json", True, False
+                    )
+                trajectories.append(
+                    (
+                        system_auto,
+                        it_nnp,
+                        it_number,
+                        topo_file,
+                        (
+                            local_path,
                             local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
-                        )
-                        min_index = int(QbC_stats["minimum_index"])
-
-                    (local_path / "min.vmd").write_text(f"{min_index}")
-                    padded_min_index = str(min_index).zfill(5)
-
-                    if (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-
-                        min_file_name = f"{padded_curr_iter}_{system_auto}_{it_nnp}_{str(it_number).zfill(5)}"
-                        vmd_tcl = deepcopy(master_vmd_tcl)
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_PDB_FILE_", str(topo_file)
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_DCD_FILE_", str(traj_file)
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_FRAME_INDEX_FILE_", str(local_path / "min.vmd")
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl,
-                            "_R_XYZ_OUT_",
-                            str(starting_structures_path / f"{min_file_name}"),
-                        )
-                        string_list_to_textfile(local_path / "vmd.tcl", vmd_tcl)
-                        del vmd_tcl, traj_file
-
-                        # VMD DCD -> XYZ
-                        remove_file(
-                            starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.xyz"
-                        )
-                        subprocess.run(
-                            [
-                                vmd_bin,
-                                "-e",
-                                str(local_path / "vmd.tcl"),
-                                "-dispdev",
-                                "text",
+                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}{trajectory_suffix}",
+                            exploration_type,
+                            QbC_stats,
+                            QbC_indexes,
+                            exploration_json["systems_auto"][system_auto][
+                                "print_every_x_steps"
                             ],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.STDOUT,
-                        )
-                        xyz_string = textfile_to_string_list(
-                            starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.xyz"
-                        )
-                        if not is_cell_constant:
-                            extended_xyz_header = f'Lattice="{cella[min_index]} 0.0000 0.0000 0.0000 {cellb[min_index]} 0.0000 0.0000 0.0000 {cellc[min_index]}" Properties=species:S:1:pos:R:3 Frame={min_index}'
-                        else:
-                            extended_xyz_header = f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={min_index}'
-                        xyz_string = (
-                            [xyz_string[0]] + [extended_xyz_header] + xyz_string[2:]
-                        )
-                        string_list_to_textfile(
-                            starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.xyz",
-                            xyz_string,
-                        )
-                        del xyz_string, extended_xyz_header
-
-                        remove_file((local_path / "vmd.tcl"))
-                        remove_file((local_path / "min.vmd"))
-
-                        # Atomsk XYZ -> LMP
-                        remove_file(
+                            main_json["systems_auto"][system_auto]["cell"],
+                            dcd_reader,
+                            topo_symbols,
                             starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.lmp"
-                        )
-                        subprocess.run(
+                            / f"{padded_curr_iter}_{system_auto}_{it_nnp}_{str(it_number).zfill(5)}",
+                            main_json["properties"],
+                            disturbed_start_value,
+                            disturbed_start_indexes,
+                            disturbed_candidate_value,
+                            disturbed_candidate_indexes,
                             [
-                                atomsk_bin,
-                                "-ow",
-                                "-properties",
-                                str(Path("..") / "user_files" / "properties.txt"),
-                                str(
-                                    Path("..")
-                                    / "starting_structures"
-                                    / f"{min_file_name}_{padded_min_index}.xyz"
-                                ),
-                                str(
-                                    Path("..")
-                                    / "starting_structures"
-                                    / f"{min_file_name}_{padded_min_index}.lmp"
-                                ),
+                                disturbed_seed,
+                                curr_iter,
+                                system_auto_index,
+                                it_nnp,
+                                it_number,
                             ],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.STDOUT,
-                        )
-                        # Add a mass to any 0.0000 mass in the LMP file
-                        lmp_file = textfile_to_string_list(
-                            starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.lmp"
-                        )
-                        lmp_file = replace_substring_in_string_list(
-                            lmp_file,
-                            "0.00000000              # XX",
-                            "1.00000000              # XX",
-                        )
-                        string_list_to_textfile(
-                            starting_structures_path
-                            / f"{min_file_name}_{padded_min_index}.lmp",
-                            lmp_file,
-                        )
-                        del lmp_file
-
-                        # If the a minium value was set by the user or previous, enable disturbed min structures
-                        if disturbed_start_value != 0:
-                            # or (curr_iter > 1 and previous_exploration_json["systems_auto"][system_auto]["disturbed_start"]):
-
-                            # Atomsk XYZ ==> XYZ_disturbed
-                            remove_file(
-                                (
-                                    starting_structures_path
-                                    / f"{min_file_name}_{padded_min_index}_disturbed.xyz"
-                                )
-                            )
-                            (
-                                starting_structures_path
-                                / f"{min_file_name}_{padded_min_index}_disturbed.xyz"
-                            ).write_text(
-                                (
-                                    starting_structures_path
-                                    / f"{min_file_name}_{padded_min_index}.xyz"
-                                ).read_text()
-                            )
-
-                            if not disturbed_start_indexes:
-                                subprocess.run(
-                                    [
-                                        atomsk_bin,
-                                        "-ow",
-                                        str(
-                                            Path("..")
-                                            / "starting_structures"
-                                            / f"{min_file_name}_{padded_min_index}_disturbed.xyz"
-                                        ),
-                                        "-disturb",
-                                        str(disturbed_start_value),
-                                        "exyz",
-                                    ],
-                                    stdout=subprocess.DEVNULL,
-                                    stderr=subprocess.STDOUT,
-                                )
-                            else:
-                                subprocess.run(
-                                    [
-                                        atomsk_bin,
-                                        "-ow",
-                                        str(
-                                            Path("..")
-                                            / "starting_structures"
-                                            / f"{min_file_name}_{padded_min_index}_disturbed.xyz"
-                                        ),
-                                        "-select",
-                                        ",".join(
-                                            [
-                                                str(idx)
-                                                for idx in disturbed_start_indexes
-                                            ]
-                                        ),
-                                        "-disturb",
-                                        str(disturbed_start_value),
-                                        "exyz",
-                                    ],
-                                    stdout=subprocess.DEVNULL,
-                                    stderr=subprocess.STDOUT,
-                                )
+                        ),
+                    )
+                )
+                del local_path, QbC_stats, QbC_indexes
+            del it_number
+        del it_nnp
+        del exploration_type, trajectory_suffix, topo_file, topo_symbols
 
-                            # Atomsk XYZ -> LMP
-                            remove_file(
-                                starting_structures_path
-                                / f"{min_file_name}_{padded_min_index}_disturbed.lmp"
-                            )
-                            subprocess.run(
-                                [
-                                    atomsk_bin,
-                                    "-ow",
-                                    "-properties",
-                                    str(Path("..") / "user_files" / "properties.txt"),
-                                    str(
-                                        Path("..")
-                                        / "starting_structures"
-                                        / f"{min_file_name}_{padded_min_index}_disturbed.xyz"
-                                    ),
-                                    str(
-                                        Path("..")
-                                        / "starting_structures"
-                                        / f"{min_file_name}_{padded_min_index}_disturbed.lmp"
-                                    ),
-                                ],
-                                stdout=subprocess.DEVNULL,
-                                stderr=subprocess.STDOUT,
-                            )
-                            # Add a mass to any 0.0000 mass in the LMP file
-                            lmp_file = textfile_to_string_list(
-                                starting_structures_path
-                                / f"{min_file_name}_{padded_min_index}_disturbed.lmp"
-                            )
-                            lmp_file = replace_substring_in_string_list(
-                                lmp_file,
-                                "0.00000000              # XX",
-                                "1.00000000              # XX",
-                            )
-                            string_list_to_textfile(
-                                starting_structures_path
-                                / f"{min_file_name}_{padded_min_index}_disturbed.lmp",
-                                lmp_file,
-                            )
-                            del lmp_file
+    arcann_logger.info(
+        f"Extracting {len(trajectories)} trajectories with {nb_jobs if nb_jobs > 0 else 'all available'} job(s)."
+    )
+    trajectories_results = run_in_parallel(
+        extract_trajectory_structures,
+        [_[4] for _ in trajectories],
+        nb_jobs,
+    )
+    failed_trajectories = [
+        (trajectory, results)
+        for trajectory, results in zip(trajectories, trajectories_results)
+        if results["error"] is not None
+    ]
+    for trajectory, results in failed_trajectories:
+        system_auto, it_nnp, it_number, _, trajectory_args = trajectory
+        arcann_logger.error(
+            f"Exploration '{system_auto}' / '{it_nnp}' / '{it_number}': {results['error']} ('{trajectory_args[1]}')"
+        )
+    if failed_trajectories:
+        arcann_logger.error(f"Aborting...")
+        return 1
+    del failed_trajectories
 
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_value"
-                            ] = disturbed_start_value
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_indexes"
-                            ] = disturbed_start_indexes
-                        else:
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_value"
-                            ] = 0
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_indexes"
-                            ] = []
+    # Reduce the per-trajectory results (in the same order as the serial loop)
+    for system_auto_index, system_auto in enumerate(main_json["systems_auto"]):
+        arcann_logger.info(
+            f"Processing system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})"
+        )
+        # The candidates of the system are appended to these files as they are extracted
+        candidates_xyz_file = (
+            current_path
+            / system_auto
+            / f"candidates_{padded_curr_iter}_{system_auto}.xyz"
+        )
+        candidates_disturbed_xyz_file = (
+            current_path
+            / system_auto
+            / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
+        )
+        candidates_provenance_file = (
+            current_path
+            / system_auto
+            / f"candidates_{padded_curr_iter}_{system_auto}_provenance.txt"
+        )
+        for _ in [
+            candidates_xyz_file,
+            candidates_disturbed_xyz_file,
+            candidates_provenance_file,
+        ]:
+            remove_file(_)
+        candidates_provenance = []
+        kept_fingerprints = None
+        duplicates_count = 0
+        is_candidate_disturbed = False
 
-                        del min_index, padded_min_index, min_file_name
+        (
+            disturbed_start_value,
+            disturbed_start_indexes,
+            disturbed_candidate_value,
+            disturbed_candidate_indexes,
+            deduplication_threshold,
+        ) = get_system_disturb(current_input_json, system_auto_index)
+        exploration_type = exploration_json["systems_auto"][system_auto][
+            "exploration_type"
+        ]
 
-                    elif (
+        for (
+            trajectory_system_auto,
+            it_nnp,
+            it_number,
+            _,
+            trajectory_args,
+        ), results in zip(trajectories, trajectories_results):
+            if trajectory_system_auto != system_auto:
+                continue
+            arcann_logger.debug(f"{system_auto} / {it_nnp} / {it_number}")
+            QbC_stats = trajectory_args[3]
+            arcann_logger.debug(QbC_stats)
+
+            # If the a minium value was set by the user or previous, enable disturbed min structures
+            if QbC_stats["minimum_index"] != -1:
+                if exploration_type in ["lammps", "i-PI"]:
+                    if disturbed_start_value != 0:
                         exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-
-                        remove_file((local_path / "min.vmd"))
-                        # This part should read the nc file and convert it
-                        # But for now, it is deactivated
-
-                        if disturbed_start_value != 0:
-                            arcann_logger.warning(
-                                "Disturbed start value is not supported for sander_emle"
-                            )
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_value"
-                            ] = 0
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_start_indexes"
-                            ] = []
-
-                # Selection of labeling XYZ
-                if QbC_stats["selected_count"] > 0:
-                    candidate_indexes = np.array(QbC_indexes["selected_indexes"])
-
-                    if (
+                            "disturbed_start_value"
+                        ] = disturbed_start_value
                         exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                    ):
-                        traj_file = (
-                            local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd"
-                        )
-                        candidate_indexes = candidate_indexes / print_every_x_steps
-                    elif (
+                            "disturbed_start_indexes"
+                        ] = disturbed_start_indexes
+                    else:
                         exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        traj_file = (
-                            local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}.dcd"
-                        )
-                        candidate_indexes = candidate_indexes
-                    elif (
+                            "disturbed_start_value"
+                        ] = 0
                         exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-                        traj_file = (
-                            local_path
-                            / f"{system_auto}_{it_nnp}_{padded_curr_iter}_QM.xyz"
+                            "disturbed_start_indexes"
+                        ] = []
+                elif exploration_type == "sander_emle":
+                    # This part should read the nc file and convert it
+                    # But for now, it is deactivated
+                    if disturbed_start_value != 0:
+                        arcann_logger.warning(
+                            "Disturbed start value is not supported for sander_emle"
                         )
-
-                    candidate_indexes = (
-                        candidate_indexes.astype(int).astype(str).tolist()
-                    )
-
-                    if (
                         exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "lammps"
-                        or exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "i-PI"
-                    ):
-                        string_list_to_textfile(
-                            (local_path / "label.vmd"), candidate_indexes
-                        )
-
-                        vmd_tcl = deepcopy(master_vmd_tcl)
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_PDB_FILE_", str(topo_file)
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_DCD_FILE_", str(traj_file)
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl,
-                            "_R_FRAME_INDEX_FILE_",
-                            str(local_path / "label.vmd"),
-                        )
-                        vmd_tcl = replace_substring_in_string_list(
-                            vmd_tcl, "_R_XYZ_OUT_", str(local_path / "candidates")
-                        )
-                        string_list_to_textfile((local_path / "vmd.tcl"), vmd_tcl)
-                        del vmd_tcl, traj_file
+                            "disturbed_start_value"
+                        ] = 0
+                        exploration_json["systems_auto"][system_auto][
+                            "disturbed_start_indexes"
+                        ] = []
+
+            # Selection of labeling XYZ
+            if results["candidate_indexes"]:
+                candidate_indexes = results["candidate_indexes"]
+                candidate_symbols = results["atomic_symbols"]
+
+                # Near-duplicates of the candidates already written for the system (same structure visited by several trajectories/NNPs)
+                if deduplication_threshold > 0:
+                    is_duplicate, kept_fingerprints = find_new_duplicate_candidates(
+                        candidate_symbols,
+                        results["atomic_coordinates"],
+                        results["cell_lengths"],
+                        kept_fingerprints,
+                        deduplication_threshold,
+                    )
+                else:
+                    is_duplicate = np.zeros(len(candidate_indexes), dtype=bool)
+                kept_positions = np.flatnonzero(~is_duplicate).tolist()
+                duplicates_count += len(candidate_indexes) - len(kept_positions)
+
+                # The frames are appended to the candidates file of the system, with their provenance
+                write_xyz_frames(
+                    candidates_xyz_file,
+                    kept_positions,
+                    np.full(len(candidate_indexes), candidate_symbols.shape[1]),
+                    candidate_symbols,
+                    results["atomic_coordinates"],
+                    np.array([]),
+                    results["comments"],
+                    append=True,
+                )
+                candidates_provenance.extend(
+                    [[it_nnp, it_number, candidate_indexes[_]] for _ in kept_positions]
+                )
 
-                        # VMD DCD ->  A lot of XYZ
-                        subprocess.run(
-                            [
-                                vmd_bin,
-                                "-e",
-                                str(local_path / "vmd.tcl"),
-                                "-dispdev",
-                                "text",
-                            ],
-                            stdout=subprocess.DEVNULL,
-                            stderr=subprocess.STDOUT,
+                # If the a minium value was set by the user or previous, enable disturbed candidates
+                if disturbed_candidate_value != 0:
+                    if exploration_type == "sander_emle":
+                        arcann_logger.warning(
+                            "Disturbed start value is not supported for sander_emle"
                         )
-                        for xyz_files in local_path.glob("candidates_*.xyz"):
-                            if "disturbed" in xyz_files.stem:
-                                continue
-                            index_xyz = int(xyz_files.stem.split("_")[-1])
-                            xyz_string = textfile_to_string_list(xyz_files)
-                            if not is_cell_constant:
-                                extended_xyz_header = f'Lattice="{cella[index_xyz]} 0.0000 0.0000 0.0000 {cellb[index_xyz]} 0.0000 0.0000 0.0000 {cellc[index_xyz]}" Properties=species:S:1:pos:R:3 Frame={index_xyz}'
-                            else:
-                                extended_xyz_header = f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={index_xyz}'
-                            xyz_string = (
-                                [xyz_string[0]] + [extended_xyz_header] + xyz_string[2:]
-                            )
-                            string_list_to_textfile(xyz_files, xyz_string)
-                            del xyz_string, extended_xyz_header, index_xyz
-                        del xyz_files
-
-                        remove_file((local_path / "label.vmd"))
-                        remove_file((local_path / "vmd.tcl"))
-
-                        candidate_indexes_padded = [
-                            _.zfill(5) for _ in candidate_indexes
-                        ]
-                        candidates_files.extend(
-                            [
-                                str(
-                                    Path(".")
-                                    / str(system_auto)
-                                    / str(it_nnp)
-                                    / str(it_number).zfill(5)
-                                    / ("candidates_" + _ + ".xyz")
-                                )
-                                for _ in candidate_indexes_padded
-                            ]
+                    else:
+                        write_xyz_frames(
+                            candidates_disturbed_xyz_file,
+                            kept_positions,
+                            np.full(len(candidate_indexes), candidate_symbols.shape[1]),
+                            candidate_symbols,
+                            results["disturbed_coordinates"],
+                            np.array([]),
+                            results["comments"],
+                            append=True,
                         )
+                        is_candidate_disturbed = True
 
-                        # If the a minium value was set by the user or previous, enable disturbed min structures
-                        if disturbed_candidate_value != 0:
-                            remove_files_matching_glob(local_path, "_disturbed.xyz")
-                            for candidate_index_padded in candidate_indexes_padded:
-                                (
-                                    local_path
-                                    / f"candidates_{candidate_index_padded}_disturbed.xyz"
-                                ).write_text(
-                                    (
-                                        local_path
-                                        / f"candidates_{candidate_index_padded}.xyz"
-                                    ).read_text()
-                                )
-                                if not disturbed_candidate_indexes:
-                                    subprocess.run(
-                                        [
-                                            atomsk_bin,
-                                            "-ow",
-                                            str(
-                                                Path(".")
-                                                / str(system_auto)
-                                                / str(it_nnp)
-                                                / str(it_number).zfill(5)
-                                                / f"candidates_{candidate_index_padded}_disturbed.xyz"
-                                            ),
-                                            "-disturb",
-                                            str(disturbed_candidate_value),
-                                            "exyz",
-                                        ],
-                                        stdout=subprocess.DEVNULL,
-                                        stderr=subprocess.STDOUT,
-                                    )
-                                else:
-                                    subprocess.run(
-                                        [
-                                            atomsk_bin,
-                                            "-ow",
-                                            str(
-                                                Path(".")
-                                                / str(system_auto)
-                                                / str(it_nnp)
-                                                / str(it_number).zfill(5)
-                                                / f"candidates_{candidate_index_padded}_disturbed.xyz"
-                                            ),
-                                            "-select",
-                                            ",".join(
-                                                [
-                                                    str(idx)
-                                                    for idx in disturbed_candidate_indexes
-                                                ]
-                                            ),
-                                            "-disturb",
-                                            str(disturbed_candidate_value),
-                                            "exyz",
-                                        ],
-                                        stdout=subprocess.DEVNULL,
-                                        stderr=subprocess.STDOUT,
-                                    )
-
-                            candidates_disturbed_files.extend(
-                                [
-                                    str(
-                                        Path(".")
-                                        / str(system_auto)
-                                        / str(it_nnp)
-                                        / str(it_number).zfill(5)
-                                        / ("candidates_" + _ + "_disturbed.xyz")
-                                    )
-                                    for _ in candidate_indexes_padded
-                                ]
-                            )
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_value"
-                            ] = disturbed_candidate_value
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_indexes"
-                            ] = disturbed_candidate_indexes
-                            del candidate_index_padded
-
-                        else:
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_value"
-                            ] = 0
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_indexes"
-                            ] = []
-                        del candidate_indexes, candidate_indexes_padded
-
-                    elif (
-                        exploration_json["systems_auto"][system_auto][
-                            "exploration_type"
-                        ]
-                        == "sander_emle"
-                    ):
-
-                        candidate_indexes_padded = [
-                            _.zfill(5) for _ in candidate_indexes
-                        ]
-                        (
-                            atom_counts,
-                            atomic_symbols,
-                            atomic_coordinates,
-                            comments,
-                            lattice_info,
-                            pbc_info,
-                            properties_info,
-                            max_f_std_info,
-                        ) = parse_xyz_trajectory_file(local_path / traj_file)
-
-                        for _ in candidate_indexes_padded:
-                            print(
-                                f"Processing candidate: {system_auto} / {it_nnp} / {it_number} / {_}"
-                            )
-                            write_xyz_frame(
-                                local_path / f"candidates_{_}.xyz",
-                                int(_),
-                                atom_counts,
-                                atomic_symbols,
-                                atomic_coordinates,
-                                np.array([]),
-                                comments,
-                            )
-                            candidates_files.append(
-                                str(
-                                    Path(".")
-                                    / str(system_auto)
-                                    / str(it_nnp)
-                                    / str(it_number).zfill(5)
-                                    / ("candidates_" + _ + ".xyz")
-                                )
-                            )
-
-                        if disturbed_candidate_value != 0:
-                            arcann_logger.warning(
-                                "Disturbed start value is not supported for sander_emle"
-                            )
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_value"
-                            ] = 0
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_indexes"
-                            ] = []
-                        else:
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_value"
-                            ] = 0
-                            exploration_json["systems_auto"][system_auto][
-                                "disturbed_candidate_indexes"
-                            ] = []
-                else:
-                    exploration_json["systems_auto"][system_auto][
-                        "disturbed_candidate_value"
-                    ] = 0
-                    exploration_json["systems_auto"][system_auto][
-                        "disturbed_candidate_indexes"
-                    ] = []
-
-            del (
-                cella,
-                cellb,
-                cellc,
-                is_cell_constant,
-                local_path,
-                QbC_stats,
-                QbC_indexes,
-            )
-
+                del candidate_indexes, candidate_symbols, is_duplicate, kept_positions
+            del QbC_stats, trajectory_system_auto, trajectory_args, results
         del it_nnp, it_number
 
-        if candidates_files:
-            candidates_xyz_file = (
-                current_path
-                / system_auto
-                / f"candidates_{padded_curr_iter}_{system_auto}.xyz"
+        # selected_count is kept as selected by deviate, duplicates_count is subtracted at labeling
+        if deduplication_threshold > 0:
+            arcann_logger.info(
+                f"Removed {duplicates_count} near-duplicate candidate(s) out of {len(candidates_provenance) + duplicates_count} for system: {system_auto}."
             )
-            remove_file(candidates_xyz_file)
-            with open(candidates_xyz_file, "w") as f:
-                for candidate_xyz_file in candidates_files:
-                    f.write((current_path / candidate_xyz_file).read_text())
-                    remove_file((current_path / candidate_xyz_file))
-                del candidate_xyz_file
-            del candidates_xyz_file, f
-        del candidates_files
-
-        if candidates_disturbed_files:
-            candidates_disturbed_xyz_file = (
-                current_path
-                / system_auto
-                / f"candidates_{padded_curr_iter}_{system_auto}_disturbed.xyz"
+        exploration_json["systems_auto"][system_auto][
+            "deduplication_threshold"
+        ] = deduplication_threshold
+        exploration_json["systems_auto"][system_auto][
+            "duplicates_count"
+        ] = duplicates_count
+        exploration_json["duplicates_count"] += duplicates_count
+        if is_candidate_disturbed:
+            exploration_json["systems_auto"][system_auto][
+                "disturbed_candidate_value"
+            ] = disturbed_candidate_value
+            exploration_json["systems_auto"][system_auto][
+                "disturbed_candidate_indexes"
+            ] = disturbed_candidate_indexes
+        else:
+            exploration_json["systems_auto"][system_auto][
+                "disturbed_candidate_value"
+            ] = 0
+            exploration_json["systems_auto"][system_auto][
+                "disturbed_candidate_indexes"
+            ] = []
+
+        # Provenance of each frame of the candidates file (same order in the disturbed file)
+        if candidates_provenance:
+            np.savetxt(
+                candidates_provenance_file,
+                np.column_stack(
+                    (np.arange(len(candidates_provenance)), candidates_provenance)
+                ),
+                fmt="%d",
+                header="candidate nnp trajectory frame",
             )
-            remove_file(candidates_disturbed_xyz_file)
-            with open(candidates_disturbed_xyz_file, "w") as f:
-                for candidate_disturbed_file in candidates_disturbed_files:
-                    f.write((current_path / candidate_disturbed_file).read_text())
-                    remove_file((current_path / candidate_disturbed_file))
-                del candidate_disturbed_file
-            del candidates_disturbed_xyz_file, f
-        del candidates_disturbed_files
+        del duplicates_count, kept_fingerprints, is_candidate_disturbed
+        del candidates_xyz_file, candidates_disturbed_xyz_file
+        del candidates_provenance_file, candidates_provenance
         arcann_logger.info(
             f"Processed system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})"
         )
@@ -911,11 +678,18 @@ def main(
         disturbed_start_indexes,
         disturbed_candidate_value,
         disturbed_candidate_indexes,
-        print_every_x_steps,
+        disturbed_seed,
+        deduplication_threshold,
+        exploration_type,
     )
-    del system_auto_index, system_auto, master_vmd_tcl
+    del system_auto_index, system_auto, master_vmd_tcl, QbC_data
+    del trajectories, trajectories_results
     del starting_structures_path
 
+    if exploration_json["duplicates_count"] > 0:
+        arcann_logger.info(
+            f"Total number of near-duplicates removed: {exploration_json['duplicates_count']}, {exploration_json['duplicates_count'] / exploration_json['selected_count'] * 100:.2f}% of selected (labeling calculations saved)."
+        )
     arcann_logger.info(f"-" * 88)
     # Update the booleans in the exploration JSON
     exploration_json["is_extracted"] = True
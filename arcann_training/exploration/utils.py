@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/08/06
+Last modified: 2026/10/17
 
 Functions
 ---------
@@ -19,13 +19,13 @@ get_system_exploration(merged_input_json: Dict, system_auto_index: int) -> Tuple
 generate_input_exploration_deviation_json(user_input_json: Dict, previous_json: Dict, default_input_json: Dict, merged_input_json: Dict, main_json: Dict,) -> Dict
     Update and complete input JSON by incorporating values from the user input JSON, the previous JSON, and the default JSON.
 
-get_system_deviation(merged_input_json: Dict, system_auto_index: int) -> Tuple[Union[float, int], Union[float, int], Union[float, int], Union[float, int], Union[float, int]]
+get_system_deviation(merged_input_json: Dict, system_auto_index: int) -> Tuple[Union[float, int], Union[float, int], Union[float, int], Union[float, int], Union[float, int], str, str]
     Return a tuple of system exploration parameters based on the input JSON and system index.
 
 generate_input_exploration_disturbed_json(user_input_json: Dict, previous_json: Dict, default_input_json: Dict, merged_input_json: Dict, main_json: Dict,) -> Dict
     Update and complete input JSON by incorporating values from the user input JSON, the previous JSON, and the default JSON.
 
-get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple[Union[float, int], Union[float, int], List[int]]
+get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple[Union[float, int], List[int], Union[float, int], List[int], Union[float, int]]
     Return a tuple of system exploration parameters based on the input JSON and system index.
 
 generate_starting_points(exploration_type: int, system_auto: int, training_path: str, padded_prev_iter: str, previous_json: Dict, input_present: bool, disturbed_start: bool) -> Tuple[List[str], List[str], bool]
@@ -37,6 +37,39 @@ create_models_list(main_json: Dict, previous_json: Dict, it_nnp: int, padded_pre
 get_last_frame_number(model_deviation: np.ndarray, sigma_high_limit: float, disturbed_start: bool) -> int
     Returns the index of the last frame to be processed based on the given parameters.
 
+classify_deviation(frame_ids: np.ndarray, deviation: np.ndarray, sigma_low: float, sigma_high: float, start_row_number: int, end_row_number: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float]]
+    Splits the frames of a trajectory into good, candidate and rejected frames in a single pass, and returns the deviation statistics.
+
+classify_deviation_by_chunks(chunks: Iterable[np.ndarray], deviation_column: int, sigma_low: float, sigma_high: float, sigma_high_limit: float, start_row_number: int, disturbed_start: bool, is_forced: bool, relative_accuracy: float = 1e-4) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float], int, int]
+    Same as classify_deviation (with the sigma_high_limit crossing), but reading the model deviation by blocks of rows, with a bounded memory use.
+
+get_minimum_deviation_index(candidate_indexes: np.ndarray, candidate_deviations: np.ndarray, selected_indexes: np.ndarray) -> int
+    Returns the frame id of the selected candidate with the lowest deviation.
+
+select_candidates(candidate_indexes: np.ndarray, candidate_deviations: np.ndarray, max_candidates_local: int, selection_strategy: str = "linspace", seed: Union[int, List[int], None] = None) -> np.ndarray
+    Selects at most max_candidates_local frames among the candidates of a trajectory, with the given strategy.
+
+select_system_candidates(trajectory_ids: np.ndarray, candidate_indexes: np.ndarray, candidate_deviations: np.ndarray, trajectory_count: int, max_candidates: int, allocation_objective: str = "proportional", selection_strategy: str = "linspace", seeds: Union[List, None] = None) -> Tuple[np.ndarray, np.ndarray]
+    Selects the candidates of a system in one step, from the table of all its candidates (trajectory, frame id, deviation).
+
+compute_trajectory_deviation(local_path: Path, exploration_type: str, model_deviation_filename: str, xyz_qm_filename: str, print_every_x_steps: int, start_row_number: int, nb_steps_expected: int, sigma_low: float, sigma_high: float, sigma_high_limit: float, disturbed_start: bool, chunk_size: int = 0, write_files: bool = True) -> Tuple[Dict, bool, bool, int, np.ndarray, Dict]
+    Computes the Query-by-Committee statistics and indexes of one trajectory and writes them in the trajectory folder.
+
+write_qbc_store_file(QbC_data: Dict[Tuple[str, int, int], Tuple[Dict, Dict]], file_path: Path) -> None
+    Writes the Query-by-Committee statistics and indexes of all the trajectories of an iteration in a single NumPy archive.
+
+load_qbc_store_file(file_path: Path) -> Dict[Tuple[str, int, int], Tuple[Dict, Dict]]
+    Loads the Query-by-Committee statistics and indexes written by 'write_qbc_store_file'.
+
+find_new_duplicate_candidates(atomic_symbols: np.ndarray, atomic_coordinates: np.ndarray, cell_lengths: np.ndarray, kept_fingerprints: Union[np.ndarray, None], deduplication_threshold: float) -> Tuple[np.ndarray, np.ndarray]
+    Flags the new candidates of a system that are near-duplicates of a candidate already kept (or of an earlier new one).
+
+extract_trajectory_structures(local_path: Path, trajectory_file: Path, exploration_type: str, QbC_stats: Dict, QbC_indexes: Dict, print_every_x_steps: int, system_cell: List[float], dcd_reader: str, topology_symbols: Union[np.ndarray, None], starting_structure_prefix: Path, properties: Dict, disturbed_start_value: float, disturbed_start_indexes: List[int], disturbed_candidate_value: float, disturbed_candidate_indexes: List[int], seed: List[int]) -> Dict
+    Extracts the starting structure (XYZ and LAMMPS data files) and the candidates (as arrays) of one trajectory.
+
+disturb_atomic_coordinates(atomic_coordinates: np.ndarray, disturbed_value: float, disturbed_indexes: Union[List[int], None] = None, seed: Union[int, List[int], None] = None) -> np.ndarray
+    Returns the atomic coordinates of one or several frames with a random displacement applied to (some of) the atoms.
+
 update_system_nb_steps_factor(previous_json: Dict, system_auto_index: int) -> int
     Calculates a ratio based on information from a dictionary and returns a multiplying factor for system_nb_steps.
 """
@@ -47,7 +80,7 @@ update_system_nb_steps_factor(previous_json: Dict, system_auto_index: int) -> in
 import logging
 from pathlib import Path
 from copy import deepcopy
-from typing import Dict, List, Tuple, Union
+from typing import Dict, Iterable, List, Tuple, Union
 import subprocess
 
 # Third-party modules
@@ -55,7 +88,32 @@ import numpy as np
 
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
-from arcann_training.common.json import convert_control_to_input
+from arcann_training.common.json import (
+    convert_control_to_input,
+    load_json_file,
+    write_json_file,
+)
+from arcann_training.common.deviation import (
+    read_model_deviation_file,
+    read_model_deviation_file_by_chunks,
+)
+from arcann_training.common.fingerprint import (
+    compute_pair_distance_fingerprints,
+    find_near_duplicate_frames,
+)
+from arcann_training.common.xyz import (
+    parse_xyz_lines,
+    parse_xyz_trajectory_file,
+    read_xyz_frames,
+    write_xyz_frames,
+)
+from arcann_training.common.dcd import read_dcd_frames
+from arcann_training.common.lammps import read_cell_lengths_file, write_lammps_data
+from arcann_training.common.list import (
+    string_list_to_textfile,
+    textfile_to_string_list,
+)
+from arcann_training.common.filesystem import remove_file
 
 
 # TODO: Add tests for this function
@@ -328,11 +386,11 @@ def generate_input_exploration_deviation_json(
     Raises
     ------
     ValueError
-        If the exploration type is neither "lammps" nor "i-PI".
+        If the selection strategy or the allocation objective is not known.
     KeyError
         If a key is not found in any of the JSON dictionaries.
     TypeError
-        If the value type is not int/float or bool (for disturbed_start).
+        If the value type is not int/float (or str for selection_strategy and allocation_objective).
     ValueError
         If the length of the value list is not equal to the system count.
     """
@@ -347,6 +405,8 @@ def generate_input_exploration_deviation_json(
         "sigma_high",
         "sigma_high_limit",
         "ignore_first_x_ps",
+        "selection_strategy",
+        "allocation_objective",
     ]:
         # Get the value
         default_used = False
@@ -367,6 +427,35 @@ def generate_input_exploration_deviation_json(
             error_msg = f"'{key}' not found in any of the JSON dictionaries"
             raise KeyError(error_msg)
 
+        if key == "selection_strategy" or key == "allocation_objective":
+            if key == "selection_strategy":
+                known_values = [
+                    "linspace",
+                    "deviation_weighted",
+                    "stratified",
+                    "decorrelated",
+                    "farthest_point",
+                ]
+            else:
+                known_values = ["proportional", "fair", "max_spread"]
+            if default_used:
+                merged_input_json[key] = [value[0]] * system_count
+            elif isinstance(value, str) and value in known_values:
+                merged_input_json[key] = [value] * system_count
+            elif isinstance(value, List):
+                if len(value) != system_count:
+                    error_msg = f"{key}: Size mismatch: The length of the list should be '{system_count}' corresponding to the number of systems."
+                    raise ValueError(error_msg)
+                for it_value in value:
+                    if it_value not in known_values:
+                        error_msg = f"{key}: '{it_value}' is not known: use either {known_values} or a list of them"
+                        raise ValueError(error_msg)
+                merged_input_json[key] = list(value)
+            else:
+                error_msg = f"{key}: '{value}' is not known: use either {known_values} or a list of them"
+                raise ValueError(error_msg)
+            continue
+
         # Everything is system dependent so a list
         merged_input_json[key] = []
 
@@ -404,6 +493,8 @@ def get_system_deviation(merged_input_json: Dict, system_auto_index: int) -> Tup
     Union[float, int],
     Union[float, int],
     Union[float, int],
+    str,
+    str,
 ]:
     """
     Return a tuple of system exploration parameters based on the input JSON and system index.
@@ -417,13 +508,15 @@ def get_system_deviation(merged_input_json: Dict, system_auto_index: int) -> Tup
 
     Returns
     -------
-    Tuple[float, float, float, float, float, float, float, float, bool]
+    Tuple[float, float, float, float, float, str, str]
         A tuple containing system deviation parameters:
         - Max candidates : float
         - Sigma low : float
         - Sigma high : float
         - Sigma high limit : float
         - Ignore first x ps : float
+        - Selection strategy : str
+        - Allocation objective : str
     """
     system_values = []
     for key in [
@@ -432,6 +525,8 @@ def get_system_deviation(merged_input_json: Dict, system_auto_index: int) -> Tup
         "sigma_high",
         "sigma_high_limit",
         "ignore_first_x_ps",
+        "selection_strategy",
+        "allocation_objective",
     ]:
         system_values.append(merged_input_json[key][system_auto_index])
     return tuple(system_values)
@@ -488,6 +583,7 @@ def generate_input_exploration_disturbed_json(
         "disturbed_start_indexes",
         "disturbed_candidate_value",
         "disturbed_candidate_indexes",
+        "deduplication_threshold",
     ]:
         # Get the value
         default_used = False
@@ -575,8 +671,10 @@ def generate_input_exploration_disturbed_json(
 @catch_errors_decorator
 def get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple[
     Union[float, int],
+    List[int],
     Union[float, int],
     List[int],
+    Union[float, int],
 ]:
     """
     Return a tuple of system exploration parameters based on the input JSON and system index.
@@ -590,11 +688,13 @@ def get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple
 
     Returns
     -------
-    Tuple[float, float, List]
+    Tuple[float, List, float, List, float]
         A tuple containing system deviation parameters:
         - disturbed_start_value : float
+        - disturbed_start_indexes : List
         - disturbed_candidate_value : float
-        - disturbed_candidate_indexes : float
+        - disturbed_candidate_indexes : List
+        - deduplication_threshold : float
     """
     system_values = []
     for key in [
@@ -602,6 +702,7 @@ def get_system_disturb(merged_input_json: Dict, system_auto_index: int) -> Tuple
         "disturbed_start_indexes",
         "disturbed_candidate_value",
         "disturbed_candidate_indexes",
+        "deduplication_threshold",
     ]:
         system_values.append(merged_input_json[key][system_auto_index])
     return tuple(system_values)
@@ -844,6 +945,1395 @@ def get_last_frame_number(
     return last_frame
 
 
+# Unittested
+@catch_errors_decorator
+def classify_deviation(
+    frame_ids: np.ndarray,
+    deviation: np.ndarray,
+    sigma_low: float,
+    sigma_high: float,
+    start_row_number: int,
+    end_row_number: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float]]:
+    """
+    Splits the frames of a trajectory into good, candidate and rejected frames in a single pass, and returns the deviation statistics.
+
+    Only the rows in [start_row_number, end_row_number) are classified (good: deviation <= sigma_low, candidate: sigma_low < deviation < sigma_high,
+    rejected: deviation >= sigma_high). Every row from end_row_number is rejected. A negative end_row_number means that sigma_high_limit was never crossed
+    (the window goes to the end), and an end_row_number lower or equal to start_row_number means that every row from start_row_number is rejected
+    and that the statistics are not available (999.0).
+
+    Parameters
+    ----------
+    frame_ids : np.ndarray
+        The 1-D array of the frame ids (first column of the model deviation file).
+    deviation : np.ndarray
+        The 1-D array of the maximum deviation of the forces.
+    sigma_low : float
+        The lower deviation threshold.
+    sigma_high : float
+        The higher deviation threshold.
+    start_row_number : int
+        The first row to classify.
+    end_row_number : int
+        The row from which everything is rejected (see above).
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float]]
+        - The frame ids of the good frames.
+        - The frame ids of the candidate frames.
+        - The frame ids of the rejected frames (in the window, then after it).
+        - The deviation of the candidate frames (same order as their frame ids).
+        - The mean, median and standard deviation of the deviation over the window ('mean_deviation_max_f', 'median_deviation_max_f', 'stdeviation_deviation_max_f').
+
+    Raises
+    ------
+    ValueError
+        If frame_ids and deviation do not have the same shape.
+    """
+    if frame_ids.shape != deviation.shape:
+        error_msg = f"Shape mismatch between frame ids '{frame_ids.shape}' and deviation '{deviation.shape}'."
+        raise ValueError(error_msg)
+
+    if end_row_number < 0:
+        end_row_number = deviation.shape[0]
+    elif end_row_number <= start_row_number:
+        return (
+            np.array([], dtype=np.int64),
+            np.array([], dtype=np.int64),
+            np.asarray(frame_ids[start_row_number:]).astype(np.int64),
+            np.array([], dtype=np.float64),
+            {
+                "mean_deviation_max_f": 999.0,
+                "median_deviation_max_f": 999.0,
+                "stdeviation_deviation_max_f": 999.0,
+            },
+        )
+
+    # Contiguous copy of the window (the columns of the model deviation array are strided)
+    window = np.array(deviation[start_row_number:end_row_number], dtype=np.float64)
+    window_frame_ids = np.asarray(frame_ids[start_row_number:end_row_number])
+
+    # Class code in one pass over the window: 0: good (<= sigma_low), 1: candidate, 2: rejected (>= sigma_high)
+    # (two comparisons are much faster than a binary search on the thresholds, and NaN ends up rejected)
+    classes = np.invert(window <= sigma_low).view(np.uint8) + np.invert(
+        window < sigma_high
+    ).view(np.uint8)
+
+    good_indexes = window_frame_ids[classes == 0].astype(np.int64)
+    candidate_indexes = window_frame_ids[classes == 1].astype(np.int64)
+    candidate_deviations = window[classes == 1]
+    rejected_indexes = np.concatenate(
+        (
+            window_frame_ids[classes == 2].astype(np.int64),
+            np.asarray(frame_ids[end_row_number:]).astype(np.int64),
+        )
+    )
+
+    mean_deviation_max_f = np.mean(window)
+    stdeviation_deviation_max_f = np.std(window)
+    # The window is not needed anymore, so the median can partition it in place
+    median_deviation_max_f = np.median(window, overwrite_input=True)
+
+    return (
+        good_indexes,
+        candidate_indexes,
+        rejected_indexes,
+        candidate_deviations,
+        {
+            "mean_deviation_max_f": mean_deviation_max_f,
+            "median_deviation_max_f": median_deviation_max_f,
+            "stdeviation_deviation_max_f": stdeviation_deviation_max_f,
+        },
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def classify_deviation_by_chunks(
+    chunks: Iterable[np.ndarray],
+    deviation_column: int,
+    sigma_low: float,
+    sigma_high: float,
+    sigma_high_limit: float,
+    start_row_number: int,
+    disturbed_start: bool,
+    is_forced: bool,
+    relative_accuracy: float = 1e-4,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float], int, int]:
+    """
+    Same as classify_deviation (with the sigma_high_limit crossing), but reading the model deviation by blocks of rows, with a bounded memory use.
+
+    The end row follows get_last_frame_number (or the last row if the trajectory is forced), and is found while reading:
+    only one row is held back between blocks (for disturbed starts and forced trajectories, where the end row is one row before).
+    The mean and standard deviation are merged block by block (exact up to the rounding), the median comes from a logarithmic
+    quantile sketch (relative error below relative_accuracy). Only the frame ids (and the deviation of the candidates) are kept.
+
+    Parameters
+    ----------
+    chunks : Iterable[np.ndarray]
+        The blocks of rows of the model deviation array, in order (frame ids in the first column).
+    deviation_column : int
+        The column of the maximum deviation of the forces.
+    sigma_low : float
+        The lower deviation threshold.
+    sigma_high : float
+        The higher deviation threshold.
+    sigma_high_limit : float
+        The deviation limit after which everything is rejected.
+    start_row_number : int
+        The first row to classify.
+    disturbed_start : bool
+        Whether the first frame is disturbed (and should be ignored for the limit).
+    is_forced : bool
+        Whether the trajectory is forced (the limit is ignored, the last row is rejected).
+    relative_accuracy : float, optional
+        The relative accuracy of the median. Defaults to 1e-4.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, float], int, int]
+        - The frame ids of the good frames.
+        - The frame ids of the candidate frames.
+        - The frame ids of the rejected frames (in the window, then after it).
+        - The deviation of the candidate frames (same order as their frame ids).
+        - The mean, median and standard deviation of the deviation over the window (999.0 if not available).
+        - The end row number (as get_last_frame_number, -1 if never crossed).
+        - The total number of rows.
+    """
+    skip_first_frame = 1 if disturbed_start else 0
+    held_back_count = 1 if (disturbed_start or is_forced) else 0
+    end_row_number = None
+
+    good_indexes, candidate_indexes, candidate_deviations, window_rejected_indexes = (
+        [],
+        [],
+        [],
+        [],
+    )
+    tail_rejected_indexes = []
+    window_count, window_mean, window_m2 = 0, 0.0, 0.0
+    log_gamma = np.log((1 + relative_accuracy) / (1 - relative_accuracy))
+    sketch = {}
+
+    def process_rows(frame_ids, deviation, first_row, end_row):
+        # Rows in [start_row_number, end_row) are classified, rows from max(end_row, start_row_number) are rejected
+        nonlocal window_count, window_mean, window_m2
+        rows = np.arange(first_row, first_row + deviation.shape[0])
+        in_window = rows >= start_row_number
+        if end_row is not None:
+            tail_rejected_indexes.append(frame_ids[in_window & (rows >= end_row)])
+            in_window &= rows < end_row
+        window, window_frame_ids = deviation[in_window], frame_ids[in_window]
+        if window.shape[0] == 0:
+            return
+
+        classes = np.invert(window <= sigma_low).view(np.uint8) + np.invert(
+            window < sigma_high
+        ).view(np.uint8)
+        good_indexes.append(window_frame_ids[classes == 0])
+        candidate_indexes.append(window_frame_ids[classes == 1])
+        candidate_deviations.append(window[classes == 1])
+        window_rejected_indexes.append(window_frame_ids[classes == 2])
+
+        # Merge the mean and the sum of squared differences (Chan et al.)
+        block_count, block_mean = window.shape[0], np.mean(window)
+        block_m2 = np.sum((window - block_mean) ** 2)
+        delta = block_mean - window_mean
+        total_count = window_count + block_count
+        window_mean = window_mean + delta * block_count / total_count
+        window_m2 = (
+            window_m2 + block_m2 + delta**2 * window_count * block_count / total_count
+        )
+        window_count = total_count
+
+        # Logarithmic buckets (values <= 0 share the lowest one)
+        with np.errstate(divide="ignore"):
+            buckets = np.ceil(np.log(window) / log_gamma)
+        buckets = np.where(np.isfinite(buckets), buckets, -(2**62)).astype(np.int64)
+        for bucket, count in zip(*np.unique(buckets, return_counts=True)):
+            sketch[int(bucket)] = sketch.get(int(bucket), 0) + int(count)
+
+    def sketch_value(rank):
+        cumulative_count = 0
+        for bucket in sorted(sketch):
+            cumulative_count += sketch[bucket]
+            if cumulative_count > rank:
+                if bucket == -(2**62):
+                    return 0.0
+                return 2 * np.exp(bucket * log_gamma) / (np.exp(log_gamma) + 1)
+        return np.nan
+
+    pending_frame_ids, pending_deviation = np.empty(0), np.empty(0)
+    first_row = 0
+    for chunk in chunks:
+        frame_ids = np.concatenate((pending_frame_ids, chunk[:, 0]))
+        deviation = np.concatenate((pending_deviation, chunk[:, deviation_column]))
+        rows = np.arange(first_row, first_row + deviation.shape[0])
+        if not is_forced and end_row_number is None:
+            crossing = (deviation >= sigma_high_limit) & (rows >= skip_first_frame)
+            if np.any(crossing):
+                end_row_number = int(rows[np.argmax(crossing)]) - skip_first_frame
+        # Until the end row is known, the last row(s) may still be after it
+        processed_count = deviation.shape[0] - (
+            held_back_count if end_row_number is None else 0
+        )
+        process_rows(
+            frame_ids[:processed_count],
+            deviation[:processed_count],
+            first_row,
+            end_row_number,
+        )
+        pending_frame_ids = frame_ids[processed_count:]
+        pending_deviation = deviation[processed_count:]
+        first_row += processed_count
+
+    row_count = first_row + pending_deviation.shape[0]
+    if is_forced:
+        end_row_number = row_count - 1
+    elif end_row_number is None:
+        end_row_number = -1
+    process_rows(
+        pending_frame_ids,
+        pending_deviation,
+        first_row,
+        end_row_number if end_row_number >= 0 else None,
+    )
+
+    if 0 <= end_row_number <= start_row_number:
+        deviation_stats = {
+            "mean_deviation_max_f": 999.0,
+            "median_deviation_max_f": 999.0,
+            "stdeviation_deviation_max_f": 999.0,
+        }
+    elif window_count == 0:
+        deviation_stats = {
+            "mean_deviation_max_f": np.nan,
+            "median_deviation_max_f": np.nan,
+            "stdeviation_deviation_max_f": np.nan,
+        }
+    else:
+        deviation_stats = {
+            "mean_deviation_max_f": float(window_mean),
+            "median_deviation_max_f": float(
+                (
+                    sketch_value((window_count - 1) // 2)
+                    + sketch_value(window_count // 2)
+                )
+                / 2
+            ),
+            "stdeviation_deviation_max_f": float(np.sqrt(window_m2 / window_count)),
+        }
+
+    def concatenate(arrays, dtype):
+        return np.concatenate([np.empty(0)] + arrays).astype(dtype)
+
+    return (
+        concatenate(good_indexes, np.int64),
+        concatenate(candidate_indexes, np.int64),
+        concatenate(window_rejected_indexes + tail_rejected_indexes, np.int64),
+        concatenate(candidate_deviations, np.float64),
+        deviation_stats,
+        end_row_number,
+        row_count,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def get_minimum_deviation_index(
+    candidate_indexes: np.ndarray,
+    candidate_deviations: np.ndarray,
+    selected_indexes: np.ndarray,
+) -> int:
+    """
+    Returns the frame id of the selected candidate with the lowest deviation.
+
+    The selected frames are located among the candidates with a binary search, so no model deviation file is read.
+    In case of a tie, the first selected frame is returned.
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The frame ids of the candidates.
+    candidate_deviations : np.ndarray
+        The deviation of the candidates (same order as candidate_indexes).
+    selected_indexes : np.ndarray
+        The frame ids of the selected candidates (a subset of candidate_indexes).
+
+    Returns
+    -------
+    int
+        The frame id of the selected candidate with the lowest deviation, -1 if nothing is selected.
+
+    Raises
+    ------
+    ValueError
+        If a selected frame is not a candidate.
+    """
+    candidate_indexes = np.asarray(candidate_indexes)
+    selected_indexes = np.asarray(selected_indexes)
+    if selected_indexes.size == 0:
+        return -1
+
+    sorter = np.argsort(candidate_indexes, kind="stable")
+    positions = np.searchsorted(candidate_indexes, selected_indexes, sorter=sorter)
+    positions = sorter[np.minimum(positions, sorter.shape[0] - 1)]
+    if not np.array_equal(candidate_indexes[positions], selected_indexes):
+        error_msg = "Some selected frames are not candidates."
+        raise ValueError(error_msg)
+
+    return int(selected_indexes[np.argmin(np.asarray(candidate_deviations)[positions])])
+
+
+# Unittested
+@catch_errors_decorator
+def select_candidates(
+    candidate_indexes: np.ndarray,
+    candidate_deviations: np.ndarray,
+    max_candidates_local: int,
+    selection_strategy: str = "linspace",
+    seed: Union[int, List[int], None] = None,
+) -> np.ndarray:
+    """
+    Selects at most max_candidates_local frames among the candidates of a trajectory, with the given strategy.
+
+    Strategies:
+    - linspace: evenly spaced in the list of candidates, keeping the first and the last ones.
+    - deviation_weighted: random draw without replacement, with a probability proportional to the deviation.
+    - stratified: the deviation range is split into (up to 10) bins of equal width, the selection is shared
+      as evenly as possible between the bins (high deviations first) and evenly spaced in time inside each bin.
+    - decorrelated: largest stride (in frames) between two selected frames that still gives enough frames.
+    - farthest_point: farthest-point sampling on the (normalized) frame id and deviation, starting from the highest deviation.
+
+    Parameters
+    ----------
+    candidate_indexes : np.ndarray
+        The frame ids of the candidates (in increasing order).
+    candidate_deviations : np.ndarray
+        The deviation of the candidates (same order as candidate_indexes).
+    max_candidates_local : int
+        The maximum number of frames to select.
+    selection_strategy : str, optional
+        The selection strategy. Defaults to "linspace".
+    seed : Union[int, List[int], None], optional
+        The seed of the random generator (deviation_weighted only). Defaults to None.
+
+    Returns
+    -------
+    np.ndarray
+        The frame ids of the selected candidates (in increasing order).
+
+    Raises
+    ------
+    ValueError
+        If the selection strategy is not known.
+    ValueError
+        If the candidate indexes and deviations do not have the same shape.
+    """
+    candidate_indexes = np.asarray(candidate_indexes)
+    candidate_deviations = np.asarray(candidate_deviations, dtype=float)
+    if candidate_indexes.shape != candidate_deviations.shape:
+        error_msg = f"Shape mismatch between the candidate indexes '{candidate_indexes.shape}' and deviations '{candidate_deviations.shape}'."
+        raise ValueError(error_msg)
+
+    candidates_count = candidate_indexes.shape[0]
+    if selection_strategy not in [
+        "linspace",
+        "deviation_weighted",
+        "stratified",
+        "decorrelated",
+        "farthest_point",
+    ]:
+        error_msg = f"Selection strategy '{selection_strategy}' is not known."
+        raise ValueError(error_msg)
+    if candidates_count <= max_candidates_local:
+        return candidate_indexes
+    if max_candidates_local <= 0:
+        return candidate_indexes[:0]
+
+    if selection_strategy == "linspace":
+        positions = np.round(
+            np.linspace(0, candidates_count - 1, max_candidates_local)
+        ).astype(int)
+
+    elif selection_strategy == "deviation_weighted":
+        weights = np.clip(candidate_deviations, 0, None) + np.finfo(float).eps
+        positions = np.random.RandomState(seed).choice(
+            candidates_count,
+            size=max_candidates_local,
+            replace=False,
+            p=weights / np.sum(weights),
+        )
+
+    elif selection_strategy == "stratified":
+        bin_count = min(max_candidates_local, 10)
+        bin_edges = np.linspace(
+            np.min(candidate_deviations), np.max(candidate_deviations), bin_count + 1
+        )
+        bin_ids = np.clip(
+            np.searchsorted(bin_edges, candidate_deviations, side="right") - 1,
+            0,
+            bin_count - 1,
+        )
+        bin_sizes = np.bincount(bin_ids, minlength=bin_count)
+
+        # Share the selection between the bins, the leftovers going to the highest deviations
+        quotas = np.zeros(bin_count, dtype=int)
+        remaining = max_candidates_local
+        while remaining > 0:
+            open_bins = np.flatnonzero(quotas < bin_sizes)[::-1]
+            share = max(remaining // open_bins.shape[0], 1)
+            for it_bin in open_bins:
+                added = min(share, bin_sizes[it_bin] - quotas[it_bin], remaining)
+                quotas[it_bin] += added
+                remaining -= added
+                if remaining == 0:
+                    break
+
+        positions = []
+        for it_bin in np.flatnonzero(quotas):
+            members = np.flatnonzero(bin_ids == it_bin)
+            positions.append(
+                members[
+                    np.round(
+                        np.linspace(0, members.shape[0] - 1, quotas[it_bin])
+                    ).astype(int)
+                ]
+            )
+        positions = np.concatenate(positions)
+
+    elif selection_strategy == "decorrelated":
+        frames = candidate_indexes.astype(np.int64)
+
+        def pick_with_stride(stride):
+            picked = [0]
+            while True:
+                position = np.searchsorted(frames, frames[picked[-1]] + stride)
+                if position >= candidates_count:
+                    return np.array(picked)
+                picked.append(position)
+
+        # Largest stride still giving enough frames (any stride of 1 does, as frame ids are distinct)
+        lowest, highest = 1, max(1, int(frames[-1] - frames[0]))
+        while lowest < highest:
+            stride = (lowest + highest + 1) // 2
+            if pick_with_stride(stride).shape[0] >= max_candidates_local:
+                lowest = stride
+            else:
+                highest = stride - 1
+        picked = pick_with_stride(lowest)
+        positions = picked[
+            np.round(np.linspace(0, picked.shape[0] - 1, max_candidates_local)).astype(
+                int
+            )
+        ]
+
+    else:
+        descriptors = np.column_stack(
+            (candidate_indexes.astype(float), candidate_deviations)
+        )
+        descriptors_range = np.ptp(descriptors, axis=0)
+        descriptors = (descriptors - np.min(descriptors, axis=0)) / np.where(
+            descriptors_range > 0, descriptors_range, 1
+        )
+        positions = [int(np.argmax(candidate_deviations))]
+        distances = np.linalg.norm(descriptors - descriptors[positions[0]], axis=1)
+        for _ in range(max_candidates_local - 1):
+            positions.append(int(np.argmax(distances)))
+            distances = np.minimum(
+                distances,
+                np.linalg.norm(descriptors - descriptors[positions[-1]], axis=1),
+            )
+        positions = np.array(positions)
+
+    return candidate_indexes[np.sort(positions)]
+
+
+# Unittested
+@catch_errors_decorator
+def select_system_candidates(
+    trajectory_ids: np.ndarray,
+    candidate_indexes: np.ndarray,
+    candidate_deviations: np.ndarray,
+    trajectory_count: int,
+    max_candidates: int,
+    allocation_objective: str = "proportional",
+    selection_strategy: str = "linspace",
+    seeds: Union[List, None] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Selects the candidates of a system in one step, from the table of all its candidates (trajectory, frame id, deviation).
+
+    Nothing is removed if the system has no more than max_candidates candidates. Otherwise, the budget is shared with the objective:
+    - proportional: each trajectory gets ceil(max_candidates * its share of the candidates), then 'select_candidates'.
+    - fair: equal shares (water-filling, capped by the candidates of each trajectory, summing to max_candidates), then 'select_candidates'.
+    - max_spread: max_candidates frames evenly spaced in the deviation ranks of the whole system (selection_strategy is not used).
+
+    Parameters
+    ----------
+    trajectory_ids : np.ndarray
+        The trajectory (from 0 to trajectory_count - 1) of each candidate, the candidates of a trajectory being contiguous and in order.
+    candidate_indexes : np.ndarray
+        The frame id of each candidate.
+    candidate_deviations : np.ndarray
+        The deviation of each candidate.
+    trajectory_count : int
+        The number of trajectories of the system (including the ones without candidates).
+    max_candidates : int
+        The maximum number of candidates of the system.
+    allocation_objective : str, optional
+        The allocation objective. Defaults to "proportional".
+    selection_strategy : str, optional
+        The selection strategy inside each trajectory. Defaults to "linspace".
+    seeds : List, optional
+        The seed of each trajectory for 'select_candidates'. Defaults to None.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        - is_selected: A boolean array, True for the selected candidates (same order as the table).
+        - quotas: The number of candidates allowed in each trajectory, -1 if the system is not over budget.
+
+    Raises
+    ------
+    ValueError
+        If the allocation objective is not known.
+    ValueError
+        If the columns of the table do not have the same length.
+    """
+    trajectory_ids = np.asarray(trajectory_ids, dtype=np.int64)
+    candidate_indexes = np.asarray(candidate_indexes)
+    candidate_deviations = np.asarray(candidate_deviations, dtype=float)
+    if not (
+        trajectory_ids.shape == candidate_indexes.shape == candidate_deviations.shape
+    ):
+        error_msg = "Shape mismatch between the columns of the candidate table."
+        raise ValueError(error_msg)
+    if allocation_objective not in ["proportional", "fair", "max_spread"]:
+        error_msg = f"Allocation objective '{allocation_objective}' is not known."
+        raise ValueError(error_msg)
+
+    candidate_counts = np.bincount(trajectory_ids, minlength=trajectory_count)
+    total_count = int(np.sum(candidate_counts))
+    if total_count <= max_candidates:
+        return np.ones(total_count, dtype=bool), np.full(trajectory_count, -1)
+
+    if allocation_objective == "max_spread":
+        is_selected = np.zeros(total_count, dtype=bool)
+        if max_candidates > 0:
+            ranks = np.argsort(candidate_deviations, kind="stable")
+            is_selected[
+                ranks[
+                    np.round(np.linspace(0, total_count - 1, max_candidates)).astype(
+                        int
+                    )
+                ]
+            ] = True
+        quotas = np.bincount(trajectory_ids[is_selected], minlength=trajectory_count)
+        return is_selected, quotas
+
+    if allocation_objective == "proportional":
+        quotas = np.ceil(max_candidates * (candidate_counts / total_count)).astype(int)
+    else:
+        # Largest level such that min(count, level) fits in the budget, the leftovers going to the first trajectories above it
+        lowest, highest = 0, int(np.max(candidate_counts))
+        while lowest < highest:
+            level = (lowest + highest + 1) // 2
+            if np.sum(np.minimum(candidate_counts, level)) <= max_candidates:
+                lowest = level
+            else:
+                highest = level - 1
+        quotas = np.minimum(candidate_counts, lowest)
+        leftovers = max_candidates - int(np.sum(quotas))
+        quotas[np.flatnonzero(candidate_counts > lowest)[:leftovers]] += 1
+
+    is_selected = np.zeros(total_count, dtype=bool)
+    offsets = np.concatenate(([0], np.cumsum(candidate_counts)))
+    for trajectory_index in np.flatnonzero(candidate_counts):
+        trajectory_slice = slice(
+            offsets[trajectory_index], offsets[trajectory_index + 1]
+        )
+        selected_indexes = select_candidates(
+            candidate_indexes[trajectory_slice],
+            candidate_deviations[trajectory_slice],
+            int(quotas[trajectory_index]),
+            selection_strategy,
+            seeds[trajectory_index] if seeds is not None else None,
+        )
+        is_selected[trajectory_slice] = np.isin(
+            candidate_indexes[trajectory_slice], selected_indexes
+        )
+
+    return is_selected, quotas
+
+
+# Unittested
+@catch_errors_decorator
+def compute_trajectory_deviation(
+    local_path: Path,
+    exploration_type: str,
+    model_deviation_filename: str,
+    xyz_qm_filename: str,
+    print_every_x_steps: int,
+    start_row_number: int,
+    nb_steps_expected: int,
+    sigma_low: float,
+    sigma_high: float,
+    sigma_high_limit: float,
+    disturbed_start: bool,
+    chunk_size: int = 0,
+    write_files: bool = True,
+) -> Tuple[Dict, bool, bool, int, np.ndarray, Dict]:
+    """
+    Computes the Query-by-Committee statistics and indexes of one trajectory and writes them in the trajectory folder.
+
+    The QbC_stats.json and QbC_indexes.json files of the trajectory are updated (created if missing), unless write_files is False:
+    they are then neither read nor written (the caller writes the QbC data, once the selection is done).
+    This function does not log anything, so it can be run in a worker process: everything the caller needs to report is returned.
+
+    Parameters
+    ----------
+    local_path : Path
+        The path to the trajectory folder.
+    exploration_type : str
+        The exploration type ("lammps", "i-PI" or "sander_emle").
+    model_deviation_filename : str
+        The name of the model deviation file (for "lammps" and "i-PI").
+    xyz_qm_filename : str
+        The name of the QM XYZ trajectory file (for "sander_emle").
+    print_every_x_steps : int
+        The printing frequency of the trajectory.
+    start_row_number : int
+        The first row to take into account (to ignore the first ps).
+    nb_steps_expected : int
+        The expected number of rows (after start_row_number).
+    sigma_low : float
+        The lower deviation threshold (below or equal: good).
+    sigma_high : float
+        The higher deviation threshold (above or equal: rejected).
+    sigma_high_limit : float
+        The deviation limit after which everything is rejected.
+    disturbed_start : bool
+        Whether the first frame is disturbed (and should be ignored for the limit).
+    chunk_size : int, optional
+        If strictly positive, the model deviation file (lammps/i-PI) is read by blocks of chunk_size rows
+        (bounded memory, approximate median). Defaults to 0 (whole file in memory).
+    write_files : bool, optional
+        Whether to write the QbC_stats.json and QbC_indexes.json files. Defaults to True.
+
+    Returns
+    -------
+    Tuple[Dict, bool, bool, int, np.ndarray, Dict]
+        - QbC_stats: The updated statistics of the trajectory.
+        - is_skipped_user: Whether the trajectory was skipped by the user.
+        - is_skipped_stats: Whether the trajectory was discarded because sigma_high_limit was crossed before start_row_number.
+        - row_count: The number of rows found (after start_row_number), -1 if skipped by the user.
+        - candidate_deviations: The deviation of the candidates (same order as 'candidate_indexes'), so they are not read again for the selection.
+        - QbC_indexes: The updated indexes (good, rejected and candidates) of the trajectory.
+
+    Raises
+    ------
+    ValueError
+        If the exploration type is unknown or if there are more rows than expected.
+    """
+    # Create the JSON data for Query-by-Committee (the JSON files are only updated when they are written here)
+    if write_files:
+        QbC_stats = load_json_file(local_path / "QbC_stats.json", False, False)
+        QbC_indexes = load_json_file(local_path / "QbC_indexes.json", False, False)
+    else:
+        QbC_stats, QbC_indexes = {}, {}
+    QbC_stats = {
+        **QbC_stats,
+        "sigma_low": sigma_low,
+        "sigma_high": sigma_high,
+        "sigma_high_limit": sigma_high_limit,
+    }
+
+    # If the trajectory was skipped by the user, count everything as a failure
+    if (local_path / "skip").is_file():
+        QbC_indexes = {
+            **QbC_indexes,
+            "good_indexes": [],
+            "rejected_indexes": [],
+            "candidate_indexes": [],
+        }
+        QbC_stats = {
+            **QbC_stats,
+            "total_count": nb_steps_expected,
+            "mean_deviation_max_f": 999.0,
+            "median_deviation_max_f": 999.0,
+            "stdeviation_deviation_max_f": 999.0,
+            "good_count": 0,
+            "rejected_count": nb_steps_expected,
+            "candidates_count": 0,
+        }
+        if write_files:
+            write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
+            write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
+        return QbC_stats, True, False, -1, np.array([], dtype=np.float64), QbC_indexes
+
+    is_forced = (local_path / "force").is_file()
+
+    # The deviation column is the last one for sander_emle ([frame, max_f_std]) and the fifth for lammps/i-PI
+    if exploration_type == "sander_emle":
+        (
+            num_atoms,
+            atom_symbols,
+            atom_coords,
+            comments,
+            cell_info,
+            pbc_info,
+            properties_info,
+            max_f_std_info,
+        ) = parse_xyz_trajectory_file(local_path / xyz_qm_filename)
+        model_deviation = np.vstack(
+            (
+                [_ for _ in range(0, len(max_f_std_info), print_every_x_steps)],
+                max_f_std_info,
+            )
+        ).T
+        deviation_column = 1
+    elif exploration_type == "lammps" or exploration_type == "i-PI":
+        deviation_column = 4
+        # Streaming mode: the model deviation file is read by blocks of rows
+        if chunk_size > 0:
+            (
+                good_indexes,
+                candidate_indexes,
+                rejected_indexes,
+                candidate_deviations,
+                deviation_stats,
+                end_row_number,
+                file_row_number,
+            ) = classify_deviation_by_chunks(
+                read_model_deviation_file_by_chunks(
+                    local_path / model_deviation_filename, chunk_size
+                ),
+                deviation_column,
+                sigma_low,
+                sigma_high,
+                sigma_high_limit,
+                start_row_number,
+                disturbed_start,
+                is_forced,
+            )
+        else:
+            model_deviation = read_model_deviation_file(
+                local_path / model_deviation_filename
+            )
+    else:
+        error_msg = "Unknown exploration type. Please BUG REPORT!"
+        raise ValueError(error_msg)
+
+    if exploration_type == "sander_emle" or chunk_size <= 0:
+        file_row_number = model_deviation.shape[0]
+        end_row_number = get_last_frame_number(
+            model_deviation, sigma_high_limit, disturbed_start
+        )
+        if is_forced:
+            end_row_number = model_deviation.shape[0] - 1
+        (
+            good_indexes,
+            candidate_indexes,
+            rejected_indexes,
+            candidate_deviations,
+            deviation_stats,
+        ) = classify_deviation(
+            model_deviation[:, 0],
+            model_deviation[:, deviation_column],
+            sigma_low,
+            sigma_high,
+            start_row_number,
+            end_row_number,
+        )
+
+    # The first row is not in the i-PI model deviation file
+    total_row_number = file_row_number + (1 if exploration_type == "i-PI" else 0)
+    row_count = total_row_number - start_row_number
+    if nb_steps_expected > row_count:
+        QbC_stats["total_count"] = nb_steps_expected
+    elif nb_steps_expected == row_count:
+        QbC_stats["total_count"] = row_count
+    else:
+        error_msg = f"More steps ('{row_count}') than expected ('{nb_steps_expected}') in '{local_path}'. Please BUG REPORT!"
+        raise ValueError(error_msg)
+
+    # This part is when sigma_high_limit was crossed during ignore_first_x_ps (SKIP everything for stats)
+    is_skipped_stats = 0 <= end_row_number <= start_row_number
+
+    QbC_indexes = {
+        **QbC_indexes,
+        "good_indexes": good_indexes.tolist(),
+        "rejected_indexes": rejected_indexes.tolist(),
+        "candidate_indexes": candidate_indexes.tolist(),
+    }
+    QbC_stats = {
+        **QbC_stats,
+        **deviation_stats,
+        "good_count": good_indexes.shape[0],
+        "rejected_count": rejected_indexes.shape[0],
+        "candidates_count": candidate_indexes.shape[0],
+    }
+
+    # If the traj is smaller than expected (forced case) add the missing as rejected
+    found_count = (
+        QbC_stats["good_count"]
+        + QbC_stats["rejected_count"]
+        + QbC_stats["candidates_count"]
+    )
+    if found_count < nb_steps_expected:
+        QbC_stats["rejected_count"] = (
+            QbC_stats["rejected_count"] + nb_steps_expected - found_count
+        )
+
+    if write_files:
+        write_json_file(QbC_stats, local_path / "QbC_stats.json", False)
+        write_json_file(QbC_indexes, local_path / "QbC_indexes.json", False)
+
+    return (
+        QbC_stats,
+        False,
+        is_skipped_stats,
+        row_count,
+        candidate_deviations,
+        QbC_indexes,
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def write_qbc_store_file(
+    QbC_data: Dict[Tuple[str, int, int], Tuple[Dict, Dict]], file_path: Path
+) -> None:
+    """
+    Writes the Query-by-Committee statistics and indexes of all the trajectories of an iteration in a single NumPy archive.
+
+    The archive is columnar: the trajectories are described by their system, NNP and number, each statistic is one array
+    (one value per trajectory) and each list of indexes is stored as one concatenated array with its offsets (the indexes
+    of the i-th trajectory being values[offsets[i]:offsets[i + 1]]). A statistic missing for some trajectories is flagged by a boolean array.
+
+    Parameters
+    ----------
+    QbC_data : Dict[Tuple[str, int, int], Tuple[Dict, Dict]]
+        The (QbC_stats, QbC_indexes) of each (system_auto, it_nnp, it_number), in order.
+    file_path : Path
+        The path of the archive (.npz).
+
+    Returns
+    -------
+    None
+
+    Raises
+    ------
+    ValueError
+        If a statistic is not a number.
+    """
+    trajectory_keys = list(QbC_data.keys())
+    system_names = list(dict.fromkeys(_[0] for _ in trajectory_keys))
+    arrays = {
+        "system_names": np.array(system_names, dtype=str),
+        "system_ids": np.array(
+            [system_names.index(_[0]) for _ in trajectory_keys], dtype=np.int64
+        ),
+        "nnp_numbers": np.array([_[1] for _ in trajectory_keys], dtype=np.int64),
+        "trajectory_numbers": np.array([_[2] for _ in trajectory_keys], dtype=np.int64),
+    }
+
+    stats_keys = list(
+        dict.fromkeys(key for QbC_stats, _ in QbC_data.values() for key in QbC_stats)
+    )
+    for key in stats_keys:
+        values = [QbC_stats.get(key) for QbC_stats, _ in QbC_data.values()]
+        if any(
+            isinstance(value, bool) or not isinstance(value, (int, float, type(None)))
+            for value in values
+        ):
+            error_msg = f"The statistic '{key}' is not a number."
+            raise ValueError(error_msg)
+        is_missing = np.array([value is None for value in values])
+        arrays[f"stats_{key}"] = np.array(
+            [0 if value is None else value for value in values],
+            dtype=(
+                np.int64
+                if all(isinstance(value, (int, type(None))) for value in values)
+                else np.float64
+            ),
+        )
+        arrays[f"missing_{key}"] = is_missing
+
+    indexes_keys = list(
+        dict.fromkeys(
+            key for _, QbC_indexes in QbC_data.values() for key in QbC_indexes
+        )
+    )
+    for key in indexes_keys:
+        indexes = [QbC_indexes.get(key, []) for _, QbC_indexes in QbC_data.values()]
+        arrays[f"offsets_{key}"] = np.concatenate(
+            ([0], np.cumsum([len(_) for _ in indexes]))
+        ).astype(np.int64)
+        arrays[f"indexes_{key}"] = np.array(
+            [index for _ in indexes for index in _], dtype=np.int64
+        )
+
+    arrays["stats_keys"] = np.array(stats_keys, dtype=str)
+    arrays["indexes_keys"] = np.array(indexes_keys, dtype=str)
+
+    with Path(file_path).open("wb") as f:
+        np.savez(f, **arrays)
+
+
+# Unittested
+@catch_errors_decorator
+def load_qbc_store_file(
+    file_path: Path,
+) -> Dict[Tuple[str, int, int], Tuple[Dict, Dict]]:
+    """
+    Loads the Query-by-Committee statistics and indexes written by 'write_qbc_store_file'.
+
+    Parameters
+    ----------
+    file_path : Path
+        The path of the archive (.npz).
+
+    Returns
+    -------
+    Dict[Tuple[str, int, int], Tuple[Dict, Dict]]
+        The (QbC_stats, QbC_indexes) of each (system_auto, it_nnp, it_number), as in the legacy JSON files.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file is not found.
+    """
+    if not Path(file_path).is_file():
+        error_msg = f"File not found: '{file_path}'."
+        raise FileNotFoundError(error_msg)
+
+    with np.load(file_path, allow_pickle=False) as store:
+        system_names = store["system_names"].tolist()
+        trajectory_keys = [
+            (system_names[system_id], int(it_nnp), int(it_number))
+            for system_id, it_nnp, it_number in zip(
+                store["system_ids"], store["nnp_numbers"], store["trajectory_numbers"]
+            )
+        ]
+        stats = {
+            key: (store[f"stats_{key}"].tolist(), store[f"missing_{key}"])
+            for key in store["stats_keys"].tolist()
+        }
+        indexes = {
+            key: (store[f"indexes_{key}"], store[f"offsets_{key}"])
+            for key in store["indexes_keys"].tolist()
+        }
+
+    QbC_data = {}
+    for trajectory_index, trajectory_key in enumerate(trajectory_keys):
+        QbC_stats = {
+            key: values[trajectory_index]
+            for key, (values, is_missing) in stats.items()
+            if not is_missing[trajectory_index]
+        }
+        QbC_indexes = {
+            key: values[
+                offsets[trajectory_index] : offsets[trajectory_index + 1]
+            ].tolist()
+            for key, (values, offsets) in indexes.items()
+        }
+        QbC_data[trajectory_key] = (QbC_stats, QbC_indexes)
+
+    return QbC_data
+
+
+# Unittested
+@catch_errors_decorator
+def find_new_duplicate_candidates(
+    atomic_symbols: np.ndarray,
+    atomic_coordinates: np.ndarray,
+    cell_lengths: np.ndarray,
+    kept_fingerprints: Union[np.ndarray, None],
+    deduplication_threshold: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flags the new candidates of a system that are near-duplicates of a candidate already kept (or of an earlier new one).
+
+    Each frame is described by its pair-distance histograms per pair of elements (with the minimum image convention
+    when its cell lengths are not zero), which do not depend on the orientation or the atom ordering. A candidate is a
+    duplicate if its fingerprint is closer than the threshold to the one of a kept candidate (or of an earlier new
+    one).
+
+    The candidates are given by batches (one per trajectory) and only the fingerprints of the kept ones are carried from
+    one batch to the next, so the candidates can be written as they are extracted. The result is the same as with all
+    the candidates at once.
+
+    Parameters
+    ----------
+    atomic_symbols : np.ndarray
+        The atomic symbols of the new candidates, shape (frame_count, atom_count).
+    atomic_coordinates : np.ndarray
+        The atomic coordinates of the new candidates, shape (frame_count, atom_count, 3).
+    cell_lengths : np.ndarray
+        The orthorhombic cell lengths of the new candidates, shape (frame_count, 3) (zeros for no periodicity).
+    kept_fingerprints : Union[np.ndarray, None]
+        The fingerprints of the candidates already kept, None for the first batch.
+    deduplication_threshold : float
+        The fingerprint distance under which two candidates are duplicates.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        A boolean array, True for the new candidates to remove, and the fingerprints of all the kept candidates.
+
+    Raises
+    ------
+    ValueError
+        If the new candidates do not have the same elements as the kept ones.
+    """
+    fingerprints = compute_pair_distance_fingerprints(
+        atomic_symbols, atomic_coordinates, cell_lengths
+    )
+    if kept_fingerprints is None:
+        kept_fingerprints = np.zeros((0, fingerprints.shape[1]))
+    elif kept_fingerprints.shape[1] != fingerprints.shape[1]:
+        error_msg = "The candidates do not all have the same elements."
+        raise ValueError(error_msg)
+
+    is_duplicate = find_near_duplicate_frames(
+        np.concatenate((kept_fingerprints, fingerprints)), deduplication_threshold
+    )[kept_fingerprints.shape[0] :]
+    return is_duplicate, np.concatenate(
+        (kept_fingerprints, fingerprints[~is_duplicate])
+    )
+
+
+# Unittested
+@catch_errors_decorator
+def extract_trajectory_structures(
+    local_path: Path,
+    trajectory_file: Path,
+    exploration_type: str,
+    QbC_stats: Dict,
+    QbC_indexes: Dict,
+    print_every_x_steps: int,
+    system_cell: List[float],
+    dcd_reader: str,
+    topology_symbols: Union[np.ndarray, None],
+    starting_structure_prefix: Path,
+    properties: Dict,
+    disturbed_start_value: float,
+    disturbed_start_indexes: List[int],
+    disturbed_candidate_value: float,
+    disturbed_candidate_indexes: List[int],
+    seed: List[int],
+) -> Dict:
+    """
+    Extracts the starting structure (XYZ and LAMMPS data files) and the candidates (as arrays) of one trajectory.
+
+    The starting structure (frame of minimum deviation, "lammps" and "i-PI" only) is written as
+    'PREFIX_XXXXX.xyz' and 'PREFIX_XXXXX.lmp' (and '_disturbed' ones if disturbed_start_value is not 0). The candidates
+    are returned, so the caller can deduplicate them and append them to the file of the system in the order of the
+    trajectories. With dcd_reader "vmd", the XYZ files written by the VMD batch are read (and the candidate ones removed).
+    This function does not log anything, so it can be run in a worker process: everything the caller needs to report is returned.
+
+    Parameters
+    ----------
+    local_path : Path
+        The path to the trajectory folder.
+    trajectory_file : Path
+        The trajectory file (DCD for "lammps" and "i-PI", QM XYZ for "sander_emle").
+    exploration_type : str
+        The exploration type ("lammps", "i-PI" or "sander_emle").
+    QbC_stats : Dict
+        The Query-by-Committee statistics of the trajectory ('minimum_index' and 'selected_count').
+    QbC_indexes : Dict
+        The Query-by-Committee indexes of the trajectory ('selected_indexes').
+    print_every_x_steps : int
+        The printing frequency of the trajectory ("lammps" frames are steps divided by it).
+    system_cell : List[float]
+        The cell lengths of the system, used if the trajectory folder has no 'cell_lengths.npy' or 'cell.txt' file.
+    dcd_reader : str
+        How the DCD frames are read: "native" or "vmd" (files already written by the VMD batch).
+    topology_symbols : Union[np.ndarray, None]
+        The atomic symbols of the PDB topology ("native" only).
+    starting_structure_prefix : Path
+        The path (without the frame index and extension) of the starting structure files.
+    properties : Dict
+        The atom types, with their 'symbol' and 'mass', for the LAMMPS data files.
+    disturbed_start_value : float
+        The maximal displacement of the disturbed starting structure (0 for none).
+    disturbed_start_indexes : List[int]
+        The (zero-based) indexes of the atoms to disturb in the starting structure (all if empty).
+    disturbed_candidate_value : float
+        The maximal displacement of the disturbed candidates (0 for none, not supported for "sander_emle").
+    disturbed_candidate_indexes : List[int]
+        The (zero-based) indexes of the atoms to disturb in the candidates (all if empty).
+    seed : List[int]
+        The seed of the trajectory (with 0 appended for the starting structure, 1 for the candidates).
+
+    Returns
+    -------
+    Dict
+        - error: The error message if the trajectory does not match the topology, None otherwise.
+        - candidate_indexes: The frame indexes of the candidates (empty if none).
+        - atomic_symbols, atomic_coordinates, comments, cell_lengths: The candidates (None if none).
+        - disturbed_coordinates: The coordinates of the disturbed candidates (None if not disturbed).
+    """
+    results = {
+        "error": None,
+        "candidate_indexes": [],
+        "atomic_symbols": None,
+        "atomic_coordinates": None,
+        "comments": None,
+        "cell_lengths": None,
+        "disturbed_coordinates": None,
+    }
+    is_dcd = exploration_type in ["lammps", "i-PI"]
+    frame_stride = print_every_x_steps if exploration_type == "lammps" else 1
+
+    # The compact cell lengths written by exploration check (only the needed frames are read), or the full print
+    # output of the iterations checked before
+    if (local_path / "cell_lengths.npy").is_file():
+        cell_lengths, is_cell_constant = read_cell_lengths_file(
+            local_path / "cell_lengths.npy"
+        )
+        constant_cell = cell_lengths.tolist() if is_cell_constant else None
+    elif (local_path / "cell.txt").is_file():
+        cell_array = np.genfromtxt(local_path / "cell.txt")
+        cell_lengths = cell_array[:, 1::2] - cell_array[:, 0::2]
+        is_cell_constant = False
+    else:
+        constant_cell = list(system_cell)
+        cell_lengths = np.array(constant_cell, dtype=float)
+        is_cell_constant = True
+
+    def get_comments(frame_indexes: List[int]) -> List[str]:
+        if is_cell_constant:
+            cella, cellb, cellc = constant_cell
+            return [
+                f'Lattice="{cella} 0.0000 0.0000 0.0000 {cellb} 0.0000 0.0000 0.0000 {cellc}" Properties=species:S:1:pos:R:3 Frame={_}'
+                for _ in frame_indexes
+            ]
+        return [
+            f'Lattice="{cell_lengths[_, 0]} 0.0000 0.0000 0.0000 {cell_lengths[_, 1]} 0.0000 0.0000 0.0000 {cell_lengths[_, 2]}" Properties=species:S:1:pos:R:3 Frame={_}'
+            for _ in frame_indexes
+        ]
+
+    def read_frames(
+        frame_indexes: List[int], xyz_files: List[Path], comments: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if dcd_reader == "native":
+            atomic_coordinates, _ = read_dcd_frames(trajectory_file, frame_indexes)
+            if atomic_coordinates.shape[1] != topology_symbols.shape[0]:
+                return None, None
+            return (
+                np.broadcast_to(
+                    topology_symbols, (len(frame_indexes), topology_symbols.shape[0])
+                ),
+                atomic_coordinates,
+            )
+        # The XYZ files written by the VMD batch, with their header replaced
+        xyz_lines = []
+        for xyz_file, comment in zip(xyz_files, comments):
+            xyz_string = textfile_to_string_list(xyz_file)
+            xyz_lines += [xyz_string[0], comment] + xyz_string[2:]
+        _, atomic_symbols, atomic_coordinates, *_ = parse_xyz_lines(xyz_lines)
+        return atomic_symbols, atomic_coordinates
+
+    # Selection of the structure for the next iteration starting point
+    if QbC_stats["minimum_index"] != -1 and is_dcd:
+        min_index = int(QbC_stats["minimum_index"] / frame_stride)
+        min_file = starting_structure_prefix.parent / (
+            f"{starting_structure_prefix.name}_{str(min_index).zfill(5)}"
+        )
+        comments = get_comments([min_index])
+        if dcd_reader == "native":
+            # DCD -> XYZ
+            atomic_symbols, atomic_coordinates = read_frames([min_index], [], [])
+            if atomic_coordinates is None:
+                results["error"] = (
+                    f"The number of atoms in '{trajectory_file}' does not match the topology."
+                )
+                return results
+            write_xyz_frames(
+                min_file.parent / f"{min_file.name}.xyz",
+                [0],
+                [atomic_symbols.shape[1]],
+                atomic_symbols,
+                atomic_coordinates,
+                np.array([]),
+                comments,
+            )
+        else:
+            # The XYZ file was written by the VMD batch, only its header is replaced
+            xyz_string = textfile_to_string_list(
+                min_file.parent / f"{min_file.name}.xyz"
+            )
+            _, atomic_symbols, atomic_coordinates, *_ = parse_xyz_lines(xyz_string)
+            string_list_to_textfile(
+                min_file.parent / f"{min_file.name}.xyz",
+                [xyz_string[0]] + comments + xyz_string[2:],
+            )
+        min_cell = (
+            cell_lengths if is_cell_constant else np.array(cell_lengths[min_index])
+        )
+
+        # XYZ -> LMP
+        write_lammps_data(
+            min_file.parent / f"{min_file.name}.lmp",
+            atomic_symbols[0],
+            atomic_coordinates[0],
+            min_cell,
+            properties,
+            min_file.name,
+        )
+
+        # XYZ ==> XYZ_disturbed -> LMP
+        if disturbed_start_value != 0:
+            atomic_coordinates = disturb_atomic_coordinates(
+                atomic_coordinates,
+                disturbed_start_value,
+                disturbed_start_indexes,
+                seed + [0],
+            )
+            write_xyz_frames(
+                min_file.parent / f"{min_file.name}_disturbed.xyz",
+                [0],
+                [atomic_symbols.shape[1]],
+                atomic_symbols,
+                atomic_coordinates,
+                np.array([]),
+                comments,
+            )
+            write_lammps_data(
+                min_file.parent / f"{min_file.name}_disturbed.lmp",
+                atomic_symbols[0],
+                atomic_coordinates[0],
+                min_cell,
+                properties,
+                f"{min_file.name}_disturbed",
+            )
+
+    # Selection of labeling XYZ
+    if QbC_stats["selected_count"] > 0:
+        candidate_indexes = (
+            (np.array(QbC_indexes["selected_indexes"]) / frame_stride)
+            .astype(int)
+            .tolist()
+        )
+        if is_dcd:
+            comments = get_comments(candidate_indexes)
+            xyz_files = [
+                local_path / f"candidates_{str(_).zfill(5)}.xyz"
+                for _ in candidate_indexes
+            ]
+            atomic_symbols, atomic_coordinates = read_frames(
+                candidate_indexes, xyz_files, comments
+            )
+            if atomic_coordinates is None:
+                results["error"] = (
+                    f"The number of atoms in '{trajectory_file}' does not match the topology."
+                )
+                return results
+            if dcd_reader != "native":
+                for xyz_file in xyz_files:
+                    remove_file(xyz_file)
+            if is_cell_constant:
+                candidate_cell_lengths = np.tile(
+                    cell_lengths, (len(candidate_indexes), 1)
+                )
+            else:
+                candidate_cell_lengths = np.array(cell_lengths[candidate_indexes])
+        else:
+            (
+                _,
+                atomic_symbols,
+                atomic_coordinates,
+                comments,
+                lattice_info,
+                *_,
+            ) = read_xyz_frames(trajectory_file, candidate_indexes)
+            candidate_cell_lengths = np.array(
+                [_[[0, 4, 8]] if _ is not None else np.zeros(3) for _ in lattice_info]
+            )
+
+        results.update(
+            {
+                "candidate_indexes": candidate_indexes,
+                "atomic_symbols": atomic_symbols,
+                "atomic_coordinates": atomic_coordinates,
+                "comments": comments,
+                "cell_lengths": candidate_cell_lengths,
+            }
+        )
+        # All the candidates of the trajectory are disturbed at once
+        if disturbed_candidate_value != 0 and is_dcd:
+            results["disturbed_coordinates"] = disturb_atomic_coordinates(
+                atomic_coordinates,
+                disturbed_candidate_value,
+                disturbed_candidate_indexes,
+                seed + [1],
+            )
+
+    return results
+
+
+# Unittested
+@catch_errors_decorator
+def disturb_atomic_coordinates(
+    atomic_coordinates: np.ndarray,
+    disturbed_value: float,
+    disturbed_indexes: Union[List[int], None] = None,
+    seed: Union[int, List[int], None] = None,
+) -> np.ndarray:
+    """
+    Returns the atomic coordinates of one or several frames with a random displacement applied to (some of) the atoms.
+
+    Each component of the displacement of each atom is drawn uniformly between -disturbed_value and disturbed_value,
+    for all the frames at once.
+
+    Parameters
+    ----------
+    atomic_coordinates : np.ndarray
+        The atomic coordinates, shape (frame_count, atom_count, 3).
+    disturbed_value : float
+        The maximal displacement along each direction (in Å).
+    disturbed_indexes : Union[List[int], None], optional
+        The (zero-based) indexes of the atoms to displace, all the atoms if None or empty. Defaults to None.
+    seed : Union[int, List[int], None], optional
+        The seed of the random generator. Defaults to None.
+
+    Returns
+    -------
+    np.ndarray
+        The disturbed atomic coordinates (a new array).
+
+    Raises
+    ------
+    ValueError
+        If an atom index is out of range.
+    """
+    disturbed_coordinates = np.array(atomic_coordinates, dtype=np.float64)
+    rng = np.random.RandomState(seed)
+    if not disturbed_indexes:
+        disturbed_coordinates += rng.uniform(
+            -disturbed_value, disturbed_value, disturbed_coordinates.shape
+        )
+        return disturbed_coordinates
+
+    disturbed_indexes = np.asarray(disturbed_indexes, dtype=int)
+    atom_count = disturbed_coordinates.shape[1]
+    if np.any((disturbed_indexes < 0) | (disturbed_indexes >= atom_count)):
+        error_msg = f"Atom indexes out of range (0 to {atom_count - 1}): '{disturbed_indexes.tolist()}'."
+        raise ValueError(error_msg)
+    disturbed_coordinates[:, disturbed_indexes] += rng.uniform(
+        -disturbed_value,
+        disturbed_value,
+        (disturbed_coordinates.shape[0], disturbed_indexes.shape[0], 3),
+    )
+    return disturbed_coordinates
+
+
 # TODO: Sould be renamed because it is not returning a factor or a number of steps but a time of simulation
 # Unittested
 @catch_errors_decorator
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -105,6 +105,8 @@ def main(
     arcann_logger.info("Deleting job error files...")
     remove_files_matching_glob(current_path, "**/CP2K.*")
     remove_files_matching_glob(current_path, "**/ORCA.*")
+    arcann_logger.info("Deleting extraction manifest files...")
+    remove_files_matching_glob(current_path, "**/extract_manifest*.npz")
     arcann_logger.info(f"Cleaning done!")
     arcann_logger.info(f"Compressing into a bzip2 tar archive...")
 
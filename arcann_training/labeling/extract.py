@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/08/28
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -19,18 +19,24 @@ import importlib
 import numpy as np
 
 # Local imports
-from arcann_training.common.json import load_json_file, write_json_file
+from arcann_training.common.json import (
+    load_json_file,
+    write_json_file,
+    get_key_in_dict,
+    load_default_json_file,
+    backup_and_overwrite_json_file,
+)
 from arcann_training.common.list import textfile_to_string_list, string_list_to_textfile
 from arcann_training.common.filesystem import check_file_existence
-from arcann_training.common.parsing_labeling import (
-    extract_and_convert_energy,
-    extract_and_convert_forces,
-    extract_and_convert_virial,
-    extract_and_convert_wannier,
-    extract_and_convert_box_volume,
-    extract_and_convert_coordinates,
-)
 from arcann_training.common.check import validate_step_folder
+from arcann_training.common.cp2k import read_cp2k_input_cell
+from arcann_training.common.utils import run_in_parallel
+from arcann_training.labeling.utils import (
+    extract_labeling_step,
+    get_labeling_step_signature,
+    load_labeling_extract_manifest,
+    write_labeling_extract_manifest,
+)
 
 # Import constants
 try:
@@ -87,6 +93,34 @@ def main(
     padded_curr_iter = Path().resolve().parts[-1].split("-")[0]
     curr_iter = int(padded_curr_iter)
 
+    # Load the default input JSON
+    default_input_json = load_default_json_file(
+        deepmd_iterative_path / "assets" / "default_config.json"
+    )[current_step]
+    default_input_json_present = bool(default_input_json)
+    arcann_logger.debug(f"default_input_json: {default_input_json}")
+    arcann_logger.debug(f"default_input_json_present: {default_input_json_present}")
+
+    # Load the user input JSON
+    if (current_path / user_input_json_filename).is_file():
+        user_input_json = load_json_file((current_path / user_input_json_filename))
+    else:
+        user_input_json = {}
+    user_input_json_present = bool(user_input_json)
+    arcann_logger.debug(f"user_input_json: {user_input_json}")
+    arcann_logger.debug(f"user_input_json_present: {user_input_json_present}")
+
+    # If the used input JSON is present, load it
+    if (current_path / "used_input.json").is_file():
+        current_input_json = load_json_file((current_path / "used_input.json"))
+    else:
+        arcann_logger.warning(f"No used_input.json found. Starting with empty one.")
+        arcann_logger.warning(
+            f"You should avoid this by not deleting the used_input.json file."
+        )
+        current_input_json = {}
+    arcann_logger.debug(f"current_input_json: {current_input_json}")
+
     # Get control path, load the main JSON and the exploration JSON
     control_path = training_path / "control"
     main_json = load_json_file((control_path / "config.json"))
@@ -101,6 +135,46 @@ def main(
         arcann_logger.error(f"Aborting...")
         return 1
 
+    # Number of worker processes parsing the labeling steps
+    current_input_json["nb_jobs"] = get_key_in_dict(
+        "nb_jobs",
+        user_input_json if "nb_jobs" in user_input_json else current_input_json,
+        {},
+        default_input_json,
+    )
+    nb_jobs = current_input_json["nb_jobs"]
+    arcann_logger.debug(f"nb_jobs: {nb_jobs}")
+
+    # Reuse the rows of the steps unchanged since the previous extraction
+    current_input_json["incremental_extract"] = get_key_in_dict(
+        "incremental_extract",
+        (
+            user_input_json
+            if "incremental_extract" in user_input_json
+            else current_input_json
+        ),
+        {},
+        default_input_json,
+    )
+    incremental_extract = current_input_json["incremental_extract"]
+    arcann_logger.debug(f"incremental_extract: {incremental_extract}")
+
+    # The training reads the NumPy arrays (set.000/*.npy), the raw text files are only a copy for the user
+    current_input_json["output_format"] = get_key_in_dict(
+        "output_format",
+        user_input_json if "output_format" in user_input_json else current_input_json,
+        {},
+        default_input_json,
+    )
+    output_format = current_input_json["output_format"]
+    arcann_logger.debug(f"output_format: {output_format}")
+    if output_format not in ["npy", "both"]:
+        arcann_logger.error(
+            f"The output format must be 'npy' or 'both' (npy and raw), not '{output_format}'."
+        )
+        arcann_logger.error(f"Aborting...")
+        return 1
+
     # Create if it doesn't exists the data path.
     (training_path / "data").mkdir(exist_ok=True)
 
@@ -121,436 +195,217 @@ def main(
             continue
 
         system_path = current_path / system_auto
+        system_atom_count = main_json["systems_auto"][system_auto]["nb_atm"]
 
-        data_path = training_path / "data" / (system_auto + "_" + padded_curr_iter)
-        data_path.mkdir(exist_ok=True)
-        (data_path / "set.000").mkdir(exist_ok=True)
-
-        energy_array_raw = np.zeros(
-            (system_candidates_count - system_candidates_skipped_count),
-            dtype=np.float64,
-        )
-        coord_array_raw = np.zeros(
-            (
-                system_candidates_count - system_candidates_skipped_count,
-                main_json["systems_auto"][system_auto]["nb_atm"] * 3,
-            ),
-            dtype=np.float64,
-        )
-        box_array_raw = np.zeros(
-            (system_candidates_count - system_candidates_skipped_count, 9),
-            dtype=np.float64,
-        )
-        volume_array_raw = np.zeros(
-            (system_candidates_count - system_candidates_skipped_count),
-            dtype=np.float64,
-        )
-        force_array_raw = np.zeros(
+        # The candidates, then the disturbed candidates (labeled in the step folders following the candidates)
+        for data_suffix, first_labeling_step, steps_count, skipped_count in [
+            ("", 0, system_candidates_count, system_candidates_skipped_count),
             (
-                system_candidates_count - system_candidates_skipped_count,
-                main_json["systems_auto"][system_auto]["nb_atm"] * 3,
+                "-disturbed",
+                system_candidates_count,
+                labeling_json["systems_auto"][system_auto][
+                    "disturbed_candidates_count"
+                ],
+                labeling_json["systems_auto"][system_auto][
+                    "disturbed_candidates_skipped_count"
+                ],
             ),
-            dtype=np.float64,
-        )
-        virial_array_raw = np.zeros(
-            (system_candidates_count - system_candidates_skipped_count, 9),
-            dtype=np.float64,
-        )
-        # Options
-        is_virial = False
-        is_wannier = False
-
-        # Wannier
-        wannier_not_converged = ["#Indexes start at 0\n"]
-
-        # counter for non skipped configurations
-        system_candidates_not_skipped_counter = 0
-
-        arcann_logger.debug("Starting extraction...")
-        for labeling_step in range(system_candidates_count):
-            padded_labeling_step = str(labeling_step).zfill(5)
-            labeling_step_path = system_path / padded_labeling_step
-
-            if not (labeling_step_path / "skip").is_file():
-                system_candidates_not_skipped_counter += 1
-                # With the first, we create a type.raw and get the CP2K version
-                if system_candidates_not_skipped_counter == 1:
-                    check_file_existence(
-                        training_path / "user_files" / f"{system_auto}.lmp",
-                        True,
-                        True,
-                        "Input data file (lmp) not present.",
-                    )
-
-                    lammps_data = textfile_to_string_list(
-                        training_path / "user_files" / f"{system_auto}.lmp"
-                    )
-                    indexes = [
-                        idx
-                        for idx, s in enumerate(lammps_data)
-                        if "Atoms" in s and "tomsk" not in s
-                    ]
-                    if len(indexes) > 1:
-                        for index in [
-                            idx
-                            for idx, s in enumerate(lammps_data)
-                            if "Atoms" in s and "tomsk" not in s
-                        ]:
-                            atom_list = [
-                                line.strip().split()
-                                for line in lammps_data[index + 2 : index + 4]
-                            ]
-                            if (
-                                len(atom_list[0]) == len(atom_list[1])
-                                and lammps_data[index + 1] == " \n"
-                                and atom_list[0][0] == "1"
-                                and atom_list[1][0] == "2"
-                            ):
-                                idx = index
-                                break
-                    else:
-                        idx = indexes[0]
-                    del lammps_data[0 : idx + 2]
-                    lammps_data = lammps_data[
-                        0 : main_json["systems_auto"][system_auto]["nb_atm"] + 1
-                    ]
-                    lammps_data = [
-                        " ".join(f.replace("\n", "").split()) for f in lammps_data
-                    ]
-                    lammps_data = [g.split(" ")[1:2] for g in lammps_data]
-                    type_atom_array = np.asarray(lammps_data, dtype=np.int64).flatten()
-                    type_atom_array = type_atom_array - 1
-                    np.savetxt(
-                        f"{system_path}/type.raw",
-                        type_atom_array,
-                        delimiter=" ",
-                        newline=" ",
-                        fmt="%d",
-                    )
-                    np.savetxt(
-                        f"{data_path}/type.raw",
-                        type_atom_array,
-                        delimiter=" ",
-                        newline=" ",
-                        fmt="%d",
-                    )
-
-                    # Get the CP2K/Orca version
-                    if labeling_program == "cp2k":
-                        output_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}.out"
-                        )
-                        output_cp2k = [
-                            _ for _ in output_cp2k if "CP2K| version string:" in _
-                        ]
-                        output_cp2k = [
-                            " ".join(_.replace("\n", "").split()) for _ in output_cp2k
-                        ]
-                        output_cp2k = [_.split(" ")[-1] for _ in output_cp2k]
-                        program_version = float(output_cp2k[0])
-                    elif labeling_program == "orca":
-                        output_orca = textfile_to_string_list(
-                            labeling_step_path
-                            / f"1_labeling_{padded_labeling_step}.out"
-                        )
-                        output_orca = [_ for _ in output_orca if "Program Version" in _]
-                        program_version = float(output_orca[0].split(" ")[2][0])
+        ]:
+            if steps_count - skipped_count == 0:
+                continue
+            arcann_logger.debug(
+                f"Starting extraction{' for disturbed' if data_suffix else ''}..."
+            )
+            data_path = (
+                training_path
+                / "data"
+                / (system_auto + data_suffix + "_" + padded_curr_iter)
+            )
+            data_path.mkdir(exist_ok=True)
+            (data_path / "set.000").mkdir(exist_ok=True)
 
-                # Coordinates
-                coordinate_xyz = textfile_to_string_list(
-                    labeling_step_path / f"labeling_{padded_labeling_step}.xyz"
+            labeling_step_paths = [
+                system_path / str(labeling_step).zfill(5)
+                for labeling_step in range(
+                    first_labeling_step, first_labeling_step + steps_count
                 )
-                coord_array_raw = extract_and_convert_coordinates(
-                    coordinate_xyz,
-                    coord_array_raw,
-                    system_candidates_not_skipped_counter,
+                if not (system_path / str(labeling_step).zfill(5) / "skip").is_file()
+            ]
+
+            # With the first, we create a type.raw and get the CP2K version
+            check_file_existence(
+                training_path / "user_files" / f"{system_auto}.lmp",
+                True,
+                True,
+                "Input data file (lmp) not present.",
+            )
+            lammps_data = textfile_to_string_list(
+                training_path / "user_files" / f"{system_auto}.lmp"
+            )
+            indexes = [
+                idx
+                for idx, s in enumerate(lammps_data)
+                if "Atoms" in s and "tomsk" not in s
+            ]
+            if len(indexes) > 1:
+                for index in indexes:
+                    atom_list = [
+                        line.strip().split()
+                        for line in lammps_data[index + 2 : index + 4]
+                    ]
+                    if (
+                        len(atom_list[0]) == len(atom_list[1])
+                        and lammps_data[index + 1] == " \n"
+                        and atom_list[0][0] == "1"
+                        and atom_list[1][0] == "2"
+                    ):
+                        idx = index
+                        break
+            else:
+                idx = indexes[0]
+            del lammps_data[0 : idx + 2]
+            lammps_data = lammps_data[0 : system_atom_count + 1]
+            lammps_data = [" ".join(f.replace("\n", "").split()) for f in lammps_data]
+            lammps_data = [g.split(" ")[1:2] for g in lammps_data]
+            type_atom_array = np.asarray(lammps_data, dtype=np.int64).flatten()
+            type_atom_array = type_atom_array - 1
+            for type_path in [data_path] + (
+                [system_path] if output_format == "both" else []
+            ):
+                np.savetxt(
+                    f"{type_path}/type.raw",
+                    type_atom_array,
+                    delimiter=" ",
+                    newline=" ",
+                    fmt="%d",
                 )
-                del coordinate_xyz
+            del lammps_data, indexes, idx, type_atom_array
 
-                if labeling_program == "cp2k":
-
-                    # Energy
-                    energy_cp2k = textfile_to_string_list(
-                        labeling_step_path
-                        / f"2_labeling_{padded_labeling_step}-Force_Eval.fe"
-                    )
-                    energy_array_raw = extract_and_convert_energy(
-                        energy_cp2k,
-                        energy_array_raw,
-                        system_candidates_not_skipped_counter,
-                        Ha_to_eV,
-                        labeling_program,
-                        program_version,
+            # Get the CP2K/Orca version
+            padded_labeling_step = labeling_step_paths[0].name
+            if labeling_program == "cp2k":
+                output_cp2k = textfile_to_string_list(
+                    labeling_step_paths[0] / f"2_labeling_{padded_labeling_step}.out"
+                )
+                output_cp2k = [_ for _ in output_cp2k if "CP2K| version string:" in _]
+                output_cp2k = [
+                    " ".join(_.replace("\n", "").split()) for _ in output_cp2k
+                ]
+                output_cp2k = [_.split(" ")[-1] for _ in output_cp2k]
+                program_version = float(output_cp2k[0])
+                del output_cp2k
+                # The inputs of a system only differ by their cell: the periodicity is read once (first step)
+                system_is_periodic = read_cp2k_input_cell(
+                    textfile_to_string_list(
+                        labeling_step_paths[0]
+                        / f"1_labeling_{padded_labeling_step}.inp"
                     )
-                    del energy_cp2k
+                )[1]
+            elif labeling_program == "orca":
+                output_orca = textfile_to_string_list(
+                    labeling_step_paths[0] / f"1_labeling_{padded_labeling_step}.out"
+                )
+                output_orca = [_ for _ in output_orca if "Program Version" in _]
+                program_version = float(output_orca[0].split(" ")[2][0])
+                del output_orca
+                system_is_periodic = None
+            del padded_labeling_step
+
+            # In incremental mode, only the steps new or changed since the manifest of the previous extraction are parsed
+            if incremental_extract:
+                manifest_path = system_path / f"extract_manifest{data_suffix}.npz"
+                manifest_key = f"{labeling_program} {program_version} {system_is_periodic} {system_atom_count} {main_json['systems_auto'][system_auto]['cell']}"
+                signatures = [
+                    get_labeling_step_signature(labeling_step_path, labeling_program)
+                    for labeling_step_path in labeling_step_paths
+                ]
+                cached_steps = load_labeling_extract_manifest(
+                    manifest_path, manifest_key
+                )
+            else:
+                signatures = [None] * len(labeling_step_paths)
+                cached_steps = {}
+            steps_results = [
+                (
+                    cached_steps[labeling_step_path.name][1]
+                    if labeling_step_path.name in cached_steps
+                    and cached_steps[labeling_step_path.name][0] == signature
+                    else None
+                )
+                for labeling_step_path, signature in zip(
+                    labeling_step_paths, signatures
+                )
+            ]
+            parsed_indexes = [
+                row_index
+                for row_index, step_results in enumerate(steps_results)
+                if step_results is None
+            ]
+            if incremental_extract:
+                arcann_logger.info(
+                    f"{len(steps_results) - len(parsed_indexes)} step(s) reused, {len(parsed_indexes)} step(s) to parse."
+                )
 
-                    # Box / Volume
-                    input_cp2k = textfile_to_string_list(
-                        labeling_step_path / f"1_labeling_{padded_labeling_step}.inp"
-                    )
-                    # LOOK FOR THE
-                    box_array_raw, volume_array_raw, is_periodic = (
-                        extract_and_convert_box_volume(
-                            input_cp2k,
-                            box_array_raw,
-                            volume_array_raw,
-                            system_candidates_not_skipped_counter,
-                            1.0,
+            # The steps are parsed by a pool of workers, their rows are stored in the order of the steps
+            for row_index, step_results in zip(
+                parsed_indexes,
+                run_in_parallel(
+                    extract_labeling_step,
+                    [
+                        (
+                            labeling_step_paths[row_index],
                             labeling_program,
                             program_version,
-                        )
-                    )
-                    del input_cp2k
-
-                    # Forces
-                    force_cp2k = textfile_to_string_list(
-                        labeling_step_path
-                        / f"2_labeling_{padded_labeling_step}-Forces.for"
-                    )
-                    force_array_raw = extract_and_convert_forces(
-                        force_cp2k,
-                        force_array_raw,
-                        system_candidates_not_skipped_counter,
-                        au_to_eV_per_A,
-                        labeling_program,
-                        program_version,
-                    )
-                    del force_cp2k
-
-                    # Virial
-                    if (
-                        labeling_step_path
-                        / f"2_labeling_{padded_labeling_step}-Stress_Tensor.st"
-                    ).is_file():
-                        stress_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Stress_Tensor.st"
-                        )
-                        virial_array_raw, is_virial = extract_and_convert_virial(
-                            stress_cp2k,
-                            virial_array_raw,
-                            system_candidates_not_skipped_counter,
-                            volume_array_raw,
+                            system_atom_count,
+                            main_json["systems_auto"][system_auto]["cell"],
+                            Ha_to_eV,
+                            au_to_eV_per_A,
                             eV_per_A3_to_GPa,
-                            labeling_program,
-                            program_version,
-                        )
-                        del stress_cp2k
-
-                    # Wannier
-                    if (
-                        labeling_step_path
-                        / f"2_labeling_{padded_labeling_step}-Wannier.xyz"
-                    ).is_file():
-                        output_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}.out"
-                        )
-                        wannier_xyz = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Wannier.xyz"
+                            system_is_periodic,
                         )
-                        if system_candidates_not_skipped_counter == 1:
-                            wannier_array_raw = np.zeros(
-                                (
-                                    system_candidates_count
-                                    - system_candidates_skipped_count,
-                                    (
-                                        len(wannier_xyz)
-                                        - 2
-                                        - main_json["systems_auto"][system_auto][
-                                            "nb_atm"
-                                        ]
-                                    )
-                                    * 3,
-                                ),
-                                dtype=np.float64,
-                            )
-                        wannier_array_raw, is_wannier = extract_and_convert_wannier(
-                            wannier_xyz,
-                            wannier_array_raw,
-                            system_candidates_not_skipped_counter,
-                            main_json["systems_auto"][system_auto]["nb_atm"],
-                            1.0,
-                            labeling_program,
-                            program_version,
-                        )
-                        if any(
-                            "LOCALIZATION! loop did not converge within the maximum number of iterations"
-                            in _
-                            for _ in output_cp2k
-                        ):
-                            wannier_not_converged.append(
-                                f"{system_candidates_not_skipped_counter - 1}\n"
-                            )
-                        del wannier_xyz, output_cp2k
-
-                elif labeling_program == "orca":
-                    # Energy
-                    energy_orca = textfile_to_string_list(
-                        labeling_step_path / f"1_labeling_{padded_labeling_step}.engrad"
-                    )
-                    energy_array_raw = extract_and_convert_energy(
-                        energy_orca,
-                        energy_array_raw,
-                        system_candidates_not_skipped_counter,
-                        Ha_to_eV,
-                        labeling_program,
-                        program_version,
-                    )
-                    del energy_orca
-
-                    # Box / Volume
-                    # TODO
-                    system_cell = main_json["systems_auto"][system_auto]["cell"]
-                    box_array_raw, volume_array_raw, is_periodic = (
-                        extract_and_convert_box_volume(
-                            system_cell,
-                            box_array_raw,
-                            volume_array_raw,
-                            system_candidates_not_skipped_counter,
-                            1.0,
-                            labeling_program,
-                            program_version,
-                        )
-                    )
-                    is_periodic = False
-                    del system_cell
-
-                    # Forces
-                    force_orca = textfile_to_string_list(
-                        labeling_step_path / f"1_labeling_{padded_labeling_step}.engrad"
-                    )
-                    force_array_raw = extract_and_convert_forces(
-                        force_orca,
-                        force_array_raw,
-                        system_candidates_not_skipped_counter,
-                        au_to_eV_per_A,
-                        labeling_program,
-                        program_version,
-                    )
-                    del force_orca
-
-                    # Virial
-                    # No virial in ORCA
-
-                    # Wannier
-                    # No wannier in ORCA
-
-        del (
-            padded_labeling_step,
-            labeling_step,
-            labeling_step_path,
-            system_candidates_not_skipped_counter,
-        )
-
-        np.savetxt(system_path / "energy.raw", energy_array_raw, delimiter=" ")
-        np.save(data_path / "set.000" / "energy", energy_array_raw)
-        del energy_array_raw
-
-        np.savetxt(system_path / "coord.raw", coord_array_raw, delimiter=" ")
-        np.save(data_path / "set.000" / "coord", coord_array_raw)
-        del coord_array_raw
-
-        np.savetxt(system_path / "box.raw", box_array_raw, delimiter=" ")
-        np.save(data_path / "set.000" / "box", box_array_raw)
-        del box_array_raw, volume_array_raw
-
-        np.savetxt(system_path / "force.raw", force_array_raw, delimiter=" ")
-        np.save(data_path / "set.000" / "force", force_array_raw)
-        del force_array_raw
-
-        if is_virial:
-            np.savetxt(system_path / "virial.raw", virial_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "virial", virial_array_raw)
-        del virial_array_raw, is_virial
-
-        if is_wannier:
-            np.savetxt(system_path / "wannier.raw", wannier_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "wannier", wannier_array_raw)
-            if len(wannier_not_converged) > 1:
-                string_list_to_textfile(
-                    data_path / "set.000" / "wannier_not-converged.txt",
-                    wannier_not_converged,
+                        for row_index in parsed_indexes
+                    ],
+                    nb_jobs,
+                ),
+            ):
+                steps_results[row_index] = step_results
+
+            if incremental_extract:
+                write_labeling_extract_manifest(
+                    manifest_path,
+                    manifest_key,
+                    [_.name for _ in labeling_step_paths],
+                    signatures,
+                    steps_results,
                 )
-            del wannier_not_converged, wannier_array_raw, is_wannier
-
-        if not is_periodic:
-            arcann_logger.warning(f"System {system_auto} is not periodic.")
-            np.savetxt(data_path / "nopbc", np.array([True]), fmt="%s")
-        del is_periodic
-
-        arcann_logger.debug("Extraction done.")
-
-        system_disturbed_candidates_count = labeling_json["systems_auto"][system_auto][
-            "disturbed_candidates_count"
-        ]
-        system_disturbed_candidates_skipped_count = labeling_json["systems_auto"][
-            system_auto
-        ]["disturbed_candidates_skipped_count"]
-
-        if (
-            system_disturbed_candidates_count
-            - system_disturbed_candidates_skipped_count
-            > 0
-        ):
-            arcann_logger.debug("Starting extraction for disturbed...")
-            data_path = (
-                training_path
-                / "data"
-                / (system_auto + "-disturbed_" + padded_curr_iter)
-            )
-            data_path.mkdir(exist_ok=True)
-            (data_path / "set.000").mkdir(exist_ok=True)
+                del manifest_path, manifest_key
+            del signatures, cached_steps, parsed_indexes
 
             energy_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count
-                ),
+                (steps_count - skipped_count),
                 dtype=np.float64,
             )
             coord_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count,
-                    main_json["systems_auto"][system_auto]["nb_atm"] * 3,
-                ),
+                (steps_count - skipped_count, system_atom_count * 3),
                 dtype=np.float64,
             )
             box_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count,
-                    9,
-                ),
+                (steps_count - skipped_count, 9),
                 dtype=np.float64,
             )
             volume_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count
-                ),
+                (steps_count - skipped_count),
                 dtype=np.float64,
             )
             force_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count,
-                    main_json["systems_auto"][system_auto]["nb_atm"] * 3,
-                ),
+                (steps_count - skipped_count, system_atom_count * 3),
                 dtype=np.float64,
             )
             virial_array_raw = np.zeros(
-                (
-                    system_disturbed_candidates_count
-                    - system_disturbed_candidates_skipped_count,
-                    9,
-                ),
+                (steps_count - skipped_count, 9),
                 dtype=np.float64,
             )
-
+            wannier_array_raw = None
             # Options
             is_virial = False
             is_wannier = False
@@ -558,356 +413,85 @@ def main(
             # Wannier
             wannier_not_converged = ["#Indexes start at 0\n"]
 
-            # counter for non skipped configurations
-            system_disturbed_candidates_not_skipped_counter = 0
-
-            for labeling_step in range(
-                system_candidates_count,
-                system_candidates_count + system_disturbed_candidates_count,
-            ):
-                padded_labeling_step = str(labeling_step).zfill(5)
-                labeling_step_path = system_path / padded_labeling_step
-
-                if not (labeling_step_path / "skip").is_file():
-                    system_disturbed_candidates_not_skipped_counter += 1
-
-                    # With the first, we create a type.raw and get the CP2K version
-                    if system_disturbed_candidates_not_skipped_counter == 1:
-                        check_file_existence(
-                            training_path / "user_files" / f"{system_auto}.lmp",
-                            True,
-                            True,
-                            "Input data file (lmp) not present.",
-                        )
-
-                        lammps_data = textfile_to_string_list(
-                            training_path / "user_files" / f"{system_auto}.lmp"
+            for row_index, step_results in enumerate(steps_results):
+                energy_array_raw[row_index] = step_results["energy"]
+                coord_array_raw[row_index] = step_results["coord"]
+                box_array_raw[row_index] = step_results["box"]
+                volume_array_raw[row_index] = step_results["volume"]
+                force_array_raw[row_index] = step_results["force"]
+                is_periodic = step_results["is_periodic"]
+                if step_results["virial"] is not None:
+                    virial_array_raw[row_index] = step_results["virial"]
+                    is_virial = step_results["is_virial"]
+                if step_results["wannier"] is not None:
+                    if wannier_array_raw is None:
+                        wannier_array_raw = np.zeros(
+                            (
+                                steps_count - skipped_count,
+                                step_results["wannier"].shape[0],
+                            ),
+                            dtype=np.float64,
                         )
-                        indexes = [
-                            idx
-                            for idx, s in enumerate(lammps_data)
-                            if "Atoms" in s and "tomsk" not in s
-                        ]
-                        if len(indexes) > 1:
-                            for index in [
-                                idx
-                                for idx, s in enumerate(lammps_data)
-                                if "Atoms" in s and "tomsk" not in s
-                            ]:
-                                atom_list = [
-                                    line.strip().split()
-                                    for line in lammps_data[index + 2 : index + 4]
-                                ]
-                                if (
-                                    len(atom_list[0]) == len(atom_list[1])
-                                    and lammps_data[index + 1] == " \n"
-                                    and atom_list[0][0] == "1"
-                                    and atom_list[1][0] == "2"
-                                ):
-                                    idx = index
-                                    break
-                        else:
-                            idx = indexes[0]
-                        del lammps_data[0 : idx + 2]
-                        lammps_data = lammps_data[
-                            0 : main_json["systems_auto"][system_auto]["nb_atm"] + 1
-                        ]
-                        lammps_data = [
-                            " ".join(f.replace("\n", "").split()) for f in lammps_data
-                        ]
-                        lammps_data = [g.split(" ")[1:2] for g in lammps_data]
-                        type_atom_array = np.asarray(
-                            lammps_data, dtype=np.int64
-                        ).flatten()
-                        type_atom_array = type_atom_array - 1
-                        np.savetxt(
-                            f"{system_path}/type.raw",
-                            type_atom_array,
-                            delimiter=" ",
-                            newline=" ",
-                            fmt="%d",
-                        )
-                        np.savetxt(
-                            f"{data_path}/type.raw",
-                            type_atom_array,
-                            delimiter=" ",
-                            newline=" ",
-                            fmt="%d",
-                        )
-
-                        # Get the CP2K/Orca version
-                        if labeling_program == "cp2k":
-                            output_cp2k = textfile_to_string_list(
-                                labeling_step_path
-                                / f"2_labeling_{padded_labeling_step}.out"
-                            )
-                            output_cp2k = [
-                                _ for _ in output_cp2k if "CP2K| version string:" in _
-                            ]
-                            output_cp2k = [
-                                " ".join(_.replace("\n", "").split())
-                                for _ in output_cp2k
-                            ]
-                            output_cp2k = [_.split(" ")[-1] for _ in output_cp2k]
-                            program_version = float(output_cp2k[0])
-                        elif labeling_program == "orca":
-                            output_orca = textfile_to_string_list(
-                                labeling_step_path
-                                / f"1_labeling_{padded_labeling_step}.out"
-                            )
-                            output_orca = [
-                                _ for _ in output_orca if "Program Version" in _
-                            ]
-                            program_version = float(output_orca[0].split(" ")[2][0])
-
-                    # Coordinates
-                    coordinate_xyz = textfile_to_string_list(
-                        labeling_step_path / f"labeling_{padded_labeling_step}.xyz"
-                    )
-                    coord_array_raw = extract_and_convert_coordinates(
-                        coordinate_xyz,
-                        coord_array_raw,
-                        system_disturbed_candidates_not_skipped_counter,
+                    wannier_array_raw[row_index] = step_results["wannier"]
+                    is_wannier = True
+                    if step_results["is_wannier_not_converged"]:
+                        wannier_not_converged.append(f"{row_index}\n")
+            del row_index, step_results, steps_results, labeling_step_paths
+            del system_is_periodic
+
+            for array_name, array_raw, is_written in [
+                ("energy", energy_array_raw, True),
+                ("coord", coord_array_raw, True),
+                ("box", box_array_raw, True),
+                ("force", force_array_raw, True),
+                ("virial", virial_array_raw, is_virial),
+                ("wannier", wannier_array_raw, is_wannier),
+            ]:
+                if not is_written:
+                    continue
+                np.save(data_path / "set.000" / array_name, array_raw)
+                if output_format == "both":
+                    np.savetxt(
+                        system_path / f"{array_name}.raw", array_raw, delimiter=" "
                     )
-                    del coordinate_xyz
+            del array_name, array_raw, is_written
+            del energy_array_raw, coord_array_raw, box_array_raw, volume_array_raw
+            del force_array_raw, virial_array_raw, is_virial
 
-                    if labeling_program == "cp2k":
-                        # Energy
-                        energy_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Force_Eval.fe"
-                        )
-                        energy_array_raw = extract_and_convert_energy(
-                            energy_cp2k,
-                            energy_array_raw,
-                            system_disturbed_candidates_not_skipped_counter,
-                            Ha_to_eV,
-                            labeling_program,
-                            program_version,
-                        )
-                        del energy_cp2k
-
-                        # Box / Volume
-                        input_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"1_labeling_{padded_labeling_step}.inp"
-                        )
-                        box_array_raw, volume_array_raw, is_periodic = (
-                            extract_and_convert_box_volume(
-                                input_cp2k,
-                                box_array_raw,
-                                volume_array_raw,
-                                system_disturbed_candidates_not_skipped_counter,
-                                1.0,
-                                labeling_program,
-                                program_version,
-                            )
-                        )
-                        del input_cp2k
-
-                        # Forces
-                        force_cp2k = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Forces.for"
-                        )
-                        force_array_raw = extract_and_convert_forces(
-                            force_cp2k,
-                            force_array_raw,
-                            system_disturbed_candidates_not_skipped_counter,
-                            au_to_eV_per_A,
-                            labeling_program,
-                            program_version,
-                        )
-                        del force_cp2k
-
-                        # Virial
-                        if (
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Stress_Tensor.st"
-                        ).is_file():
-                            stress_cp2k = textfile_to_string_list(
-                                labeling_step_path
-                                / f"2_labeling_{padded_labeling_step}-Stress_Tensor.st"
-                            )
-                            virial_array_raw, is_virial = extract_and_convert_virial(
-                                stress_cp2k,
-                                virial_array_raw,
-                                system_disturbed_candidates_not_skipped_counter,
-                                volume_array_raw,
-                                eV_per_A3_to_GPa,
-                                labeling_program,
-                                program_version,
-                            )
-                            del stress_cp2k
-
-                        # Wannier
-                        if (
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}-Wannier.xyz"
-                        ).is_file():
-                            output_cp2k = textfile_to_string_list(
-                                labeling_step_path
-                                / f"2_labeling_{padded_labeling_step}.out"
-                            )
-                            wannier_xyz = textfile_to_string_list(
-                                labeling_step_path
-                                / f"2_labeling_{padded_labeling_step}-Wannier.xyz"
-                            )
-                            if system_disturbed_candidates_not_skipped_counter == 1:
-                                wannier_array_raw = np.zeros(
-                                    (
-                                        system_candidates_count
-                                        - system_candidates_skipped_count,
-                                        (
-                                            len(wannier_xyz)
-                                            - 2
-                                            - main_json["systems_auto"][system_auto][
-                                                "nb_atm"
-                                            ]
-                                        )
-                                        * 3,
-                                    ),
-                                    dtype=np.float64,
-                                )
-                            wannier_array_raw, is_wannier = extract_and_convert_wannier(
-                                wannier_xyz,
-                                wannier_array_raw,
-                                system_disturbed_candidates_not_skipped_counter,
-                                main_json["systems_auto"][system_auto]["nb_atm"],
-                                1.0,
-                                labeling_program,
-                                program_version,
-                            )
-                            if any(
-                                "LOCALIZATION! loop did not converge within the maximum number of iterations"
-                                in _
-                                for _ in output_cp2k
-                            ):
-                                wannier_not_converged.append(
-                                    f"{system_disturbed_candidates_not_skipped_counter - 1}\n"
-                                )
-                            del wannier_xyz, output_cp2k
-
-                    elif labeling_program == "orca":
-                        # Energy
-                        energy_orca = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}.engrad"
-                        )
-                        energy_array_raw = extract_and_convert_energy(
-                            energy_orca,
-                            energy_array_raw,
-                            system_disturbed_candidates_not_skipped_counter,
-                            Ha_to_eV,
-                            labeling_program,
-                            program_version,
-                        )
-                        del energy_orca
-
-                        # Box / Volume
-                        # TODO
-                        system_cell = main_json["systems_auto"][system_auto]["cell"]
-                        # box_array_raw, volume_array_raw = extract_and_convert_box_volume(energy_orca, box_array_raw, volume_array_raw, system_candidates_not_skipped_counter, 1.0, labeling_program, program_version)
-                        box_array_raw[system_candidates_not_skipped_counter, 0] = (
-                            system_cell[0]
-                        )
-                        box_array_raw[system_candidates_not_skipped_counter, 4] = (
-                            system_cell[1]
-                        )
-                        box_array_raw[system_candidates_not_skipped_counter, 8] = (
-                            system_cell[2]
-                        )
-                        is_periodic = False
-                        del system_cell
-
-                        # Forces
-                        force_orca = textfile_to_string_list(
-                            labeling_step_path
-                            / f"2_labeling_{padded_labeling_step}.engrad"
-                        )
-                        force_array_raw = extract_and_convert_forces(
-                            force_orca,
-                            force_array_raw,
-                            system_disturbed_candidates_not_skipped_counter,
-                            au_to_eV_per_A,
-                            labeling_program,
-                            program_version,
-                        )
-                        del force_orca
-
-                        # Virial
-                        # No virial in ORCA
-
-                        # Wannier
-                        # No wannier in ORCA
-
-            del (
-                padded_labeling_step,
-                labeling_step,
-                labeling_step_path,
-                system_disturbed_candidates_not_skipped_counter,
-            )
-
-            np.savetxt(system_path / "energy.raw", energy_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "energy", energy_array_raw)
-            del energy_array_raw
-
-            np.savetxt(system_path / "coord.raw", coord_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "coord", coord_array_raw)
-            del coord_array_raw
-
-            np.savetxt(system_path / "box.raw", box_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "box", box_array_raw)
-            del box_array_raw, volume_array_raw
-
-            np.savetxt(system_path / "force.raw", force_array_raw, delimiter=" ")
-            np.save(data_path / "set.000" / "force", force_array_raw)
-            del force_array_raw
-
-            if is_virial:
-                np.savetxt(system_path / "virial.raw", virial_array_raw, delimiter=" ")
-                np.save(data_path / "set.000" / "virial", virial_array_raw)
-            del virial_array_raw, is_virial
-
-            if is_wannier:
-                np.savetxt(
-                    system_path / "wannier.raw", wannier_array_raw, delimiter=" "
+            if is_wannier and len(wannier_not_converged) > 1:
+                string_list_to_textfile(
+                    data_path / "set.000" / "wannier_not-converged.txt",
+                    wannier_not_converged,
                 )
-                np.save(data_path / "set.000" / "wannier", wannier_array_raw)
-                if len(wannier_not_converged) > 1:
-                    string_list_to_textfile(
-                        data_path / "set.000" / "wannier_not-converged.txt",
-                        wannier_not_converged,
-                    )
-                del wannier_not_converged, wannier_array_raw, is_wannier
-            arcann_logger.debug("Extraction for disturbed done.")
+            del wannier_not_converged, wannier_array_raw, is_wannier
 
             if not is_periodic:
                 arcann_logger.warning(f"System {system_auto} is not periodic.")
                 np.savetxt(data_path / "nopbc", np.array([True]), fmt="%s")
             del is_periodic
 
+            arcann_logger.debug(
+                f"Extraction{' for disturbed' if data_suffix else ''} done."
+            )
+
+        del data_suffix, first_labeling_step, steps_count, skipped_count
         arcann_logger.info(
             f"Processed system: {system_auto} ({system_auto_index + 1}/{len(main_json['systems_auto'])})"
         )
 
-    if "output_cp2k" in locals():
-        del output_cp2k
-    if "output_orca" in locals():
-        del output_orca
-
     del system_auto, system_auto_index
     del system_candidates_count, system_candidates_skipped_count, system_path, data_path
-    del indexes, idx, type_atom_array, lammps_data
-    del program_version
-    del system_disturbed_candidates_count, system_disturbed_candidates_skipped_count
+    del system_atom_count, program_version
 
     arcann_logger.info(f"-" * 88)
     # Update the booleans in the exploration JSON
     labeling_json["is_extracted"] = True
 
-    # Dump the JSON files (exploration JSONN)
+    # Dump the JSON files (labeling and merged input)
     write_json_file(labeling_json, (control_path / f"labeling_{padded_curr_iter}.json"))
+    backup_and_overwrite_json_file(
+        current_input_json, (current_path / "used_input.json"), read_only=True
+    )
 
     # End
     arcann_logger.info(f"-" * 88)
@@ -917,8 +501,14 @@ def main(
 
     # Cleaning
     del current_path, control_path, training_path
-    del user_input_json_filename
-    del main_json, labeling_json
+    del (
+        default_input_json,
+        default_input_json_present,
+        user_input_json,
+        user_input_json_present,
+        user_input_json_filename,
+    )
+    del main_json, labeling_json, current_input_json, nb_jobs
     del curr_iter, padded_curr_iter
 
     arcann_logger.debug(f"LOCAL")
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/08/05
+Last modified: 2026/10/17
 """
 
 # Standard library modules
@@ -41,7 +41,7 @@ from arcann_training.common.machine import (
     get_machine_spec_for_step,
 )
 from arcann_training.common.slurm import replace_in_slurm_file_general
-from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frame
+from arcann_training.common.xyz import parse_xyz_trajectory_file, write_xyz_frames
 
 
 def main(
@@ -245,9 +245,10 @@ def main(
     system_auto_list = []
     # First loop to get the total number of jobs and the lsit of system
     for system_auto_index, system_auto in enumerate(exploration_json["systems_auto"]):
+        # Near-duplicates removed at the extraction are not in the candidates file
         candidates_count = exploration_json["systems_auto"][system_auto][
             "selected_count"
-        ]
+        ] - exploration_json["systems_auto"][system_auto].get("duplicates_count", 0)
         if (
             exploration_json["systems_auto"][system_auto]["disturbed_candidate_value"]
             > 0
@@ -268,9 +269,10 @@ def main(
         )
 
         labeling_json["systems_auto"][system_auto] = {}
+        # Near-duplicates removed at the extraction are not in the candidates file
         candidates_count = exploration_json["systems_auto"][system_auto][
             "selected_count"
-        ]
+        ] - exploration_json["systems_auto"][system_auto].get("duplicates_count", 0)
 
         if (
             exploration_json["systems_auto"][system_auto]["disturbed_candidate_value"]
@@ -587,6 +589,7 @@ def main(
             f"Processing {candidates_count} structures for system: {system_auto}."
         )
 
+        labeling_xyz_files = []
         for labeling_step in range(atom_coords.shape[0]):
             padded_labeling_step = str(labeling_step).zfill(5)
             labeling_step_path = system_path / padded_labeling_step
@@ -651,17 +654,9 @@ def main(
                 job_file_t,
             )
             del job_file_t
-            if np.any(cell_info) == None:
-                cell_info = np.array([])
 
-            write_xyz_frame(
-                labeling_step_path / f"labeling_{padded_labeling_step}.xyz",
-                labeling_step,
-                num_atoms,
-                atom_symbols,
-                atom_coords,
-                cell_info,
-                comments,
+            labeling_xyz_files.append(
+                labeling_step_path / f"labeling_{padded_labeling_step}.xyz"
             )
             job_array_params_line = f":{system_auto}:"
             job_array_params_line += f"{padded_labeling_step}:"
@@ -676,7 +671,19 @@ def main(
             job_array_params_file[f"{labeling_program}"].append(job_array_params_line)
             del padded_labeling_step, labeling_step_path
 
-        del labeling_step
+        # All the structures are written at once
+        if np.any(cell_info) == None:
+            cell_info = np.array([])
+        write_xyz_frames(
+            labeling_xyz_files,
+            range(atom_coords.shape[0]),
+            num_atoms,
+            atom_symbols,
+            atom_coords,
+            cell_info,
+            comments,
+        )
+        del labeling_step, labeling_xyz_files
         del (
             num_atoms,
             atom_symbols,
@@ -705,7 +712,7 @@ def main(
                 pbc_info,
                 properties_info,
                 max_f_std_info,
-            ) = parse_xyz_trajectory_file(xyz_file)
+            ) = parse_xyz_trajectory_file(xyz_file_disturbed)
             del xyz_file_disturbed
 
             if atom_coords.shape[0] != candidates_count:
@@ -715,6 +722,7 @@ def main(
                 arcann_logger.error(f"Aborting...")
                 return 1
 
+            labeling_xyz_files = []
             for labeling_step_idx, labeling_step in enumerate(
                 range(candidates_count, candidates_count + atom_coords.shape[0])
             ):
@@ -732,7 +740,9 @@ def main(
                     " ".join(
                         [
                             str(_)
-                            for _ in [cell_info[labeling_step][i] for i in [0, 4, 8]]
+                            for _ in [
+                                cell_info[labeling_step_idx][i] for i in [0, 4, 8]
+                            ]
                         ]
                     ),
                 )
@@ -753,7 +763,7 @@ def main(
                             [
                                 str(_)
                                 for _ in [
-                                    cell_info[labeling_step][i] for i in [0, 4, 8]
+                                    cell_info[labeling_step_idx][i] for i in [0, 4, 8]
                                 ]
                             ]
                         ),
@@ -780,16 +790,8 @@ def main(
                 )
                 del job_file_t
 
-                if np.any(cell_info) == None:
-                    cell_info = np.array([])
-                write_xyz_frame(
-                    labeling_step_path / f"labeling_{padded_labeling_step}.xyz",
-                    labeling_step_idx,
-                    num_atoms,
-                    atom_symbols,
-                    atom_coords,
-                    cell_info,
-                    comments,
+                labeling_xyz_files.append(
+                    labeling_step_path / f"labeling_{padded_labeling_step}.xyz"
                 )
 
                 job_array_params_line = f":{system_auto}:"
@@ -808,7 +810,19 @@ def main(
 
                 del padded_labeling_step, labeling_step_path
 
-            del labeling_step
+            # All the structures are written at once
+            if np.any(cell_info) == None:
+                cell_info = np.array([])
+            write_xyz_frames(
+                labeling_xyz_files,
+                range(atom_coords.shape[0]),
+                num_atoms,
+                atom_symbols,
+                atom_coords,
+                cell_info,
+                comments,
+            )
+            del labeling_step, labeling_step_idx, labeling_xyz_files
             del (
                 num_atoms,
                 atom_symbols,
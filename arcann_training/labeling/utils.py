@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/08/05
+Last modified: 2026/10/17
 
 Functions
 ---------
@@ -15,15 +15,39 @@ generate_input_labeling_json(user_input_json: Dict, previous_json: Dict, default
 
 get_system_labeling(merged_input_json: Dict, system_auto_index: int) -> Tuple[float, float, int, int, int]
     Returns a tuple of system labeling parameters based on the input JSON and system number.
+
+extract_labeling_step(labeling_step_path: Path, labeling_program: str, program_version: float, atom_count: int, system_cell: List[float], energy_conversion_factor: float, force_conversion_factor: float, stress_conversion_factor: float, is_periodic: bool = None) -> Dict
+    Parses the outputs of one labeling step (one candidate) into the rows of the DeePMD-kit arrays.
+
+get_labeling_step_signature(labeling_step_path: Path, labeling_program: str) -> str
+    Returns the signature of a labeling step (name, size and modification time of the outputs it is extracted from).
+
+write_labeling_extract_manifest(manifest_path: Path, manifest_key: str, step_names: List[str], signatures: List[str], steps_results: List[Dict]) -> None
+    Writes the manifest of an extraction: the signature and the extracted rows of each labeling step (.npz).
+
+load_labeling_extract_manifest(manifest_path: Path, manifest_key: str) -> Dict[str, Tuple[str, Dict]]
+    Loads the manifest of a previous extraction written by 'write_labeling_extract_manifest'.
 """
 
 # Standard library modules
 import logging
+from pathlib import Path
 from typing import Dict, List, Tuple
 
+# Third-party modules
+import numpy as np
+
 # Local imports
 from arcann_training.common.utils import catch_errors_decorator
+from arcann_training.common.cp2k import read_cp2k_labeling_step
 from arcann_training.common.json import convert_control_to_input
+from arcann_training.common.list import textfile_to_string_list
+from arcann_training.common.parsing_labeling import (
+    extract_and_convert_energy,
+    extract_and_convert_forces,
+    extract_and_convert_box_volume,
+    extract_and_convert_coordinates,
+)
 
 
 # TODO: Add tests for this function
@@ -206,3 +230,336 @@ def get_system_labeling(merged_input_json: Dict, system_auto_index: int) -> Tupl
     ]:
         system_values.append(int(merged_input_json[key][system_auto_index]))
     return tuple(system_values)
+
+
+# Unittested
+@catch_errors_decorator
+def extract_labeling_step(
+    labeling_step_path: Path,
+    labeling_program: str,
+    program_version: float,
+    atom_count: int,
+    system_cell: List[float],
+    energy_conversion_factor: float,
+    force_conversion_factor: float,
+    stress_conversion_factor: float,
+    is_periodic: bool = None,
+) -> Dict:
+    """
+    Parses the outputs of one labeling step (one candidate) into the rows of the DeePMD-kit arrays.
+
+    The steps are independent, so this function can be run in a worker process (see 'run_in_parallel').
+
+    Parameters
+    ----------
+    labeling_step_path : Path
+        The path to the labeling step folder (named after the padded step index).
+    labeling_program : str
+        The labeling program ("cp2k" or "orca").
+    program_version : float
+        The version of the labeling program.
+    atom_count : int
+        The number of atoms of the system.
+    system_cell : List[float]
+        The cell lengths of the system (used for "orca").
+    energy_conversion_factor : float
+        The conversion factor of the energy (Ha to eV).
+    force_conversion_factor : float
+        The conversion factor of the forces (Ha/Bohr to eV/Angstrom).
+    stress_conversion_factor : float
+        The conversion factor of the stress tensor (eV/Angstrom^3 to GPa).
+    is_periodic : bool, optional
+        The periodicity of the system, if already known (for "cp2k": only the cell lengths are then read from the
+        input). Defaults to None.
+
+    Returns
+    -------
+    Dict
+        - energy, coord, box, volume, force: The rows of the step.
+        - is_periodic: True if the system is periodic.
+        - virial: The row of the virial (None if there is no stress tensor file).
+        - is_virial: True if the stress tensor was read (None if there is no stress tensor file).
+        - wannier: The row of the Wannier centers (None if there is no Wannier file).
+        - is_wannier_not_converged: True if the localization of the Wannier centers did not converge.
+    """
+    padded_labeling_step = labeling_step_path.name
+    energy = np.zeros(1, dtype=np.float64)
+    coord = np.zeros((1, atom_count * 3), dtype=np.float64)
+    box = np.zeros((1, 9), dtype=np.float64)
+    volume = np.zeros(1, dtype=np.float64)
+    force = np.zeros((1, atom_count * 3), dtype=np.float64)
+    virial = np.zeros((1, 9), dtype=np.float64)
+    results = {
+        "virial": None,
+        "is_virial": None,
+        "wannier": None,
+        "is_wannier_not_converged": False,
+    }
+
+    # Coordinates
+    coord = extract_and_convert_coordinates(
+        textfile_to_string_list(
+            labeling_step_path / f"labeling_{padded_labeling_step}.xyz"
+        ),
+        coord,
+        1,
+    )
+
+    if labeling_program == "cp2k":
+        # Each output is read once, the energy from the end of its file
+        step = read_cp2k_labeling_step(
+            labeling_step_path, atom_count, program_version, is_periodic
+        )
+        energy[0] = step["energy"] * energy_conversion_factor
+        cell = step["cell"]
+        box[0, 0], box[0, 4], box[0, 8] = cell[0], cell[1], cell[2]
+        volume[0] = cell[0] * cell[1] * cell[2]
+        is_periodic = step["is_periodic"]
+        force[0, :] = step["forces"].flatten() * force_conversion_factor
+
+        # Virial
+        if step["is_stress_tensor_file"]:
+            results["is_virial"] = step["stress_tensor"] is not None
+            if results["is_virial"]:
+                virial[0, :] = (
+                    step["stress_tensor"].flatten()
+                    * volume[0]
+                    / stress_conversion_factor
+                )
+            results["virial"] = virial[0]
+
+        # Wannier
+        if step["wannier"] is not None:
+            results["wannier"] = step["wannier"].flatten()
+            results["is_wannier_not_converged"] = step["is_wannier_not_converged"]
+
+    elif labeling_program == "orca":
+        # Energy and forces (gradient)
+        engrad_orca = textfile_to_string_list(
+            labeling_step_path / f"1_labeling_{padded_labeling_step}.engrad"
+        )
+        energy = extract_and_convert_energy(
+            engrad_orca,
+            energy,
+            1,
+            energy_conversion_factor,
+            labeling_program,
+            program_version,
+        )
+        force = extract_and_convert_forces(
+            engrad_orca,
+            force,
+            1,
+            force_conversion_factor,
+            labeling_program,
+            program_version,
+        )
+
+        # Box / Volume (no virial and no Wannier in ORCA)
+        box, volume, is_periodic = extract_and_convert_box_volume(
+            system_cell,
+            box,
+            volume,
+            1,
+            1.0,
+            labeling_program,
+            program_version,
+        )
+
+    results.update(
+        {
+            "energy": energy[0],
+            "coord": coord[0],
+            "box": box[0],
+            "volume": volume[0],
+            "force": force[0],
+            "is_periodic": is_periodic,
+        }
+    )
+    return results
+
+
+# Unittested
+@catch_errors_decorator
+def get_labeling_step_signature(labeling_step_path: Path, labeling_program: str) -> str:
+    """
+    Returns the signature of a labeling step (name, size and modification time of the outputs it is extracted from).
+
+    Parameters
+    ----------
+    labeling_step_path : Path
+        The path to the labeling step folder (named after the padded step index).
+    labeling_program : str
+        The labeling program ("cp2k" or "orca").
+
+    Returns
+    -------
+    str
+        The signature of the step (a missing file is part of it, so a new output changes it).
+    """
+    padded_labeling_step = labeling_step_path.name
+    file_names = [f"labeling_{padded_labeling_step}.xyz"]
+    if labeling_program == "cp2k":
+        file_names += [
+            f"1_labeling_{padded_labeling_step}.inp",
+            f"2_labeling_{padded_labeling_step}.out",
+            f"2_labeling_{padded_labeling_step}-Force_Eval.fe",
+            f"2_labeling_{padded_labeling_step}-Forces.for",
+            f"2_labeling_{padded_labeling_step}-Stress_Tensor.st",
+            f"2_labeling_{padded_labeling_step}-Wannier.xyz",
+        ]
+    elif labeling_program == "orca":
+        file_names += [
+            f"1_labeling_{padded_labeling_step}.out",
+            f"1_labeling_{padded_labeling_step}.engrad",
+        ]
+    signature = []
+    for file_name in file_names:
+        file_path = labeling_step_path / file_name
+        if file_path.is_file():
+            file_stat = file_path.stat()
+            signature.append(f"{file_name}:{file_stat.st_size}:{file_stat.st_mtime_ns}")
+        else:
+            signature.append(f"{file_name}:-")
+    return "|".join(signature)
+
+
+# Unittested
+@catch_errors_decorator
+def write_labeling_extract_manifest(
+    manifest_path: Path,
+    manifest_key: str,
+    step_names: List[str],
+    signatures: List[str],
+    steps_results: List[Dict],
+) -> None:
+    """
+    Writes the manifest of an extraction: the signature and the extracted rows of each labeling step (.npz).
+
+    Parameters
+    ----------
+    manifest_path : Path
+        The path of the manifest (.npz).
+    manifest_key : str
+        The key of the extraction (the program version, the periodicity...): a manifest is only reused with the same.
+    step_names : List[str]
+        The names of the labeling steps (padded step indexes).
+    signatures : List[str]
+        The signature of each step (see 'get_labeling_step_signature').
+    steps_results : List[Dict]
+        The rows of each step (see 'extract_labeling_step').
+
+    Returns
+    -------
+    None
+    """
+    has_virial = [_["virial"] is not None for _ in steps_results]
+    has_wannier = [_["wannier"] is not None for _ in steps_results]
+    wannier_rows = [
+        _["wannier"] if _["wannier"] is not None else np.zeros(0) for _ in steps_results
+    ]
+    arrays = {
+        "manifest_key": np.array(manifest_key, dtype=str),
+        "step_names": np.array(step_names, dtype=str),
+        "signatures": np.array(signatures, dtype=str),
+        "energy": np.array([_["energy"] for _ in steps_results], dtype=np.float64),
+        "coord": np.array([_["coord"] for _ in steps_results], dtype=np.float64),
+        "box": np.array([_["box"] for _ in steps_results], dtype=np.float64),
+        "volume": np.array([_["volume"] for _ in steps_results], dtype=np.float64),
+        "force": np.array([_["force"] for _ in steps_results], dtype=np.float64),
+        "is_periodic": np.array([_["is_periodic"] for _ in steps_results], dtype=bool),
+        "has_virial": np.array(has_virial, dtype=bool),
+        "virial": np.array(
+            [
+                _["virial"] if _["virial"] is not None else np.zeros(9)
+                for _ in steps_results
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 9),
+        "is_virial": np.array([bool(_["is_virial"]) for _ in steps_results]),
+        "has_wannier": np.array(has_wannier, dtype=bool),
+        "wannier_offsets": np.concatenate(
+            ([0], np.cumsum([len(_) for _ in wannier_rows]))
+        ).astype(np.int64),
+        "wannier": (
+            np.concatenate(wannier_rows).astype(np.float64)
+            if wannier_rows
+            else np.zeros(0, dtype=np.float64)
+        ),
+        "is_wannier_not_converged": np.array(
+            [_["is_wannier_not_converged"] for _ in steps_results], dtype=bool
+        ),
+    }
+    with Path(manifest_path).open("wb") as f:
+        np.savez(f, **arrays)
+
+
+# Unittested
+@catch_errors_decorator
+def load_labeling_extract_manifest(
+    manifest_path: Path, manifest_key: str
+) -> Dict[str, Tuple[str, Dict]]:
+    """
+    Loads the manifest of a previous extraction written by 'write_labeling_extract_manifest'.
+
+    Parameters
+    ----------
+    manifest_path : Path
+        The path of the manifest (.npz).
+    manifest_key : str
+        The key of the current extraction.
+
+    Returns
+    -------
+    Dict[str, Tuple[str, Dict]]
+        The (signature, rows) of each labeling step, by name. Empty if there is no manifest, if it cannot be read or if
+        it was written with another key.
+    """
+    if not Path(manifest_path).is_file():
+        return {}
+    try:
+        with np.load(manifest_path, allow_pickle=False) as manifest:
+            if str(manifest["manifest_key"]) != manifest_key:
+                return {}
+            arrays = {key: manifest[key] for key in manifest.files}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+    cached_steps = {}
+    for row_index, (step_name, signature) in enumerate(
+        zip(arrays["step_names"].tolist(), arrays["signatures"].tolist())
+    ):
+        cached_steps[step_name] = (
+            signature,
+            {
+                "energy": arrays["energy"][row_index],
+                "coord": arrays["coord"][row_index],
+                "box": arrays["box"][row_index],
+                "volume": arrays["volume"][row_index],
+                "force": arrays["force"][row_index],
+                "is_periodic": bool(arrays["is_periodic"][row_index]),
+                "virial": (
+                    arrays["virial"][row_index]
+                    if arrays["has_virial"][row_index]
+                    else None
+                ),
+                "is_virial": (
+                    bool(arrays["is_virial"][row_index])
+                    if arrays["has_virial"][row_index]
+                    else None
+                ),
+                "wannier": (
+                    arrays["wannier"][
+                        arrays["wannier_offsets"][row_index] : arrays[
+                            "wannier_offsets"
+                        ][row_index + 1]
+                    ]
+                    if arrays["has_wannier"][row_index]
+                    else None
+                ),
+                "is_wannier_not_converged": bool(
+                    arrays["is_wannier_not_converged"][row_index]
+                ),
+            },
+        )
+    return cached_steps
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 
 Test case for the check module.
 
@@ -20,6 +20,12 @@ TestCheckVMD():
 
 TestValidateStepFolder():
     Test case for the 'validate_step_folder' function.
+
+TestCheckDcdIsValid():
+    Test case for the 'check_dcd_is_valid' function.
+
+TestCheckNcIsValid():
+    Test case for the 'check_nc_is_valid' function.
 """
 
 # Standard library modules
@@ -31,12 +37,19 @@ import unittest
 from pathlib import Path
 from unittest.mock import patch
 
+# Third-party modules
+import numpy as np
+
 # Local imports
 from arcann_training.common.check import (
     check_atomsk,
+    check_dcd_is_valid,
+    check_nc_is_valid,
     check_vmd,
     validate_step_folder,
 )
+from arcann_training.unittests.test_dcd import write_dcd
+from arcann_training.unittests.test_netcdf import write_netcdf
 
 
 class TestCheckAtomsk(unittest.TestCase):
@@ -232,5 +245,108 @@ class TestValidateStepFolder(unittest.TestCase):
                 validate_step_folder(self.step_name)
 
 
+class TestCheckDcdIsValid(unittest.TestCase):
+    """
+    Test case for the 'check_dcd_is_valid' function.
+
+    Methods
+    -------
+    test_valid():
+        Test that a complete DCD file is valid, with and without the full scan.
+    test_truncated():
+        Test that a truncated DCD file, or one without frames, is invalid.
+    test_frame_count_mismatch():
+        Test that a DCD file whose header does not match its number of frames is invalid.
+    test_corrupted_record():
+        Test that a corrupted record marker is only found by the full scan.
+    test_not_a_dcd():
+        Test that a missing file or a file that is not a DCD is invalid.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.dcd"
+        self.coordinates = np.zeros((4, 3, 3), dtype=np.float32)
+        self.cells = np.tile([10.0, 0.0, 10.0, 0.0, 0.0, 10.0], (4, 1))
+        write_dcd(self.file_path, self.coordinates, self.cells)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_valid(self):
+        """Test that a complete DCD file is valid, with and without the full scan."""
+        self.assertTrue(check_dcd_is_valid(self.file_path))
+        self.assertTrue(check_dcd_is_valid(self.file_path, full_scan=True))
+
+    def test_truncated(self):
+        """Test that a truncated DCD file, or one without frames, is invalid."""
+        with self.file_path.open("r+b") as file:
+            file.truncate(self.file_path.stat().st_size - 4)
+        self.assertFalse(check_dcd_is_valid(self.file_path))
+        write_dcd(self.file_path, self.coordinates[:0], self.cells)
+        self.assertFalse(check_dcd_is_valid(self.file_path))
+
+    def test_frame_count_mismatch(self):
+        """Test that a DCD file whose header does not match its number of frames is invalid."""
+        data = bytearray(self.file_path.read_bytes())
+        data[8:12] = (7).to_bytes(4, "little")
+        self.file_path.write_bytes(bytes(data))
+        self.assertFalse(check_dcd_is_valid(self.file_path))
+
+    def test_corrupted_record(self):
+        """Test that a corrupted record marker is only found by the full scan."""
+        data = bytearray(self.file_path.read_bytes())
+        data[-4:] = (0).to_bytes(4, "little")
+        self.file_path.write_bytes(bytes(data))
+        self.assertTrue(check_dcd_is_valid(self.file_path))
+        self.assertFalse(check_dcd_is_valid(self.file_path, full_scan=True))
+
+    def test_not_a_dcd(self):
+        """Test that a missing file or a file that is not a DCD is invalid."""
+        self.assertFalse(check_dcd_is_valid(Path(self.temp_dir.name) / "missing.dcd"))
+        self.file_path.write_text("3\n\nH 0 0 0\n")
+        self.assertFalse(check_dcd_is_valid(self.file_path))
+
+
+class TestCheckNcIsValid(unittest.TestCase):
+    """
+    Test case for the 'check_nc_is_valid' function.
+
+    Methods
+    -------
+    test_valid():
+        Test that a complete NetCDF file is valid.
+    test_truncated():
+        Test that a truncated NetCDF file, or one without frames, is invalid.
+    test_not_a_netcdf():
+        Test that a missing file or a file that is not a NetCDF is invalid.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.nc"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_valid(self):
+        """Test that a complete NetCDF file is valid."""
+        write_netcdf(self.file_path, 3, 2)
+        self.assertTrue(check_nc_is_valid(self.file_path))
+
+    def test_truncated(self):
+        """Test that a truncated NetCDF file, or one without frames, is invalid."""
+        write_netcdf(self.file_path, 2, 2, record_count=3)
+        self.assertFalse(check_nc_is_valid(self.file_path))
+        write_netcdf(self.file_path, 0, 2)
+        self.assertFalse(check_nc_is_valid(self.file_path))
+
+    def test_not_a_netcdf(self):
+        """Test that a missing file or a file that is not a NetCDF is invalid."""
+        self.assertFalse(check_nc_is_valid(Path(self.temp_dir.name) / "missing.nc"))
+        self.file_path.write_text("3\n\nH 0 0 0\n")
+        self.assertFalse(check_nc_is_valid(self.file_path))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,307 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the cp2k module.
+
+Classes
+-------
+TestReadCp2kEnergy():
+    Test case for the 'read_cp2k_energy' function.
+
+TestReadCp2kForces():
+    Test case for the 'read_cp2k_forces' function.
+
+TestReadCp2kStressTensor():
+    Test case for the 'read_cp2k_stress_tensor' function.
+
+TestReadCp2kInputCell():
+    Test case for the 'read_cp2k_input_cell' function.
+
+TestReadCp2kInputAbc():
+    Test case for the 'read_cp2k_input_abc' function.
+
+TestReadCp2kLabelingStep():
+    Test case for the 'read_cp2k_labeling_step' function.
+"""
+
+# Standard library modules
+import tempfile
+import unittest
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.cp2k import (
+    read_cp2k_energy,
+    read_cp2k_forces,
+    read_cp2k_input_abc,
+    read_cp2k_input_cell,
+    read_cp2k_labeling_step,
+    read_cp2k_stress_tensor,
+)
+
+
+class TestReadCp2kEnergy(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_energy' function.
+
+    Methods
+    -------
+    test_last_energy():
+        Test that the last energy is read, from the tail or from the whole file.
+    test_no_energy():
+        Test that a file without energy raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.energy_file = Path(self.temp_dir.name) / "labeling-Force_Eval.fe"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_last_energy(self):
+        """Test that the last energy is read, from the tail or from the whole file."""
+        self.energy_file.write_text(
+            " ENERGY| Total FORCE_EVAL ( QS ) energy [a.u.]:   -1.500000000000\n"
+            " ENERGY| Total FORCE_EVAL ( QS ) energy [a.u.]:   -2.500000000000\n"
+            + " padding line\n" * 10
+        )
+        self.assertEqual(read_cp2k_energy(self.energy_file), -2.5)
+        self.assertEqual(read_cp2k_energy(self.energy_file, tail_size=20), -2.5)
+
+    def test_no_energy(self):
+        """Test that a file without energy raises a ValueError."""
+        self.energy_file.write_text("No energy here\n")
+        with self.assertRaises(ValueError):
+            read_cp2k_energy(self.energy_file)
+
+
+class TestReadCp2kForces(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_forces' function.
+
+    Methods
+    -------
+    test_forces():
+        Test the forces read with the layout of CP2K 2023.1.
+    test_forces_2025():
+        Test the forces read with the layout of CP2K 2025.1 (no element column, a norm column).
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.forces_file = Path(self.temp_dir.name) / "labeling-Forces.for"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_forces(self):
+        """Test the forces read with the layout of CP2K 2023.1."""
+        self.forces_file.write_text(
+            "\n ATOMIC FORCES in [a.u.]\n\n # Atom   Kind   Element   X   Y   Z\n"
+            "  1  1  O  0.1  0.2  0.3\n  2  2  H  -0.1  -0.2  -0.3\n"
+            " SUM OF ATOMIC FORCES   0.0  0.0  0.0  0.0\n"
+        )
+        np.testing.assert_array_equal(
+            read_cp2k_forces(self.forces_file, 2023.1),
+            [[0.1, 0.2, 0.3], [-0.1, -0.2, -0.3]],
+        )
+
+    def test_forces_2025(self):
+        """Test the forces read with the layout of CP2K 2025.1 (no element column, a norm column)."""
+        self.forces_file.write_text(
+            "# Atom Kind X Y Z |F|\n\n\n"
+            "  1  1  0.1  0.2  0.3  0.37\n  2  2  -0.1  -0.2  -0.3  0.37\n"
+            "\n # Sum 0.0 0.0 0.0 0.0\n"
+        )
+        np.testing.assert_array_equal(
+            read_cp2k_forces(self.forces_file, 2025.1),
+            [[0.1, 0.2, 0.3], [-0.1, -0.2, -0.3]],
+        )
+
+
+class TestReadCp2kStressTensor(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_stress_tensor' function.
+
+    Methods
+    -------
+    test_versions():
+        Test the stress tensor read with the layouts of CP2K 7.1 and 2023.1.
+    test_not_found():
+        Test that None is returned without a tensor or for an unsupported version.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stress_file = Path(self.temp_dir.name) / "labeling-Stress_Tensor.st"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_versions(self):
+        """Test the stress tensor read with the layouts of CP2K 7.1 and 2023.1."""
+        self.stress_file.write_text(
+            " STRESS TENSOR [GPa]\n\n      X        Y        Z\n"
+            "  X   1.0   0.0   0.0\n  Y   0.0   2.0   0.0\n  Z   0.0   0.0   3.0\n"
+        )
+        np.testing.assert_array_equal(
+            read_cp2k_stress_tensor(self.stress_file, 7.1), np.diag([1.0, 2.0, 3.0])
+        )
+        self.stress_file.write_text(
+            " STRESS|                        x                   y                   z\n"
+            " STRESS|      x   1.00000000E+00   0.00000000E+00   0.00000000E+00\n"
+            " STRESS|      y   0.00000000E+00   2.00000000E+00   0.00000000E+00\n"
+            " STRESS|      z   0.00000000E+00   0.00000000E+00   3.00000000E+00\n"
+        )
+        np.testing.assert_array_equal(
+            read_cp2k_stress_tensor(self.stress_file, 2023.1),
+            np.diag([1.0, 2.0, 3.0]),
+        )
+
+    def test_not_found(self):
+        """Test that None is returned without a tensor or for an unsupported version."""
+        self.stress_file.write_text(" No tensor\n")
+        self.assertIsNone(read_cp2k_stress_tensor(self.stress_file, 2023.1))
+        self.assertIsNone(read_cp2k_stress_tensor(self.stress_file, 2025.1))
+
+
+class TestReadCp2kInputCell(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_input_cell' function.
+
+    Methods
+    -------
+    test_periodicity():
+        Test the cell lengths and the periodicity read from the '&CELL' and '&POISSON' sections.
+    test_mismatch():
+        Test that different periodicities in the '&CELL' and '&POISSON' sections raise a ValueError.
+    """
+
+    def test_periodicity(self):
+        """Test the cell lengths and the periodicity read from the '&CELL' and '&POISSON' sections."""
+        cell_section = ["&CELL", "  ABC 10.0 11.0 12.0", "  PERIODIC NONE", "&END CELL"]
+        poisson_section = ["&POISSON", "  PERIODIC none", "&END POISSON"]
+        self.assertEqual(
+            read_cp2k_input_cell(cell_section + poisson_section),
+            ([10.0, 11.0, 12.0], False),
+        )
+        self.assertEqual(
+            read_cp2k_input_cell(cell_section[:2] + cell_section[3:]),
+            ([10.0, 11.0, 12.0], True),
+        )
+        self.assertEqual(
+            read_cp2k_input_cell(poisson_section + cell_section[:2]),
+            ([10.0, 11.0, 12.0], False),
+        )
+
+    def test_mismatch(self):
+        """Test that different periodicities in the '&CELL' and '&POISSON' sections raise a ValueError."""
+        with self.assertRaises(ValueError):
+            read_cp2k_input_cell(
+                ["&CELL", "  ABC 10.0 11.0 12.0", "  PERIODIC XYZ", "&END CELL"]
+                + ["&POISSON", "  PERIODIC NONE", "&END POISSON"]
+            )
+
+
+class TestReadCp2kInputAbc(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_input_abc' function.
+
+    Methods
+    -------
+    test_abc():
+        Test that the cell lengths are read on the first 'ABC' line.
+    test_no_abc():
+        Test that an input without 'ABC' line raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_file = Path(self.temp_dir.name) / "1_labeling_00001.inp"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_abc(self):
+        """Test that the cell lengths are read on the first 'ABC' line."""
+        self.input_file.write_text(
+            "&CELL\n  ABC 10.5 11.0 12.25\n&END CELL\n&CELL_REF\n  ABC 1.0 1.0 1.0"
+        )
+        self.assertEqual(read_cp2k_input_abc(self.input_file), [10.5, 11.0, 12.25])
+        self.input_file.write_text("  ABC 10.5 11.0 12.25")
+        self.assertEqual(read_cp2k_input_abc(self.input_file), [10.5, 11.0, 12.25])
+
+    def test_no_abc(self):
+        """Test that an input without 'ABC' line raises a ValueError."""
+        self.input_file.write_text("&CELL\n&END CELL\n")
+        with self.assertRaises(ValueError):
+            read_cp2k_input_abc(self.input_file)
+
+
+class TestReadCp2kLabelingStep(unittest.TestCase):
+    """
+    Test case for the 'read_cp2k_labeling_step' function.
+
+    Methods
+    -------
+    test_step():
+        Test all the fields read from the outputs of a labeling step.
+    test_known_periodicity():
+        Test that a known periodicity is kept (only the cell lengths are read from the input).
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.step_path = Path(self.temp_dir.name) / "00001"
+        self.step_path.mkdir()
+        (self.step_path / "1_labeling_00001.inp").write_text(
+            "&CELL\n  ABC 10.0 11.0 12.0\n&END CELL\n"
+        )
+        (self.step_path / "2_labeling_00001-Force_Eval.fe").write_text(
+            " ENERGY| Total FORCE_EVAL ( QS ) energy [a.u.]:   -2.000000000000\n"
+        )
+        (self.step_path / "2_labeling_00001-Forces.for").write_text(
+            "\n ATOMIC FORCES in [a.u.]\n\n # Atom   Kind   Element   X   Y   Z\n"
+            "  1  1  O  0.1  0.2  0.3\n SUM OF ATOMIC FORCES   0.1  0.2  0.3  0.37\n"
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_step(self):
+        """Test all the fields read from the outputs of a labeling step."""
+        (self.step_path / "2_labeling_00001-Wannier.xyz").write_text(
+            "3\nWannier\nO 1.0 2.0 3.0\nX 4.0 5.0 6.0\nX 7.0 8.0 9.0\n"
+        )
+        (self.step_path / "2_labeling_00001.out").write_text(" CP2K| version 2023.1\n")
+        step = read_cp2k_labeling_step(self.step_path, 1, 2023.1)
+        self.assertEqual(step["energy"], -2.0)
+        np.testing.assert_array_equal(step["forces"], [[0.1, 0.2, 0.3]])
+        self.assertEqual(step["cell"], [10.0, 11.0, 12.0])
+        self.assertTrue(step["is_periodic"])
+        self.assertFalse(step["is_stress_tensor_file"])
+        self.assertIsNone(step["stress_tensor"])
+        np.testing.assert_array_equal(step["wannier"], [[4, 5, 6], [7, 8, 9]])
+        self.assertFalse(step["is_wannier_not_converged"])
+
+    def test_known_periodicity(self):
+        """Test that a known periodicity is kept (only the cell lengths are read from the input)."""
+        step = read_cp2k_labeling_step(self.step_path, 1, 2023.1, False)
+        self.assertEqual(step["cell"], [10.0, 11.0, 12.0])
+        self.assertFalse(step["is_periodic"])
+        self.assertIsNone(step["wannier"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the dcd module.
+
+Classes:
+--------
+TestReadDcdFrames():
+    Test case for the 'read_dcd_header' and 'read_dcd_frames' functions.
+TestReadPdbAtomicSymbols():
+    Test case for the 'read_pdb_atomic_symbols' function.
+"""
+
+# Standard library modules
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.dcd import (
+    read_dcd_frames,
+    read_dcd_header,
+    read_pdb_atomic_symbols,
+)
+
+
+def write_dcd(file_path, coordinates, cells=None, byteorder="<"):
+    """Write a DCD file as LAMMPS does (CHARMM version 24, with unit cells if given)."""
+
+    def record(data):
+        return (
+            struct.pack(f"{byteorder}i", len(data))
+            + data
+            + struct.pack(f"{byteorder}i", len(data))
+        )
+
+    control = [len(coordinates), 0, 1, len(coordinates) - 1, 0, 0, 0, 0, 0]
+    header = b"CORD" + struct.pack(
+        f"{byteorder}9if10i", *control, 0.5, int(cells is not None), *[0] * 8, 24
+    )
+    header = record(header)
+    header += record(struct.pack(f"{byteorder}i", 2) + b"Created by test".ljust(160))
+    header += record(struct.pack(f"{byteorder}i", coordinates.shape[1]))
+    with Path(file_path).open("wb") as file:
+        file.write(header)
+        for frame_idx, frame in enumerate(coordinates):
+            if cells is not None:
+                file.write(
+                    record(
+                        np.asarray(cells[frame_idx], dtype=f"{byteorder}f8").tobytes()
+                    )
+                )
+            for axis in range(3):
+                file.write(record(frame[:, axis].astype(f"{byteorder}f4").tobytes()))
+
+
+class TestReadDcdFrames(unittest.TestCase):
+    """
+    Test case for the 'read_dcd_header' and 'read_dcd_frames' functions.
+
+    Methods
+    -------
+    test_header():
+        Test the layout read from the header of a LAMMPS-like DCD file.
+    test_frames():
+        Test the coordinates and unit cells of selected frames, in any order.
+    test_big_endian_without_cell():
+        Test a big-endian DCD file without unit cells.
+    test_truncated_last_frame():
+        Test that a truncated last frame is ignored.
+    test_errors():
+        Test that a frame index out of range raises an IndexError and a file that is not a DCD a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.dcd"
+        rng = np.random.RandomState(0)
+        self.coordinates = rng.uniform(-10.0, 10.0, (5, 4, 3)).astype(np.float32)
+        self.cells = np.array([[10.0 + _, 0.0, 11.0, 0.0, 0.0, 12.0] for _ in range(5)])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_header(self):
+        """Test the layout read from the header of a LAMMPS-like DCD file."""
+        write_dcd(self.file_path, self.coordinates, self.cells)
+        header = read_dcd_header(self.file_path)
+        self.assertEqual(header["byteorder"], "<")
+        self.assertEqual(header["atom_count"], 4)
+        self.assertEqual(header["frame_count"], 5)
+        self.assertTrue(header["has_unit_cell"])
+        self.assertFalse(header["has_fourth_dimension"])
+        self.assertEqual(header["header_size"], 92 + 172 + 12)
+        self.assertEqual(header["frame_size"], 56 + 3 * (16 + 8))
+
+    def test_frames(self):
+        """Test the coordinates and unit cells of selected frames, in any order."""
+        write_dcd(self.file_path, self.coordinates, self.cells)
+        coordinates, cells = read_dcd_frames(self.file_path, [3, 0, 3])
+        self.assertEqual(coordinates.dtype, np.float64)
+        np.testing.assert_array_equal(coordinates, self.coordinates[[3, 0, 3]])
+        np.testing.assert_array_equal(cells, self.cells[[3, 0, 3]])
+        coordinates, cells = read_dcd_frames(self.file_path, [])
+        self.assertEqual(coordinates.shape, (0, 4, 3))
+
+    def test_big_endian_without_cell(self):
+        """Test a big-endian DCD file without unit cells."""
+        write_dcd(self.file_path, self.coordinates, byteorder=">")
+        self.assertEqual(read_dcd_header(self.file_path)["byteorder"], ">")
+        coordinates, cells = read_dcd_frames(self.file_path, [4])
+        np.testing.assert_array_equal(coordinates[0], self.coordinates[4])
+        self.assertEqual(cells.shape, (1, 0))
+
+    def test_truncated_last_frame(self):
+        """Test that a truncated last frame is ignored."""
+        write_dcd(self.file_path, self.coordinates, self.cells)
+        with self.file_path.open("r+b") as file:
+            file.truncate(self.file_path.stat().st_size - 10)
+        self.assertEqual(read_dcd_header(self.file_path)["frame_count"], 4)
+        np.testing.assert_array_equal(
+            read_dcd_frames(self.file_path, [3])[0][0], self.coordinates[3]
+        )
+
+    def test_errors(self):
+        """Test that a frame index out of range raises an IndexError and a file that is not a DCD a ValueError."""
+        write_dcd(self.file_path, self.coordinates, self.cells)
+        with self.assertRaises(IndexError):
+            read_dcd_frames(self.file_path, [5])
+        with self.assertRaises(IndexError):
+            read_dcd_frames(self.file_path, [-1])
+        self.file_path.write_text("3\n\nH 0 0 0\n")
+        with self.assertRaises(ValueError):
+            read_dcd_frames(self.file_path, [0])
+
+
+class TestReadPdbAtomicSymbols(unittest.TestCase):
+    """
+    Test case for the 'read_pdb_atomic_symbols' function.
+
+    Methods
+    -------
+    test_symbols():
+        Test the symbols read from the element columns, or from the atom names.
+    test_no_atoms():
+        Test that a file without atom records raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "topo.pdb"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_symbols(self):
+        """Test the symbols read from the element columns, or from the atom names."""
+        self.file_path.write_text(
+            "CRYST1   10.000   10.000   10.000  90.00  90.00  90.00 P 1           1\n"
+            "ATOM      1 O    UNK A   1       0.000   0.000   0.000  1.00  0.00           O\n"
+            "ATOM      2 CL   UNK A   1       1.000   0.000   0.000  1.00  0.00          CL\n"
+            "HETATM    3 H1   UNK A   1       0.000   1.000   0.000  1.00  0.00\n"
+            "ENDMDL\n"
+            "ATOM      1 O    UNK A   1       0.000   0.000   0.000  1.00  0.00           O\n"
+        )
+        np.testing.assert_array_equal(
+            read_pdb_atomic_symbols(self.file_path), ["O", "Cl", "H"]
+        )
+
+    def test_no_atoms(self):
+        """Test that a file without atom records raises a ValueError."""
+        self.file_path.write_text("REMARK empty\nEND\n")
+        with self.assertRaises(ValueError):
+            read_pdb_atomic_symbols(self.file_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
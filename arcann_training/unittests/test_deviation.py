@@ -0,0 +1,159 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the deviation module.
+
+Classes
+-------
+TestReadModelDeviationFile():
+    Test case for the 'read_model_deviation_file' function.
+TestReadModelDeviationFileByChunks():
+    Test case for the 'read_model_deviation_file_by_chunks' function.
+"""
+
+# Standard library modules
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.deviation import (
+    get_model_deviation_cache_paths,
+    read_model_deviation_file,
+    read_model_deviation_file_by_chunks,
+)
+
+
+class TestReadModelDeviationFile(unittest.TestCase):
+    """
+    Test case for the 'read_model_deviation_file' function.
+
+    Methods
+    -------
+    test_read_without_cache():
+        Test reading a model deviation file with comments, without cache.
+    test_cache_written_and_used():
+        Test that the cache is written on the first read and memory-mapped on the next one.
+    test_cache_invalidated():
+        Test that the cache is rebuilt when the model deviation file changes.
+    test_file_not_found():
+        Test that a missing file raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        # Create a temporary directory with a model_devi file (and work in it)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "model_devi.out"
+        os.chdir(self.temp_dir.name)
+        self.model_deviation = np.array(
+            [
+                [0, 0.1, 0.0, 0.1, 0.15, 0.01, 0.1],
+                [10, 0.2, 0.0, 0.1, 0.35, 0.01, 0.1],
+                [20, 0.3, 0.0, 0.1, 0.85, 0.01, 0.1],
+            ]
+        )
+        np.savetxt(self.file_path, self.model_deviation, header="step max_devi_v")
+
+    def tearDown(self):
+        os.chdir(Path(__file__).parent)
+        self.temp_dir.cleanup()
+
+    def test_read_without_cache(self):
+        """Test reading a model deviation file with comments, without cache."""
+        model_deviation = read_model_deviation_file(self.file_path, use_cache=False)
+        np.testing.assert_array_equal(model_deviation, self.model_deviation)
+        cache_array_path, cache_key_path = get_model_deviation_cache_paths(
+            self.file_path
+        )
+        self.assertFalse(cache_array_path.is_file())
+        self.assertFalse(cache_key_path.is_file())
+
+    def test_cache_written_and_used(self):
+        """Test that the cache is written on the first read and memory-mapped on the next one."""
+        model_deviation = read_model_deviation_file(self.file_path)
+        np.testing.assert_array_equal(model_deviation, self.model_deviation)
+        cache_array_path, cache_key_path = get_model_deviation_cache_paths(
+            self.file_path
+        )
+        self.assertTrue(cache_array_path.is_file())
+        self.assertTrue(cache_key_path.is_file())
+        model_deviation = read_model_deviation_file(self.file_path)
+        self.assertIsInstance(model_deviation, np.memmap)
+        np.testing.assert_array_equal(model_deviation, self.model_deviation)
+
+    def test_cache_invalidated(self):
+        """Test that the cache is rebuilt when the model deviation file changes."""
+        read_model_deviation_file(self.file_path)
+        np.savetxt(self.file_path, self.model_deviation[:2], header="step")
+        model_deviation = read_model_deviation_file(self.file_path)
+        self.assertEqual(model_deviation.shape, (2, 7))
+        model_deviation = read_model_deviation_file(self.file_path)
+        self.assertEqual(model_deviation.shape, (2, 7))
+
+    def test_file_not_found(self):
+        """Test that a missing file raises a FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            read_model_deviation_file(Path(self.temp_dir.name) / "missing.out")
+
+
+class TestReadModelDeviationFileByChunks(unittest.TestCase):
+    """
+    Test case for the 'read_model_deviation_file_by_chunks' function.
+
+    Methods
+    -------
+    test_text_file():
+        Test reading the text file by blocks (comment lines skipped).
+    test_cache():
+        Test reading the binary cache by blocks.
+    test_invalid_chunk_size():
+        Test that a chunk size lower than 1 raises a ValueError.
+    """
+
+    def setUp(self):
+        # Create a temporary directory with a model_devi file (and work in it)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "model_devi.out"
+        os.chdir(self.temp_dir.name)
+        self.model_deviation = np.zeros((10, 7))
+        self.model_deviation[:, 0] = np.arange(10) * 10
+        self.model_deviation[:, 4] = np.linspace(0.1, 1.0, 10)
+        np.savetxt(self.file_path, self.model_deviation, header="step max_devi_v")
+
+    def tearDown(self):
+        os.chdir(Path(__file__).parent)
+        self.temp_dir.cleanup()
+
+    def test_text_file(self):
+        """Test reading the text file by blocks (comment lines skipped)."""
+        chunks = list(read_model_deviation_file_by_chunks(self.file_path, 4))
+        self.assertEqual([_.shape[0] for _ in chunks], [3, 4, 3])
+        np.testing.assert_array_equal(np.vstack(chunks), self.model_deviation)
+        self.assertFalse(get_model_deviation_cache_paths(self.file_path)[0].is_file())
+
+    def test_cache(self):
+        """Test reading the binary cache by blocks."""
+        read_model_deviation_file(self.file_path)
+        chunks = list(read_model_deviation_file_by_chunks(self.file_path, 4))
+        self.assertEqual([_.shape[0] for _ in chunks], [4, 4, 2])
+        np.testing.assert_array_equal(np.vstack(chunks), self.model_deviation)
+
+    def test_invalid_chunk_size(self):
+        """Test that a chunk size lower than 1 raises a ValueError."""
+        with self.assertRaises(ValueError):
+            read_model_deviation_file_by_chunks(self.file_path, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
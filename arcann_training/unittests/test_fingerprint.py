@@ -0,0 +1,134 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the fingerprint module.
+
+Classes
+-------
+TestComputePairDistanceFingerprints():
+    Test case for the 'compute_pair_distance_fingerprints' function.
+TestFindNearDuplicateFrames():
+    Test case for the 'find_near_duplicate_frames' function.
+"""
+
+# Standard library modules
+import unittest
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.fingerprint import (
+    compute_pair_distance_fingerprints,
+    find_near_duplicate_frames,
+)
+
+
+class TestComputePairDistanceFingerprints(unittest.TestCase):
+    """
+    Test case for the 'compute_pair_distance_fingerprints' function.
+
+    Methods
+    -------
+    test_invariances():
+        Test that a rotation, a translation and a permutation of the atoms do not change the fingerprint.
+    test_distortion():
+        Test that a distortion of the structure changes the fingerprint.
+    test_minimum_image():
+        Test that wrapping an atom in the cell does not change the fingerprint.
+    test_shape_mismatch():
+        Test that symbols and coordinates of different shapes raise a ValueError.
+    """
+
+    def setUp(self):
+        rng = np.random.RandomState(7)
+        self.atomic_symbols = np.array([["O", "H", "H"] * 8] * 2)
+        self.atomic_coordinates = rng.uniform(0.0, 8.0, (1, 24, 3)).repeat(2, axis=0)
+
+    def test_invariances(self):
+        """Test that a rotation, a translation and a permutation of the atoms do not change the fingerprint."""
+        angle = 0.4
+        rotation = np.array(
+            [
+                [np.cos(angle), -np.sin(angle), 0.0],
+                [np.sin(angle), np.cos(angle), 0.0],
+                [0.0, 0.0, 1.0],
+            ]
+        )
+        permutation = np.arange(24)
+        permutation[[1, 4]] = [4, 1]
+        self.atomic_coordinates[1] = (self.atomic_coordinates[1] @ rotation.T + 3.0)[
+            permutation
+        ]
+        fingerprints = compute_pair_distance_fingerprints(
+            self.atomic_symbols, self.atomic_coordinates
+        )
+        self.assertEqual(fingerprints.shape, (2, 2 * 2 * 24))
+        np.testing.assert_allclose(fingerprints[0], fingerprints[1], atol=1e-12)
+
+    def test_distortion(self):
+        """Test that a distortion of the structure changes the fingerprint."""
+        self.atomic_coordinates[1] *= 0.9
+        fingerprints = compute_pair_distance_fingerprints(
+            self.atomic_symbols, self.atomic_coordinates
+        )
+        self.assertGreater(np.linalg.norm(fingerprints[0] - fingerprints[1]), 0.1)
+
+    def test_minimum_image(self):
+        """Test that wrapping an atom in the cell does not change the fingerprint."""
+        self.atomic_coordinates[1, 0] += [8.0, -8.0, 0.0]
+        fingerprints = compute_pair_distance_fingerprints(
+            self.atomic_symbols, self.atomic_coordinates, np.full((2, 3), 8.0)
+        )
+        np.testing.assert_allclose(fingerprints[0], fingerprints[1], atol=1e-12)
+
+    def test_shape_mismatch(self):
+        """Test that symbols and coordinates of different shapes raise a ValueError."""
+        with self.assertRaises(ValueError):
+            compute_pair_distance_fingerprints(
+                self.atomic_symbols[:, :3], self.atomic_coordinates
+            )
+
+
+class TestFindNearDuplicateFrames(unittest.TestCase):
+    """
+    Test case for the 'find_near_duplicate_frames' function.
+
+    Methods
+    -------
+    test_greedy():
+        Test that the first frame of a group of duplicates is kept (chains are not propagated through removed frames).
+    test_no_duplicates():
+        Test that nothing is flagged when all the frames are far apart.
+    test_negative_threshold():
+        Test that a negative threshold raises a ValueError.
+    """
+
+    def test_greedy(self):
+        """Test that the first frame of a group of duplicates is kept (chains are not propagated through removed frames)."""
+        fingerprints = np.array([[0.0], [0.6], [1.2], [0.1], [5.0]])
+        np.testing.assert_array_equal(
+            find_near_duplicate_frames(fingerprints, 0.7),
+            [False, True, False, True, False],
+        )
+
+    def test_no_duplicates(self):
+        """Test that nothing is flagged when all the frames are far apart."""
+        fingerprints = np.arange(10, dtype=float).reshape(5, 2)
+        self.assertFalse(np.any(find_near_duplicate_frames(fingerprints, 0.5)))
+
+    def test_negative_threshold(self):
+        """Test that a negative threshold raises a ValueError."""
+        with self.assertRaises(ValueError):
+            find_near_duplicate_frames(np.zeros((2, 2)), -1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
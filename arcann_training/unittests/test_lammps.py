@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2023/09/04
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 
 Test cases for the lammps module.
 
@@ -14,16 +14,29 @@ Classes
 -------
 TestReadLammpsData():
     Test case for the 'read_lammps_data' function.
+
+TestWriteLammpsData():
+    Test case for the 'write_lammps_data' function.
+
+TestCellLengthsFile():
+    Test case for the 'write_cell_lengths_file' and 'read_cell_lengths_file' functions.
 """
 
 # Standard library modules
+import tempfile
 import unittest
+from pathlib import Path
 
 # Third-party modules
 import numpy as np
 
 # Local imports
-from arcann_training.common.lammps import read_lammps_data
+from arcann_training.common.lammps import (
+    read_cell_lengths_file,
+    read_lammps_data,
+    write_cell_lengths_file,
+    write_lammps_data,
+)
 
 
 class TestReadLammpsData(unittest.TestCase):
@@ -302,5 +315,156 @@ class TestReadLammpsData(unittest.TestCase):
             read_lammps_data(data)
 
 
+class TestWriteLammpsData(unittest.TestCase):
+    """
+    Test case for the 'write_lammps_data' function.
+
+    Methods
+    -------
+    test_orthogonal():
+        Test that an orthogonal structure is read back with all the types and masses of the properties.
+
+    test_triclinic():
+        Test that a triclinic cell is written with its tilt factors and the coordinates rotated with it.
+
+    test_unknown_symbol():
+        Test that a symbol missing from the properties raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_file = Path(self.temp_dir.name) / "structure.lmp"
+        self.properties = {
+            "1": {"symbol": "C", "mass": 12.011},
+            "2": {"symbol": "H", "mass": 1.008},
+            "3": {"symbol": "Cl", "mass": 35.45},
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_orthogonal(self):
+        """
+        Test that an orthogonal structure is read back with all the types and masses of the properties.
+        """
+        coordinates = np.array([[7.5, 7.5, 7.5], [6.71, 6.875, 7.17], [1.0, 2.0, 3.0]])
+        write_lammps_data(
+            self.data_file,
+            np.array(["C", "H", "H"]),
+            coordinates,
+            [15.0, 16.0, 17.0],
+            self.properties,
+        )
+        atom_count, type_count, box, masses, read_coordinates = read_lammps_data(
+            self.data_file
+        )
+        self.assertEqual(atom_count, 3)
+        self.assertEqual(type_count, 3)
+        self.assertEqual(list(box[:6]), [0.0, 15.0, 0.0, 16.0, 0.0, 17.0])
+        self.assertEqual(list(box[6:]), [None, None, None])
+        self.assertEqual(masses, {1: 12.011, 2: 1.008, 3: 35.45})
+        np.testing.assert_allclose(read_coordinates, coordinates)
+        self.assertIn(
+            "         3    2",
+            self.data_file.read_text().splitlines()[-1],
+        )
+
+    def test_triclinic(self):
+        """
+        Test that a triclinic cell is written with its tilt factors and the coordinates rotated with it.
+        """
+        cell = np.array([[0.0, 10.0, 0.0], [-10.0, 0.0, 0.0], [2.0, 0.0, 10.0]])
+        coordinates = np.array([[0.0, 5.0, 0.0], [-5.0, 5.0, 5.0]])
+        write_lammps_data(
+            self.data_file,
+            np.array(["Cl", "C"]),
+            coordinates,
+            cell.ravel(),
+            self.properties,
+        )
+        _, _, box, _, read_coordinates = read_lammps_data(self.data_file)
+        np.testing.assert_allclose(
+            box.astype(float), [0.0, 10.0, 0.0, 10.0, 0.0, 10.0, 0.0, 0.0, -2.0]
+        )
+        np.testing.assert_allclose(
+            read_coordinates, [[5.0, 0.0, 0.0], [5.0, 5.0, 5.0]], atol=1e-12
+        )
+
+    def test_unknown_symbol(self):
+        """
+        Test that a symbol missing from the properties raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            write_lammps_data(
+                self.data_file,
+                np.array(["C", "O"]),
+                np.zeros((2, 3)),
+                [10.0, 10.0, 10.0],
+                self.properties,
+            )
+
+
+class TestCellLengthsFile(unittest.TestCase):
+    """
+    Test case for the 'write_cell_lengths_file' and 'read_cell_lengths_file' functions.
+
+    Methods
+    -------
+    test_constant():
+        Test that a constant cell is stored as a single row.
+    test_variable():
+        Test that a variable cell is stored with one row per printed step.
+    test_wrong_columns():
+        Test that a print output without six columns raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cell_file = Path(self.temp_dir.name) / "cell.txt"
+        self.cell_lengths_file = Path(self.temp_dir.name) / "cell_lengths.npy"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_constant(self):
+        """
+        Test that a constant cell is stored as a single row.
+        """
+        self.cell_file.write_text(
+            "# Fix print output for fix extra\n" + "0 10.5 0 11 -1 11\n" * 4
+        )
+        self.assertTrue(write_cell_lengths_file(self.cell_file, self.cell_lengths_file))
+        self.assertEqual(np.load(self.cell_lengths_file).shape, (1, 3))
+        cell_lengths, is_cell_constant = read_cell_lengths_file(self.cell_lengths_file)
+        self.assertTrue(is_cell_constant)
+        self.assertEqual(cell_lengths.tolist(), [10.5, 11.0, 12.0])
+
+    def test_variable(self):
+        """
+        Test that a variable cell is stored with one row per printed step.
+        """
+        self.cell_file.write_text(
+            "# Fix print output for fix extra\n"
+            "0 10 0 10 0 10\n0.5 10.5 0 10 0 11\n0 10 0 10 0 10\n"
+        )
+        self.assertFalse(
+            write_cell_lengths_file(self.cell_file, self.cell_lengths_file)
+        )
+        cell_lengths, is_cell_constant = read_cell_lengths_file(self.cell_lengths_file)
+        self.assertFalse(is_cell_constant)
+        self.assertEqual(cell_lengths.shape, (3, 3))
+        self.assertEqual(
+            cell_lengths[[1, 2]].tolist(), [[10.0, 10.0, 11.0], [10.0] * 3]
+        )
+
+    def test_wrong_columns(self):
+        """
+        Test that a print output without six columns raises a ValueError.
+        """
+        self.cell_file.write_text("0 10 0 10\n")
+        with self.assertRaises(ValueError):
+            write_cell_lengths_file(self.cell_file, self.cell_lengths_file)
+
+
 if __name__ == "__main__":
     unittest.main()
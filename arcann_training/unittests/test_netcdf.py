@@ -0,0 +1,112 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the netcdf module.
+
+Classes:
+--------
+TestReadNetcdfHeader():
+    Test case for the 'read_netcdf_header' function.
+"""
+
+# Standard library modules
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+# Local imports
+from arcann_training.common.netcdf import read_netcdf_header
+
+
+def write_netcdf(file_path, frame_count, atom_count, record_count=None):
+    """Write an AMBER-like NetCDF (64-bit offset) trajectory, with 'record_count' (default: 'frame_count') in the header."""
+
+    def name(text):
+        data = text.encode()
+        return struct.pack(">i", len(data)) + data + b"\x00" * (-len(data) % 4)
+
+    def variable(text, dimension_ids, nc_type, vsize, begin):
+        data = name(text) + struct.pack(">i", len(dimension_ids))
+        data += b"".join(struct.pack(">i", _) for _ in dimension_ids)
+        return data + struct.pack(">iiiiq", 0, 0, nc_type, vsize, begin)
+
+    record_count = frame_count if record_count is None else record_count
+    dimensions = struct.pack(">ii", 10, 3)
+    for text, length in [("frame", 0), ("atom", atom_count), ("spatial", 3)]:
+        dimensions += name(text) + struct.pack(">i", length)
+    attributes = struct.pack(">ii", 12, 1) + name("Conventions")
+    attributes += struct.pack(">ii", 2, 5) + b"AMBER" + b"\x00" * 3
+    header_size = 8 + len(dimensions) + len(attributes) + 8
+    header_size += len(variable("spatial", [2], 2, 4, 0))
+    header_size += len(variable("coordinates", [0, 1, 2], 5, 12 * atom_count, 0))
+    variables = struct.pack(">ii", 11, 2)
+    variables += variable("spatial", [2], 2, 4, header_size)
+    variables += variable("coordinates", [0, 1, 2], 5, 12 * atom_count, header_size + 4)
+    with Path(file_path).open("wb") as file:
+        file.write(b"CDF\x02" + struct.pack(">I", record_count))
+        file.write(dimensions + attributes + variables)
+        file.write(b"xyz\x00")
+        file.write(b"\x00" * (12 * atom_count * frame_count))
+
+
+class TestReadNetcdfHeader(unittest.TestCase):
+    """
+    Test case for the 'read_netcdf_header' function.
+
+    Methods
+    -------
+    test_header():
+        Test the dimensions, variables and expected size read from an AMBER-like trajectory.
+    test_hdf5():
+        Test that a NetCDF-4 (HDF5) file is only identified.
+    test_errors():
+        Test that a file that is not a NetCDF file, or with a truncated header, raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.nc"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_header(self):
+        """Test the dimensions, variables and expected size read from an AMBER-like trajectory."""
+        write_netcdf(self.file_path, 3, 2)
+        header = read_netcdf_header(self.file_path)
+        self.assertEqual(header["format"], "64bit_offset")
+        self.assertEqual(header["record_count"], 3)
+        self.assertEqual(header["dimensions"], {"frame": 0, "atom": 2, "spatial": 3})
+        self.assertEqual(
+            header["variables"]["coordinates"]["dimensions"],
+            ["frame", "atom", "spatial"],
+        )
+        self.assertEqual(header["variables"]["coordinates"]["vsize"], 24)
+        self.assertEqual(header["expected_size"], header["file_size"])
+
+    def test_hdf5(self):
+        """Test that a NetCDF-4 (HDF5) file is only identified."""
+        self.file_path.write_bytes(b"\x89HDF\r\n\x1a\n" + b"\x00" * 16)
+        self.assertEqual(read_netcdf_header(self.file_path)["format"], "hdf5")
+
+    def test_errors(self):
+        """Test that a file that is not a NetCDF file, or with a truncated header, raises a ValueError."""
+        self.file_path.write_text("3\n\nH 0 0 0\n")
+        with self.assertRaises(ValueError):
+            read_netcdf_header(self.file_path)
+        write_netcdf(self.file_path, 3, 2)
+        self.file_path.write_bytes(self.file_path.read_bytes()[:40])
+        with self.assertRaises(ValueError):
+            read_netcdf_header(self.file_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
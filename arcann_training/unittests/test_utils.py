@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 
 Test case for the utils module.
 
@@ -17,6 +17,9 @@ TestConvertSecondsToHhMmSs():
 
 TestCatchErrorsDecorator():
     Test case for the 'catch_errors_decorator' function.
+
+TestRunInParallel():
+    Test case for the 'run_in_parallel' function.
 """
 
 # Standard library modules
@@ -27,6 +30,7 @@ from arcann_training.common.utils import (
     convert_seconds_to_hh_mm_ss,
     catch_errors_decorator,
     natural_sort_key,
+    run_in_parallel,
 )
 
 
@@ -90,6 +94,15 @@ class TestCatchErrorsDecorator(unittest.TestCase):
         with self.assertRaises(ValueError):
             func_with_exception()
 
+    def test_wrapped_name(self):
+        """Test that the decorator keeps the name of the decorated function."""
+
+        @catch_errors_decorator
+        def func_named():
+            return 42
+
+        self.assertEqual(func_named.__name__, "func_named")
+
 
 class TestNaturalSortKey(unittest.TestCase):
     def test_with_numbers(self):
@@ -119,5 +132,40 @@ class TestNaturalSortKey(unittest.TestCase):
             natural_sort_key(123)
 
 
+class TestRunInParallel(unittest.TestCase):
+    """
+    Test case for the 'run_in_parallel' function.
+
+    Methods
+    -------
+    test_serial():
+        Test the function with a single job.
+    test_parallel_keeps_order():
+        Test that the results keep the order of the arguments with several jobs.
+    test_empty():
+        Test the function with an empty list of arguments.
+    test_invalid_nb_jobs():
+        Test that a non-integer number of jobs raises a TypeError.
+    """
+
+    def test_serial(self):
+        """Test the function with a single job."""
+        self.assertEqual(run_in_parallel(pow, [(2, 3), (3, 2)], 1), [8, 9])
+
+    def test_parallel_keeps_order(self):
+        """Test that the results keep the order of the arguments with several jobs."""
+        args_list = [(_, 2) for _ in range(20)]
+        self.assertEqual(run_in_parallel(pow, args_list, 3), [_**2 for _ in range(20)])
+
+    def test_empty(self):
+        """Test the function with an empty list of arguments."""
+        self.assertEqual(run_in_parallel(pow, [], 4), [])
+
+    def test_invalid_nb_jobs(self):
+        """Test that a non-integer number of jobs raises a TypeError."""
+        with self.assertRaises(TypeError):
+            run_in_parallel(pow, [(2, 3)], "2")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -6,7 +6,7 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/05/15
+Last modified: 2026/10/17
 
 Test cases for the (training) utils module.
 
@@ -18,10 +18,31 @@ TestGetLastFrameNumber():
     Test case for the 'get_last_frame_number' function.
 TestUpdateNbStepsFactor():
     Test case for the 'update_system_nb_steps_factor' function.
+TestClassifyDeviation():
+    Test case for the 'classify_deviation' function.
+TestClassifyDeviationByChunks():
+    Test case for the 'classify_deviation_by_chunks' function.
+TestGetMinimumDeviationIndex():
+    Test case for the 'get_minimum_deviation_index' function.
+TestSelectCandidates():
+    Test case for the 'select_candidates' function.
+TestSelectSystemCandidates():
+    Test case for the 'select_system_candidates' function.
+TestComputeTrajectoryDeviation():
+    Test case for the 'compute_trajectory_deviation' function.
+TestQbCStoreFile():
+    Test case for the 'write_qbc_store_file' and 'load_qbc_store_file' functions.
+TestFindNewDuplicateCandidates():
+    Test case for the 'find_new_duplicate_candidates' function.
+TestExtractTrajectoryStructures():
+    Test case for the 'extract_trajectory_structures' function.
+TestDisturbAtomicCoordinates():
+    Test case for the 'disturb_atomic_coordinates' function.
 """
 
 # Standard library modules
 import json
+import os
 import tempfile
 import unittest
 from pathlib import Path
@@ -31,10 +52,22 @@ import numpy as np
 
 # Local imports
 from arcann_training.exploration.utils import (
+    classify_deviation,
+    classify_deviation_by_chunks,
+    compute_trajectory_deviation,
     create_models_list,
+    disturb_atomic_coordinates,
+    extract_trajectory_structures,
+    find_new_duplicate_candidates,
     get_last_frame_number,
+    get_minimum_deviation_index,
+    load_qbc_store_file,
+    select_candidates,
+    select_system_candidates,
     update_system_nb_steps_factor,
+    write_qbc_store_file,
 )
+from arcann_training.unittests.test_dcd import write_dcd
 
 
 class TestCreateModelsList(unittest.TestCase):
@@ -193,5 +226,793 @@ class TestUpdateSystemNbStepsFactor(unittest.TestCase):
         self.assertEqual(update_system_nb_steps_factor(prevexploration_json, 0), 100)
 
 
+class TestClassifyDeviation(unittest.TestCase):
+    """
+    Test case for the 'classify_deviation' function.
+
+    Methods
+    -------
+    test_never_crossed():
+        Test the classification of the whole trajectory after the start row.
+    test_crossed():
+        Test that every row from the end row is rejected.
+    test_crossed_before_start():
+        Test that everything is rejected without statistics when the end row is before the start row.
+    test_thresholds():
+        Test that the thresholds are good (sigma_low) and rejected (sigma_high).
+    """
+
+    def setUp(self):
+        self.frame_ids = np.arange(8) * 10.0
+        self.deviation = np.array([0.9, 0.1, 0.3, 0.8, 0.15, 0.5, 0.2, 0.9])
+
+    def test_never_crossed(self):
+        """Test the classification of the whole trajectory after the start row."""
+        good, candidates, rejected, deviations, stats = classify_deviation(
+            self.frame_ids, self.deviation, 0.2, 0.7, 1, -1
+        )
+        np.testing.assert_array_equal(good, [10, 40, 60])
+        np.testing.assert_array_equal(candidates, [20, 50])
+        np.testing.assert_array_equal(deviations, [0.3, 0.5])
+        np.testing.assert_array_equal(rejected, [30, 70])
+        self.assertAlmostEqual(
+            stats["mean_deviation_max_f"], np.mean(self.deviation[1:])
+        )
+        self.assertAlmostEqual(stats["median_deviation_max_f"], 0.3)
+        self.assertAlmostEqual(
+            stats["stdeviation_deviation_max_f"], np.std(self.deviation[1:])
+        )
+        self.assertEqual(good.dtype, np.int64)
+
+    def test_crossed(self):
+        """Test that every row from the end row is rejected."""
+        good, candidates, rejected, deviations, stats = classify_deviation(
+            self.frame_ids, self.deviation, 0.2, 0.7, 1, 5
+        )
+        np.testing.assert_array_equal(good, [10, 40])
+        np.testing.assert_array_equal(candidates, [20])
+        np.testing.assert_array_equal(rejected, [30, 50, 60, 70])
+        self.assertAlmostEqual(
+            stats["mean_deviation_max_f"], np.mean(self.deviation[1:5])
+        )
+
+    def test_crossed_before_start(self):
+        """Test that everything is rejected without statistics when the end row is before the start row."""
+        good, candidates, rejected, deviations, stats = classify_deviation(
+            self.frame_ids, self.deviation, 0.2, 0.7, 2, 1
+        )
+        self.assertEqual(good.size, 0)
+        self.assertEqual(candidates.size, 0)
+        np.testing.assert_array_equal(rejected, self.frame_ids[2:])
+        self.assertEqual(stats["mean_deviation_max_f"], 999.0)
+
+    def test_thresholds(self):
+        """Test that the thresholds are good (sigma_low) and rejected (sigma_high)."""
+        good, candidates, rejected, deviations, _ = classify_deviation(
+            np.arange(3.0), np.array([0.2, 0.45, 0.7]), 0.2, 0.7, 0, -1
+        )
+        np.testing.assert_array_equal(good, [0])
+        np.testing.assert_array_equal(candidates, [1])
+        np.testing.assert_array_equal(rejected, [2])
+
+
+class TestClassifyDeviationByChunks(unittest.TestCase):
+    """
+    Test case for the 'classify_deviation_by_chunks' function.
+
+    Methods
+    -------
+    test_same_as_in_memory():
+        Test that the frames and statistics match the in-memory classification, whatever the block size.
+    """
+
+    def test_same_as_in_memory(self):
+        """Test that the frames and statistics match the in-memory classification, whatever the block size."""
+        rng = np.random.RandomState(0)
+        model_deviation = np.zeros((200, 7))
+        model_deviation[:, 0] = np.arange(200) * 10
+        model_deviation[:, 4] = np.abs(rng.normal(0.3, 0.2, 200))
+        for crossing_row in [None, 3, 4, 5, 120, 199]:
+            deviation = model_deviation.copy()
+            if crossing_row is not None:
+                deviation[crossing_row, 4] = 2.0
+            for disturbed_start in [False, True]:
+                for is_forced in [False, True]:
+                    end_row_number = get_last_frame_number(
+                        deviation, 1.0, disturbed_start
+                    )
+                    if is_forced:
+                        end_row_number = deviation.shape[0] - 1
+                    expected = classify_deviation(
+                        deviation[:, 0], deviation[:, 4], 0.2, 0.7, 4, end_row_number
+                    )
+                    for chunk_size in [1, 2, 7, 500]:
+                        with self.subTest(
+                            crossing_row=crossing_row,
+                            disturbed_start=disturbed_start,
+                            is_forced=is_forced,
+                            chunk_size=chunk_size,
+                        ):
+                            result = classify_deviation_by_chunks(
+                                (
+                                    deviation[_ : _ + chunk_size]
+                                    for _ in range(0, deviation.shape[0], chunk_size)
+                                ),
+                                4,
+                                0.2,
+                                0.7,
+                                1.0,
+                                4,
+                                disturbed_start,
+                                is_forced,
+                            )
+                            self.assertEqual(result[5], end_row_number)
+                            self.assertEqual(result[6], deviation.shape[0])
+                            for expected_array, result_array in zip(
+                                expected[:4], result[:4]
+                            ):
+                                np.testing.assert_array_equal(
+                                    expected_array, result_array
+                                )
+                            for key, value in expected[4].items():
+                                self.assertAlmostEqual(
+                                    result[4][key], value, delta=1e-4 * value
+                                )
+
+
+class TestGetMinimumDeviationIndex(unittest.TestCase):
+    """
+    Test case for the 'get_minimum_deviation_index' function.
+
+    Methods
+    -------
+    test_minimum():
+        Test that the selected frame with the lowest deviation is returned (the first one in case of a tie).
+    test_nothing_selected():
+        Test that -1 is returned when nothing is selected.
+    test_not_a_candidate():
+        Test that a selected frame which is not a candidate raises a ValueError.
+    """
+
+    def setUp(self):
+        self.candidate_indexes = np.array([10, 20, 40, 50, 70])
+        self.candidate_deviations = np.array([0.3, 0.25, 0.4, 0.25, 0.21])
+
+    def test_minimum(self):
+        """Test that the selected frame with the lowest deviation is returned (the first one in case of a tie)."""
+        self.assertEqual(
+            get_minimum_deviation_index(
+                self.candidate_indexes,
+                self.candidate_deviations,
+                np.array([10, 40, 70]),
+            ),
+            70,
+        )
+        self.assertEqual(
+            get_minimum_deviation_index(
+                self.candidate_indexes,
+                self.candidate_deviations,
+                np.array([10, 20, 50]),
+            ),
+            20,
+        )
+
+    def test_nothing_selected(self):
+        """Test that -1 is returned when nothing is selected."""
+        self.assertEqual(
+            get_minimum_deviation_index(
+                self.candidate_indexes, self.candidate_deviations, np.array([])
+            ),
+            -1,
+        )
+
+    def test_not_a_candidate(self):
+        """Test that a selected frame which is not a candidate raises a ValueError."""
+        with self.assertRaises(ValueError):
+            get_minimum_deviation_index(
+                self.candidate_indexes, self.candidate_deviations, np.array([30])
+            )
+
+
+class TestSelectCandidates(unittest.TestCase):
+    """
+    Test case for the 'select_candidates' function.
+
+    Methods
+    -------
+    test_linspace():
+        Test that the default strategy keeps the evenly spaced selection (first and last candidates included).
+    test_all_strategies():
+        Test that every strategy returns the requested number of distinct candidates, in increasing order.
+    test_not_enough_candidates():
+        Test that all the candidates are returned when there are not more than requested.
+    test_deviation_weighted_seed():
+        Test that the deviation-weighted draw only depends on the seed.
+    test_stratified():
+        Test that the stratified selection takes frames in every deviation bin.
+    test_decorrelated():
+        Test that the decorrelated selection spreads the frames in time.
+    test_farthest_point():
+        Test that the farthest-point selection starts from the highest deviation.
+    test_unknown_strategy():
+        Test that an unknown strategy raises a ValueError.
+    """
+
+    def setUp(self):
+        # A burst of candidates at the start, and a few ones later
+        self.candidate_indexes = np.concatenate(
+            (np.arange(0, 200, 10), np.array([1000, 2000, 3000, 4000]))
+        )
+        self.candidate_deviations = np.concatenate(
+            (np.linspace(0.21, 0.3, 20), np.array([0.7, 0.5, 0.6, 0.4]))
+        )
+
+    def test_linspace(self):
+        """Test that the default strategy keeps the evenly spaced selection (first and last candidates included)."""
+        selected_indexes = select_candidates(
+            self.candidate_indexes, self.candidate_deviations, 4
+        )
+        np.testing.assert_array_equal(selected_indexes, [0, 80, 150, 4000])
+
+    def test_all_strategies(self):
+        """Test that every strategy returns the requested number of distinct candidates, in increasing order."""
+        for strategy in [
+            "linspace",
+            "deviation_weighted",
+            "stratified",
+            "decorrelated",
+            "farthest_point",
+        ]:
+            with self.subTest(strategy=strategy):
+                selected_indexes = select_candidates(
+                    self.candidate_indexes,
+                    self.candidate_deviations,
+                    6,
+                    strategy,
+                    [1, 0, 1, 1],
+                )
+                self.assertEqual(selected_indexes.shape[0], 6)
+                self.assertTrue(np.all(np.diff(selected_indexes) > 0))
+                self.assertTrue(
+                    np.all(np.isin(selected_indexes, self.candidate_indexes))
+                )
+
+    def test_not_enough_candidates(self):
+        """Test that all the candidates are returned when there are not more than requested."""
+        for strategy in ["linspace", "farthest_point"]:
+            with self.subTest(strategy=strategy):
+                np.testing.assert_array_equal(
+                    select_candidates(
+                        self.candidate_indexes, self.candidate_deviations, 30, strategy
+                    ),
+                    self.candidate_indexes,
+                )
+        self.assertEqual(
+            select_candidates(
+                self.candidate_indexes, self.candidate_deviations, 0, "stratified"
+            ).shape[0],
+            0,
+        )
+
+    def test_deviation_weighted_seed(self):
+        """Test that the deviation-weighted draw only depends on the seed."""
+        first_selection = select_candidates(
+            self.candidate_indexes,
+            self.candidate_deviations,
+            5,
+            "deviation_weighted",
+            [3, 1, 2, 4],
+        )
+        second_selection = select_candidates(
+            self.candidate_indexes,
+            self.candidate_deviations,
+            5,
+            "deviation_weighted",
+            [3, 1, 2, 4],
+        )
+        np.testing.assert_array_equal(first_selection, second_selection)
+
+    def test_stratified(self):
+        """Test that the stratified selection takes frames in every deviation bin."""
+        selected_indexes = select_candidates(
+            self.candidate_indexes, self.candidate_deviations, 4, "stratified"
+        )
+        # One frame per bin (the burst of low deviations is a single bin)
+        np.testing.assert_array_equal(selected_indexes, [0, 1000, 2000, 4000])
+
+    def test_decorrelated(self):
+        """Test that the decorrelated selection spreads the frames in time."""
+        selected_indexes = select_candidates(
+            self.candidate_indexes, self.candidate_deviations, 5, "decorrelated"
+        )
+        np.testing.assert_array_equal(selected_indexes, [0, 1000, 2000, 3000, 4000])
+
+    def test_farthest_point(self):
+        """Test that the farthest-point selection starts from the highest deviation."""
+        selected_indexes = select_candidates(
+            self.candidate_indexes, self.candidate_deviations, 1, "farthest_point"
+        )
+        np.testing.assert_array_equal(selected_indexes, [1000])
+
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy raises a ValueError."""
+        with self.assertRaises(ValueError):
+            select_candidates(
+                self.candidate_indexes, self.candidate_deviations, 4, "random"
+            )
+
+
+class TestSelectSystemCandidates(unittest.TestCase):
+    """
+    Test case for the 'select_system_candidates' function.
+
+    Methods
+    -------
+    test_under_budget():
+        Test that all the candidates are kept when the system is not over budget.
+    test_proportional():
+        Test the proportional quotas.
+    test_fair():
+        Test that the fair quotas are capped by the candidates of each trajectory and sum to max_candidates.
+    test_max_spread():
+        Test that max_spread spans the whole deviation range of the system.
+    test_unknown_objective():
+        Test that an unknown objective raises a ValueError.
+    """
+
+    def setUp(self):
+        # 3 trajectories (the third one without candidates): 2 and 8 candidates
+        self.trajectory_ids = np.array([0, 0] + [1] * 8)
+        self.candidate_indexes = np.array([10, 20] + list(range(100, 180, 10)))
+        self.candidate_deviations = np.array(
+            [0.35, 0.40, 0.20, 0.21, 0.22, 0.23, 0.24, 0.25, 0.26, 0.60]
+        )
+
+    def select(self, max_candidates, allocation_objective):
+        """Run the function on the table of the test case."""
+        return select_system_candidates(
+            self.trajectory_ids,
+            self.candidate_indexes,
+            self.candidate_deviations,
+            3,
+            max_candidates,
+            allocation_objective,
+        )
+
+    def test_under_budget(self):
+        """Test that all the candidates are kept when the system is not over budget."""
+        is_selected, quotas = self.select(10, "fair")
+        self.assertTrue(np.all(is_selected))
+        np.testing.assert_array_equal(quotas, [-1, -1, -1])
+
+    def test_proportional(self):
+        """Test the proportional quotas."""
+        is_selected, quotas = self.select(5, "proportional")
+        np.testing.assert_array_equal(quotas, [1, 4, 0])
+        np.testing.assert_array_equal(
+            self.candidate_indexes[is_selected], [10, 100, 120, 150, 170]
+        )
+
+    def test_fair(self):
+        """Test that the fair quotas are capped by the candidates of each trajectory and sum to max_candidates."""
+        is_selected, quotas = self.select(7, "fair")
+        np.testing.assert_array_equal(quotas, [2, 5, 0])
+        self.assertEqual(np.count_nonzero(is_selected), 7)
+        self.assertTrue(np.all(is_selected[:2]))
+
+    def test_max_spread(self):
+        """Test that max_spread spans the whole deviation range of the system."""
+        is_selected, quotas = self.select(4, "max_spread")
+        self.assertEqual(np.count_nonzero(is_selected), 4)
+        self.assertEqual(quotas.sum(), 4)
+        self.assertTrue(is_selected[np.argmin(self.candidate_deviations)])
+        self.assertTrue(is_selected[np.argmax(self.candidate_deviations)])
+
+    def test_unknown_objective(self):
+        """Test that an unknown objective raises a ValueError."""
+        with self.assertRaises(ValueError):
+            self.select(4, "greedy")
+
+
+class TestComputeTrajectoryDeviation(unittest.TestCase):
+    """
+    Test case for the 'compute_trajectory_deviation' function.
+
+    Methods
+    -------
+    test_never_crossed():
+        Test the classification when sigma_high_limit is never crossed.
+    test_crossed():
+        Test that everything after the sigma_high_limit crossing is rejected.
+    test_skipped():
+        Test a trajectory skipped by the user.
+    test_no_files():
+        Test that nothing is written with write_files=False (the indexes are returned).
+    test_write_files_modes():
+        Test that the same statistics and indexes are returned with and without writing the JSON files.
+    test_previous_files():
+        Test that the JSON files of a previous run are only read with write_files=True.
+    """
+
+    def setUp(self):
+        # Create a temporary directory with a LAMMPS model_devi file (and work in it)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.local_path = Path(self.temp_dir.name)
+        os.chdir(self.local_path)
+        self.deviation = np.array([0.1, 0.3, 0.8, 0.15, 0.5, 0.2, 0.9])
+        model_deviation = np.zeros((self.deviation.shape[0], 7))
+        model_deviation[:, 0] = np.arange(self.deviation.shape[0]) * 10
+        model_deviation[:, 4] = self.deviation
+        np.savetxt(self.local_path / "model_devi.out", model_deviation, header="step")
+
+    def tearDown(self):
+        os.chdir(Path(__file__).parent)
+        self.temp_dir.cleanup()
+
+    def compute(self, sigma_high_limit, write_files=True):
+        """Run the function with a start row of 1 and 6 expected steps."""
+        return compute_trajectory_deviation(
+            self.local_path,
+            "lammps",
+            "model_devi.out",
+            "",
+            10,
+            1,
+            6,
+            0.2,
+            0.7,
+            sigma_high_limit,
+            False,
+            write_files=write_files,
+        )
+
+    def test_never_crossed(self):
+        """Test the classification when sigma_high_limit is never crossed."""
+        QbC_stats, is_skipped_user, is_skipped_stats, row_count, deviations, _ = (
+            self.compute(1.0)
+        )
+        self.assertFalse(is_skipped_user)
+        self.assertFalse(is_skipped_stats)
+        self.assertEqual(row_count, 6)
+        np.testing.assert_array_equal(deviations, [0.3, 0.5])
+        self.assertEqual(QbC_stats["total_count"], 6)
+        self.assertEqual(QbC_stats["good_count"], 2)
+        self.assertEqual(QbC_stats["candidates_count"], 2)
+        self.assertEqual(QbC_stats["rejected_count"], 2)
+        self.assertAlmostEqual(
+            QbC_stats["mean_deviation_max_f"], np.mean(self.deviation[1:])
+        )
+        with (self.local_path / "QbC_indexes.json").open() as f:
+            QbC_indexes = json.load(f)
+        self.assertEqual(QbC_indexes["good_indexes"], [30, 50])
+        self.assertEqual(QbC_indexes["candidate_indexes"], [10, 40])
+        self.assertEqual(QbC_indexes["rejected_indexes"], [20, 60])
+
+    def test_crossed(self):
+        """Test that everything after the sigma_high_limit crossing is rejected."""
+        QbC_stats, is_skipped_user, is_skipped_stats, row_count, deviations, _ = (
+            self.compute(0.8)
+        )
+        self.assertFalse(is_skipped_stats)
+        self.assertEqual(QbC_stats["good_count"], 0)
+        self.assertEqual(QbC_stats["candidates_count"], 1)
+        self.assertEqual(QbC_stats["rejected_count"], 5)
+        self.assertAlmostEqual(QbC_stats["median_deviation_max_f"], 0.3)
+
+    def test_skipped(self):
+        """Test a trajectory skipped by the user."""
+        (self.local_path / "skip").touch()
+        QbC_stats, is_skipped_user, is_skipped_stats, row_count, deviations, _ = (
+            self.compute(1.0)
+        )
+        self.assertTrue(is_skipped_user)
+        self.assertEqual(row_count, -1)
+        self.assertEqual(QbC_stats["rejected_count"], 6)
+        self.assertEqual(QbC_stats["mean_deviation_max_f"], 999.0)
+
+    def test_no_files(self):
+        """Test that nothing is written with write_files=False (the indexes are returned)."""
+        QbC_indexes = self.compute(1.0, write_files=False)[5]
+        self.assertEqual(QbC_indexes["candidate_indexes"], [10, 40])
+        self.assertFalse((self.local_path / "QbC_indexes.json").is_file())
+        self.assertFalse((self.local_path / "QbC_stats.json").is_file())
+
+    def test_write_files_modes(self):
+        """Test that the same statistics and indexes are returned with and without writing the JSON files."""
+        results_no_files = self.compute(1.0, write_files=False)
+        self.assertFalse((self.local_path / "QbC_stats.json").is_file())
+        results_files = self.compute(1.0, write_files=True)
+        self.assertEqual(results_no_files[0], results_files[0])
+        self.assertEqual(results_no_files[5], results_files[5])
+        self.assertEqual(results_no_files[1:4], results_files[1:4])
+        np.testing.assert_array_equal(results_no_files[4], results_files[4])
+        with (self.local_path / "QbC_stats.json").open() as f:
+            self.assertEqual(json.load(f), results_files[0])
+        with (self.local_path / "QbC_indexes.json").open() as f:
+            self.assertEqual(json.load(f), results_files[5])
+
+    def test_previous_files(self):
+        """Test that the JSON files of a previous run are only read with write_files=True."""
+        (self.local_path / "QbC_stats.json").write_text('{"selected_count": 3}')
+        (self.local_path / "QbC_indexes.json").write_text('{"stale_indexes": [1]}')
+        QbC_stats, _, _, _, _, QbC_indexes = self.compute(1.0, write_files=False)
+        self.assertNotIn("selected_count", QbC_stats)
+        self.assertNotIn("stale_indexes", QbC_indexes)
+        QbC_stats, _, _, _, _, QbC_indexes = self.compute(1.0)
+        self.assertEqual(QbC_stats["selected_count"], 3)
+        self.assertEqual(QbC_indexes["stale_indexes"], [1])
+
+
+class TestQbCStoreFile(unittest.TestCase):
+    """
+    Test case for the 'write_qbc_store_file' and 'load_qbc_store_file' functions.
+
+    Methods
+    -------
+    test_round_trip():
+        Test that the loaded data is the same as the written one (types, empty lists and missing statistics).
+    test_not_a_number():
+        Test that a statistic that is not a number raises a ValueError.
+    test_file_not_found():
+        Test that a missing store raises a FileNotFoundError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_path = Path(self.temp_dir.name) / "QbC_000.npz"
+        self.QbC_data = {
+            ("sysA", 1, 1): (
+                {"sigma_low": 0.2, "total_count": 10, "selection_factor": 1},
+                {"candidate_indexes": [10, 40], "selected_indexes": [40]},
+            ),
+            ("sysA", 2, 1): (
+                {"sigma_low": 0.2, "total_count": 12, "selection_factor": 0.5},
+                {"candidate_indexes": [], "selected_indexes": []},
+            ),
+            ("sysB", 1, 3): (
+                {"sigma_low": 0.3, "selection_factor": 0},
+                {"candidate_indexes": [7], "selected_indexes": [7]},
+            ),
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that the loaded data is the same as the written one (types, empty lists and missing statistics)."""
+        write_qbc_store_file(self.QbC_data, self.store_path)
+        QbC_data = load_qbc_store_file(self.store_path)
+        self.assertEqual(list(QbC_data.keys()), list(self.QbC_data.keys()))
+        for key, (QbC_stats, QbC_indexes) in self.QbC_data.items():
+            self.assertEqual(QbC_data[key][1], QbC_indexes)
+            self.assertEqual(QbC_data[key][0].keys(), QbC_stats.keys())
+            for stat_key, value in QbC_stats.items():
+                self.assertAlmostEqual(QbC_data[key][0][stat_key], value)
+        self.assertIsInstance(QbC_data[("sysA", 1, 1)][0]["total_count"], int)
+
+    def test_not_a_number(self):
+        """Test that a statistic that is not a number raises a ValueError."""
+        self.QbC_data[("sysA", 1, 1)][0]["sigma_low"] = "low"
+        with self.assertRaises(ValueError):
+            write_qbc_store_file(self.QbC_data, self.store_path)
+
+    def test_file_not_found(self):
+        """Test that a missing store raises a FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            load_qbc_store_file(self.store_path)
+
+
+class TestFindNewDuplicateCandidates(unittest.TestCase):
+    """
+    Test case for the 'find_new_duplicate_candidates' function.
+
+    Methods
+    -------
+    test_batches():
+        Test that the candidates given by batches are flagged as with all the candidates at once.
+    test_elements_mismatch():
+        Test that a batch with other elements than the kept candidates raises a ValueError.
+    """
+
+    def setUp(self):
+        rng = np.random.RandomState(3)
+        coordinates = rng.uniform(0.0, 10.0, (12, 3))
+        # 2 (translated 0) and 4 (translated 3) are duplicates
+        self.coordinates = np.array(
+            [
+                coordinates,
+                coordinates * 0.8,
+                np.mod(coordinates + 4.0, 10.0),
+                coordinates * 1.2,
+                np.mod(coordinates * 1.2 + 1.0, 10.0),
+            ]
+        )
+        self.symbols = np.array([["O", "H", "H"] * 4] * 5)
+        self.cell_lengths = np.full((5, 3), 10.0)
+
+    def test_batches(self):
+        """Test that the candidates given by batches are flagged as with all the candidates at once."""
+        is_duplicate, kept_fingerprints = find_new_duplicate_candidates(
+            self.symbols[:2], self.coordinates[:2], self.cell_lengths[:2], None, 0.01
+        )
+        self.assertEqual(is_duplicate.tolist(), [False, False])
+        is_duplicate, kept_fingerprints = find_new_duplicate_candidates(
+            self.symbols[2:],
+            self.coordinates[2:],
+            self.cell_lengths[2:],
+            kept_fingerprints,
+            0.01,
+        )
+        self.assertEqual(is_duplicate.tolist(), [True, False, True])
+        self.assertEqual(kept_fingerprints.shape[0], 3)
+        np.testing.assert_array_equal(
+            find_new_duplicate_candidates(
+                self.symbols, self.coordinates, self.cell_lengths, None, 0.01
+            )[0],
+            [False, False, True, False, True],
+        )
+
+    def test_elements_mismatch(self):
+        """Test that a batch with other elements than the kept candidates raises a ValueError."""
+        _, kept_fingerprints = find_new_duplicate_candidates(
+            self.symbols[:1], self.coordinates[:1], self.cell_lengths[:1], None, 0.01
+        )
+        with self.assertRaises(ValueError):
+            find_new_duplicate_candidates(
+                np.array([["O", "H", "C"] * 4]),
+                self.coordinates[:1],
+                self.cell_lengths[:1],
+                kept_fingerprints,
+                0.01,
+            )
+
+
+class TestExtractTrajectoryStructures(unittest.TestCase):
+    """
+    Test case for the 'extract_trajectory_structures' function.
+
+    Methods
+    -------
+    test_native():
+        Test the starting structure files and the candidates extracted from a LAMMPS DCD trajectory.
+    test_cell_lengths_file():
+        Test that the cell lengths of the candidates are read from the compact cell file.
+    test_topology_mismatch():
+        Test that a trajectory with a different number of atoms than the topology returns an error.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_path = Path(self.temp_dir.name)
+        self.coordinates = (
+            np.random.RandomState(3).uniform(0.0, 10.0, (10, 3, 3)).astype(np.float32)
+        )
+        write_dcd(self.work_path / "SYS_1_001.dcd", self.coordinates)
+        self.properties = {
+            "1": {"symbol": "O", "mass": 15.999},
+            "2": {"symbol": "H", "mass": 1.008},
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def extract(self, topology_symbols, disturbed_value):
+        # LAMMPS steps 6, 2 and 8 (printed every 2 steps) are the frames 3, 1 and 4
+        return extract_trajectory_structures(
+            self.work_path,
+            self.work_path / "SYS_1_001.dcd",
+            "lammps",
+            {"minimum_index": 6, "selected_count": 2},
+            {"selected_indexes": [2, 8]},
+            2,
+            [10.0, 10.0, 10.0],
+            "native",
+            topology_symbols,
+            self.work_path / "001_SYS_1_00001",
+            self.properties,
+            disturbed_value,
+            [],
+            disturbed_value,
+            [],
+            [42, 1, 0, 1, 1],
+        )
+
+    def test_native(self):
+        """Test the starting structure files and the candidates extracted from a LAMMPS DCD trajectory."""
+        results = self.extract(np.array(["O", "H", "H"]), 0.2)
+        self.assertIsNone(results["error"])
+        for suffix in ["", "_disturbed"]:
+            for extension in [".xyz", ".lmp"]:
+                self.assertTrue(
+                    (
+                        self.work_path / f"001_SYS_1_00001_00003{suffix}{extension}"
+                    ).is_file()
+                )
+        self.assertEqual(results["candidate_indexes"], [1, 4])
+        self.assertEqual(results["atomic_symbols"].shape, (2, 3))
+        np.testing.assert_allclose(
+            results["atomic_coordinates"], self.coordinates[[1, 4]], atol=1e-6
+        )
+        np.testing.assert_array_equal(results["cell_lengths"], np.full((2, 3), 10.0))
+        self.assertIn("Frame=4", results["comments"][1])
+        displacements = results["disturbed_coordinates"] - results["atomic_coordinates"]
+        self.assertTrue(np.all(np.abs(displacements) <= 0.2))
+        # Same seed, same displacements
+        np.testing.assert_array_equal(
+            results["disturbed_coordinates"],
+            self.extract(np.array(["O", "H", "H"]), 0.2)["disturbed_coordinates"],
+        )
+        self.assertIsNone(
+            self.extract(np.array(["O", "H", "H"]), 0)["disturbed_coordinates"]
+        )
+
+    def test_cell_lengths_file(self):
+        """Test that the cell lengths of the candidates are read from the compact cell file."""
+        np.save(
+            self.work_path / "cell_lengths.npy",
+            10.0 + np.arange(30, dtype=float).reshape(10, 3),
+        )
+        results = self.extract(np.array(["O", "H", "H"]), 0)
+        np.testing.assert_array_equal(
+            results["cell_lengths"], [[13.0, 14.0, 15.0], [22.0, 23.0, 24.0]]
+        )
+        self.assertTrue(results["comments"][0].startswith('Lattice="13.0 0.0000'))
+        np.save(self.work_path / "cell_lengths.npy", np.array([[12.0, 13.0, 14.0]]))
+        results = self.extract(np.array(["O", "H", "H"]), 0)
+        np.testing.assert_array_equal(
+            results["cell_lengths"], [[12.0, 13.0, 14.0], [12.0, 13.0, 14.0]]
+        )
+
+    def test_topology_mismatch(self):
+        """Test that a trajectory with a different number of atoms than the topology returns an error."""
+        results = self.extract(np.array(["O", "H"]), 0)
+        self.assertIn("SYS_1_001.dcd", results["error"])
+        self.assertEqual(results["candidate_indexes"], [])
+
+
+class TestDisturbAtomicCoordinates(unittest.TestCase):
+    """
+    Test case for the 'disturb_atomic_coordinates' function.
+
+    Methods
+    -------
+    test_all_atoms():
+        Test that all the atoms of all the frames are displaced within the bounds, reproducibly with a seed.
+    test_selected_atoms():
+        Test that only the selected (zero-based) atoms are displaced, and that an out of range index raises a ValueError.
+    """
+
+    def setUp(self):
+        self.coordinates = np.random.RandomState(5).uniform(0.0, 10.0, (4, 6, 3))
+
+    def test_all_atoms(self):
+        """Test that all the atoms of all the frames are displaced within the bounds, reproducibly with a seed."""
+        disturbed = disturb_atomic_coordinates(self.coordinates, 0.5, [], [7, 1, 0])
+        displacements = disturbed - self.coordinates
+        self.assertEqual(disturbed.shape, self.coordinates.shape)
+        self.assertTrue(np.all(np.abs(displacements) <= 0.5))
+        self.assertTrue(np.all(displacements != 0.0))
+        # Each frame gets its own displacements
+        self.assertFalse(np.allclose(displacements[0], displacements[1]))
+        np.testing.assert_array_equal(
+            disturbed,
+            disturb_atomic_coordinates(self.coordinates, 0.5, None, [7, 1, 0]),
+        )
+        self.assertFalse(
+            np.allclose(
+                disturbed,
+                disturb_atomic_coordinates(self.coordinates, 0.5, None, [7, 1, 1]),
+            )
+        )
+
+    def test_selected_atoms(self):
+        """Test that only the selected (zero-based) atoms are displaced, and that an out of range index raises a ValueError."""
+        disturbed = disturb_atomic_coordinates(self.coordinates, 0.5, [0, 3], 2)
+        moved = np.any(disturbed != self.coordinates, axis=(0, 2))
+        self.assertEqual(moved.tolist(), [True, False, False, True, False, False])
+        with self.assertRaises(ValueError):
+            disturb_atomic_coordinates(self.coordinates, 0.5, [6], 2)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,237 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the (labeling) utils module.
+
+Classes
+-------
+TestExtractLabelingStep():
+    Test case for the 'extract_labeling_step' function.
+
+TestGetLabelingStepSignature():
+    Test case for the 'get_labeling_step_signature' function.
+
+TestLabelingExtractManifest():
+    Test case for the 'write_labeling_extract_manifest' and 'load_labeling_extract_manifest' functions.
+"""
+
+# Standard library modules
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.labeling.utils import (
+    extract_labeling_step,
+    get_labeling_step_signature,
+    load_labeling_extract_manifest,
+    write_labeling_extract_manifest,
+)
+
+
+class TestExtractLabelingStep(unittest.TestCase):
+    """
+    Test case for the 'extract_labeling_step' function.
+
+    Methods
+    -------
+    test_cp2k():
+        Test the rows parsed from the outputs of a CP2K step, with the stress tensor and the Wannier centers.
+    test_cp2k_optional_files():
+        Test that the virial and the Wannier rows are None without their files.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.step_path = Path(self.temp_dir.name) / "00003"
+        self.step_path.mkdir()
+        (self.step_path / "labeling_00003.xyz").write_text(
+            "2\nFrame=3\nO 1.0 2.0 3.0\nH 4.0 5.0 6.0\n"
+        )
+        (self.step_path / "2_labeling_00003-Force_Eval.fe").write_text(
+            " ENERGY| Total FORCE_EVAL ( QS ) energy [a.u.]:   -2.000000000000\n"
+        )
+        (self.step_path / "1_labeling_00003.inp").write_text(
+            "&CELL\n  ABC 10.0 11.0 12.0\n  PERIODIC XYZ\n&END CELL\n"
+        )
+        (self.step_path / "2_labeling_00003-Forces.for").write_text(
+            "\n ATOMIC FORCES in [a.u.]\n\n # Atom   Kind   Element   X   Y   Z\n"
+            "  1  1  O  0.1  0.2  0.3\n  2  2  H  -0.1  -0.2  -0.3\n"
+            " SUM OF ATOMIC FORCES   0.0  0.0  0.0  0.0\n"
+        )
+        (self.step_path / "2_labeling_00003.out").write_text(
+            " CP2K| version string:          CP2K version 2023.1\n"
+            " LOCALIZATION! loop did not converge within the maximum number of iterations\n"
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def extract(self):
+        return extract_labeling_step(
+            self.step_path, "cp2k", 2023.1, 2, [10.0, 11.0, 12.0], 2.0, 3.0, 4.0
+        )
+
+    def test_cp2k(self):
+        """Test the rows parsed from the outputs of a CP2K step, with the stress tensor and the Wannier centers."""
+        (self.step_path / "2_labeling_00003-Stress_Tensor.st").write_text(
+            " STRESS|                        x                   y                   z\n"
+            " STRESS|      x   1.00000000E+00   0.00000000E+00   0.00000000E+00\n"
+            " STRESS|      y   0.00000000E+00   2.00000000E+00   0.00000000E+00\n"
+            " STRESS|      z   0.00000000E+00   0.00000000E+00   3.00000000E+00\n"
+        )
+        (self.step_path / "2_labeling_00003-Wannier.xyz").write_text(
+            "3\nWannier\nO 1.0 2.0 3.0\nH 4.0 5.0 6.0\nX 7.0 8.0 9.0\n"
+        )
+        results = self.extract()
+        self.assertEqual(results["energy"], -4.0)
+        np.testing.assert_array_equal(results["coord"], [1, 2, 3, 4, 5, 6])
+        np.testing.assert_array_equal(results["box"], [10, 0, 0, 0, 11, 0, 0, 0, 12])
+        self.assertEqual(results["volume"], 1320.0)
+        np.testing.assert_allclose(results["force"], [0.3, 0.6, 0.9, -0.3, -0.6, -0.9])
+        self.assertTrue(results["is_periodic"])
+        self.assertTrue(results["is_virial"])
+        np.testing.assert_allclose(results["virial"], [330, 0, 0, 0, 660, 0, 0, 0, 990])
+        np.testing.assert_array_equal(results["wannier"], [7, 8, 9])
+        self.assertTrue(results["is_wannier_not_converged"])
+
+    def test_cp2k_optional_files(self):
+        """Test that the virial and the Wannier rows are None without their files."""
+        results = self.extract()
+        self.assertIsNone(results["virial"])
+        self.assertIsNone(results["is_virial"])
+        self.assertIsNone(results["wannier"])
+        self.assertFalse(results["is_wannier_not_converged"])
+
+
+class TestGetLabelingStepSignature(unittest.TestCase):
+    """
+    Test case for the 'get_labeling_step_signature' function.
+
+    Methods
+    -------
+    test_changes():
+        Test that the signature changes when an output is modified or added, and only then.
+    """
+
+    def test_changes(self):
+        """Test that the signature changes when an output is modified or added, and only then."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            step_path = Path(temp_dir) / "00001"
+            step_path.mkdir()
+            forces_file = step_path / "2_labeling_00001-Forces.for"
+            forces_file.write_text("forces\n")
+            os.utime(forces_file, ns=(10**9, 10**9))
+            signature = get_labeling_step_signature(step_path, "cp2k")
+            self.assertEqual(signature, get_labeling_step_signature(step_path, "cp2k"))
+            (step_path / "2_labeling_00001-RESTART.wfn").write_text("not read\n")
+            self.assertEqual(signature, get_labeling_step_signature(step_path, "cp2k"))
+
+            forces_file.write_text("forces\n")
+            os.utime(forces_file, ns=(2 * 10**9, 2 * 10**9))
+            self.assertNotEqual(
+                signature, get_labeling_step_signature(step_path, "cp2k")
+            )
+            signature = get_labeling_step_signature(step_path, "cp2k")
+            (step_path / "2_labeling_00001-Stress_Tensor.st").write_text("stress\n")
+            self.assertNotEqual(
+                signature, get_labeling_step_signature(step_path, "cp2k")
+            )
+
+
+class TestLabelingExtractManifest(unittest.TestCase):
+    """
+    Test case for the 'write_labeling_extract_manifest' and 'load_labeling_extract_manifest' functions.
+
+    Methods
+    -------
+    test_round_trip():
+        Test that the rows of the steps (with and without virial and Wannier centers) are loaded as written.
+    test_other_key_or_missing():
+        Test that a manifest written with another key, or missing, is not used.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = Path(self.temp_dir.name) / "extract_manifest.npz"
+        self.steps_results = [
+            {
+                "energy": np.float64(-1.5),
+                "coord": np.array([1.0, 2.0, 3.0]),
+                "box": np.arange(9, dtype=np.float64),
+                "volume": np.float64(1000.0),
+                "force": np.array([0.1, 0.2, 0.3]),
+                "is_periodic": True,
+                "virial": np.arange(9, dtype=np.float64) * 2,
+                "is_virial": False,
+                "wannier": np.array([4.0, 5.0, 6.0, 7.0, 8.0, 9.0]),
+                "is_wannier_not_converged": True,
+            },
+            {
+                "energy": np.float64(-2.5),
+                "coord": np.array([3.0, 2.0, 1.0]),
+                "box": np.arange(9, dtype=np.float64) + 1,
+                "volume": np.float64(999.0),
+                "force": np.array([0.3, 0.2, 0.1]),
+                "is_periodic": False,
+                "virial": None,
+                "is_virial": None,
+                "wannier": None,
+                "is_wannier_not_converged": False,
+            },
+        ]
+        write_labeling_extract_manifest(
+            self.manifest_path,
+            "cp2k 2023.1 True 1",
+            ["00000", "00003"],
+            ["a", "b"],
+            self.steps_results,
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that the rows of the steps (with and without virial and Wannier centers) are loaded as written."""
+        cached_steps = load_labeling_extract_manifest(
+            self.manifest_path, "cp2k 2023.1 True 1"
+        )
+        self.assertEqual(list(cached_steps), ["00000", "00003"])
+        for (signature, step_results), expected_signature, expected_results in zip(
+            cached_steps.values(), ["a", "b"], self.steps_results
+        ):
+            self.assertEqual(signature, expected_signature)
+            self.assertEqual(sorted(step_results), sorted(expected_results))
+            for key, value in expected_results.items():
+                if value is None or isinstance(value, bool):
+                    self.assertEqual(step_results[key], value)
+                else:
+                    np.testing.assert_array_equal(step_results[key], value)
+
+    def test_other_key_or_missing(self):
+        """Test that a manifest written with another key, or missing, is not used."""
+        self.assertEqual(
+            load_labeling_extract_manifest(self.manifest_path, "cp2k 2024.1 True 1"),
+            {},
+        )
+        self.assertEqual(
+            load_labeling_extract_manifest(
+                self.manifest_path.with_name("missing.npz"), "cp2k 2023.1 True 1"
+            ),
+            {},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Test cases for the vmd module.
+
+Classes
+-------
+TestWriteVmdBatchScript():
+    Test case for the 'write_vmd_batch_script' function.
+
+TestReadVmdBatchResults():
+    Test case for the 'read_vmd_batch_results' function.
+
+TestRunVmdBatch():
+    Test case for the 'run_vmd_batch' function (with a Tcl interpreter standing in for VMD).
+"""
+
+# Standard library modules
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Local imports
+from arcann_training.common.list import textfile_to_string_list
+from arcann_training.common.vmd import (
+    read_vmd_batch_results,
+    run_vmd_batch,
+    write_vmd_batch_script,
+)
+
+
+class TestWriteVmdBatchScript(unittest.TestCase):
+    """
+    Test case for the 'write_vmd_batch_script' function.
+
+    Methods
+    -------
+    test_jobs():
+        Test the results file and the job lines of the driver script.
+    test_no_jobs_line():
+        Test that a template without the '_R_JOBS_' line raises a ValueError.
+    """
+
+    def setUp(self):
+        self.master_vmd_tcl = textfile_to_string_list(
+            Path(__file__).parents[1]
+            / "assets"
+            / "others"
+            / "vmd_dcd_selection_batch.tcl"
+        )
+
+    def test_jobs(self):
+        """Test the results file and the job lines of the driver script."""
+        jobs = [
+            {
+                "topology_file": Path("/a/SYS.pdb"),
+                "trajectory_file": Path("/a/SYS/1/00001/SYS_1_001.dcd"),
+                "outputs": [([3], Path("/a/min")), ([1, 20], Path("/a/candidates"))],
+            },
+            {
+                "topology_file": Path("/a/SYS.pdb"),
+                "trajectory_file": Path("/a/SYS/1/00002/SYS_1_001.dcd"),
+                "outputs": [([5], Path("/a/candidates"))],
+            },
+        ]
+        vmd_tcl = write_vmd_batch_script(self.master_vmd_tcl, jobs, Path("/a/results"))
+        self.assertIn("set results_file [open {/a/results} w]", vmd_tcl)
+        self.assertNotIn("_R_JOBS_", vmd_tcl)
+        self.assertIn(
+            "run_job $results_file 0 {/a/SYS.pdb} {/a/SYS/1/00001/SYS_1_001.dcd} {{3} {/a/min} {1 20} {/a/candidates}}",
+            vmd_tcl,
+        )
+        self.assertEqual(
+            vmd_tcl.index("close $results_file")
+            - vmd_tcl.index("set results_file [open {/a/results} w]"),
+            3,
+        )
+
+    def test_no_jobs_line(self):
+        """Test that a template without the '_R_JOBS_' line raises a ValueError."""
+        with self.assertRaises(ValueError):
+            write_vmd_batch_script(["quit"], [], Path("results"))
+
+
+class TestReadVmdBatchResults(unittest.TestCase):
+    """
+    Test case for the 'read_vmd_batch_results' function.
+
+    Methods
+    -------
+    test_results():
+        Test the parsing of successful, failed and missing jobs.
+    """
+
+    def test_results(self):
+        """Test the parsing of successful, failed and missing jobs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            results_file = Path(temp_dir) / "results"
+            results_file.write_text(
+                "1 ERROR Unable to load file traj.dcd\n0 OK 200 3\n"
+            )
+            results = read_vmd_batch_results(results_file, 3)
+            self.assertEqual(
+                results[0], {"status": "OK", "frame_count": 200, "written_count": 3}
+            )
+            self.assertEqual(
+                results[1],
+                {"status": "ERROR", "message": "Unable to load file traj.dcd"},
+            )
+            self.assertEqual(results[2]["status"], "MISSING")
+            self.assertEqual(
+                [
+                    _["status"]
+                    for _ in read_vmd_batch_results(results_file.parent / "x", 2)
+                ],
+                ["MISSING", "MISSING"],
+            )
+
+
+@unittest.skipIf(shutil.which("tclsh") is None, "No Tcl interpreter found.")
+class TestRunVmdBatch(unittest.TestCase):
+    """
+    Test case for the 'run_vmd_batch' function (with a Tcl interpreter standing in for VMD).
+
+    Methods
+    -------
+    test_pool():
+        Test that the XYZ files are written and the results returned in the order of the jobs, with several processes.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.work_path = Path(self.temp_dir.name)
+        self.master_vmd_tcl = textfile_to_string_list(
+            Path(__file__).parents[1]
+            / "assets"
+            / "others"
+            / "vmd_dcd_selection_batch.tcl"
+        )
+        # Minimal VMD commands: every trajectory has 10 frames, a missing trajectory cannot be loaded
+        (self.work_path / "fake_vmd.tcl").write_text(
+            "proc mol {command args} {\n"
+            "    if {$command eq {addfile} && ![file exists [lindex $args 0]]} {\n"
+            '        error "Unable to load file [lindex $args 0]"\n'
+            "    }\n"
+            "    return 0\n"
+            "}\n"
+            "proc molinfo {args} { return 10 }\n"
+            "proc animate {command args} {\n"
+            "    if {$command eq {write}} {\n"
+            "        set file [open [lindex $args 1] w]\n"
+            "        puts $file {1}\n"
+            "        close $file\n"
+            "    }\n"
+            "}\n"
+            "proc quit {} { exit 0 }\n"
+            "source [lindex $argv 1]\n"
+        )
+        self.vmd_bin = self.work_path / "vmd"
+        self.vmd_bin.write_text(
+            f'#!/bin/sh\nexec tclsh {self.work_path / "fake_vmd.tcl"} "$@"\n'
+        )
+        self.vmd_bin.chmod(0o755)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_pool(self):
+        """Test that the XYZ files are written and the results returned in the order of the jobs, with several processes."""
+        jobs = []
+        for job_index in range(5):
+            trajectory_file = self.work_path / f"traj_{job_index}.dcd"
+            if job_index != 3:
+                trajectory_file.touch()
+            jobs.append(
+                {
+                    "topology_file": self.work_path / "topo.pdb",
+                    "trajectory_file": trajectory_file,
+                    "outputs": [
+                        ([job_index, 9], self.work_path / f"candidates_{job_index}")
+                    ]
+                    + ([([12], self.work_path / "min")] if job_index == 4 else []),
+                }
+            )
+        results = run_vmd_batch(
+            str(self.vmd_bin), self.master_vmd_tcl, jobs, self.work_path, nb_jobs=2
+        )
+        self.assertEqual(
+            [_["status"] for _ in results], ["OK", "OK", "OK", "ERROR", "ERROR"]
+        )
+        self.assertEqual(results[0]["written_count"], 2)
+        self.assertIn("out of range", results[4]["message"])
+        self.assertTrue((self.work_path / "candidates_2_00002.xyz").is_file())
+        self.assertTrue((self.work_path / "candidates_2_00009.xyz").is_file())
+        self.assertEqual(list(self.work_path.glob("vmd_batch_*")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
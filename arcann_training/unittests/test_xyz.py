@@ -6,20 +6,343 @@
 #   SPDX-License-Identifier: AGPL-3.0-only                                                           #
 #----------------------------------------------------------------------------------------------------#
 Created: 2022/01/01
-Last modified: 2024/07/14
+Last modified: 2026/10/17
 
 Test cases for the xyz module.
 
 Classes:
 --------
+TestParseXyzTrajectoryFile():
+    Test case for the 'parse_xyz_trajectory_file' function.
+TestIndexXyzTrajectoryFile():
+    Test case for the 'index_xyz_trajectory_file' function.
+TestReadXyzFrames():
+    Test case for the 'read_xyz_frames' function.
+TestWriteXyzFrames():
+    Test case for the 'write_xyz_frames' function.
 """
 
 # TODO : Add test cases for the xyz module
 
 # Standard library modules
+import tempfile
 import unittest
+from pathlib import Path
 
 # Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.xyz import (
+    index_xyz_trajectory_file,
+    parse_xyz_trajectory_file,
+    read_xyz_frames,
+    write_xyz_frame,
+    write_xyz_frames,
+)
+
+
+class TestParseXyzTrajectoryFile(unittest.TestCase):
+    """
+    Test case for the 'parse_xyz_trajectory_file' function.
+
+    Methods
+    -------
+    test_extended():
+        Test the parsing of a trajectory in the extended XYZ format.
+    test_atom_count_not_constant():
+        Test that a varying number of atoms raises a ValueError.
+    test_atom_count_not_integer():
+        Test that a number of atoms that is not an integer raises a TypeError.
+    test_incorrect_atom_line():
+        Test that an atom line without three coordinates raises a ValueError.
+    test_incomplete_frame():
+        Test that a truncated last frame raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.xyz"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_extended(self):
+        """Test the parsing of a trajectory in the extended XYZ format."""
+        self.file_path.write_text(
+            "3\n"
+            'Lattice="10.0 0.0 0.0 0.0 10.0 0.0 0.0 0.0 12.0" Properties=species:S:1:pos:R:3 pbc="T T F" max_f_std=0.25\n'
+            "O 0.0 0.0 0.0\n"
+            "H 0.96 0.0 0.0\n"
+            "H -0.24 0.93 0.0\n"
+            "3\n"
+            "plain comment\n"
+            "O 0.0 0.0 1.0\n"
+            "H 0.96 0.0 1.0\n"
+            "H -0.24 0.93 1.0\n"
+        )
+        (
+            atom_counts,
+            atomic_symbols,
+            atomic_coordinates,
+            comments,
+            lattice_info,
+            pbc_info,
+            properties_info,
+            max_f_std_info,
+        ) = parse_xyz_trajectory_file(self.file_path)
+        np.testing.assert_array_equal(atom_counts, [3, 3])
+        np.testing.assert_array_equal(atomic_symbols, [["O", "H", "H"]] * 2)
+        self.assertEqual(atomic_coordinates.shape, (2, 3, 3))
+        self.assertAlmostEqual(atomic_coordinates[1, 2, 0], -0.24)
+        self.assertAlmostEqual(atomic_coordinates[1, 2, 2], 1.0)
+        self.assertEqual(comments[1], "plain comment")
+        np.testing.assert_array_equal(
+            lattice_info[0], [10.0, 0, 0, 0, 10.0, 0, 0, 0, 12.0]
+        )
+        self.assertIsNone(lattice_info[1])
+        self.assertEqual(pbc_info, [[True, True, False], None])
+        self.assertEqual(properties_info, [True, None])
+        self.assertEqual(max_f_std_info, [0.25, None])
+
+    def test_atom_count_not_constant(self):
+        """Test that a varying number of atoms raises a ValueError."""
+        self.file_path.write_text("1\n\nH 0 0 0\n2\n\nH 0 0 0\nH 0 0 1\n")
+        with self.assertRaises(ValueError):
+            parse_xyz_trajectory_file(self.file_path)
+
+    def test_atom_count_not_integer(self):
+        """Test that a number of atoms that is not an integer raises a TypeError."""
+        self.file_path.write_text("1\n\nH 0 0 0\nH 0 0 1\n\nH 0 0 0\n")
+        with self.assertRaises(TypeError):
+            parse_xyz_trajectory_file(self.file_path)
+
+    def test_incorrect_atom_line(self):
+        """Test that an atom line without three coordinates raises a ValueError."""
+        self.file_path.write_text("2\n\nH 0 0 0\nH 0 0\n")
+        with self.assertRaises(ValueError):
+            parse_xyz_trajectory_file(self.file_path)
+
+    def test_incomplete_frame(self):
+        """Test that a truncated last frame raises a ValueError."""
+        self.file_path.write_text("2\n\nH 0 0 0\nH 0 0 1\n2\n\nH 0 0 0\n")
+        with self.assertRaises(ValueError):
+            parse_xyz_trajectory_file(self.file_path)
+
+
+class TestIndexXyzTrajectoryFile(unittest.TestCase):
+    """
+    Test case for the 'index_xyz_trajectory_file' function.
+
+    Methods
+    -------
+    test_offsets():
+        Test the offsets of frames with different numbers of atoms (and no final line ending).
+    test_cache():
+        Test that the sidecar cache is written, used, and rebuilt when the file changes.
+    test_incomplete_frame():
+        Test that a truncated last frame raises a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.xyz"
+        self.cache_path = Path(self.temp_dir.name) / "traj.xyz.index.npy"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_offsets(self):
+        """Test the offsets of frames with different numbers of atoms (and no final line ending)."""
+        self.file_path.write_text("1\nc\nH 0 0 0\n2\n\nH 0 0 0\nH 0 0 1")
+        np.testing.assert_array_equal(
+            index_xyz_trajectory_file(self.file_path, use_cache=False), [0, 12, 30]
+        )
+        self.assertFalse(self.cache_path.is_file())
+
+    def test_cache(self):
+        """Test that the sidecar cache is written, used, and rebuilt when the file changes."""
+        self.file_path.write_text("1\nc\nH 0 0 0\n")
+        np.testing.assert_array_equal(
+            index_xyz_trajectory_file(self.file_path), [0, 12]
+        )
+        self.assertTrue(self.cache_path.is_file())
+        np.testing.assert_array_equal(
+            index_xyz_trajectory_file(self.file_path), [0, 12]
+        )
+        self.file_path.write_text("1\nc\nH 0 0 0\n1\nc\nH 0 0 1\n")
+        np.testing.assert_array_equal(
+            index_xyz_trajectory_file(self.file_path), [0, 12, 24]
+        )
+
+    def test_incomplete_frame(self):
+        """Test that a truncated last frame raises a ValueError."""
+        self.file_path.write_text("2\nc\nH 0 0 0\n")
+        with self.assertRaises(ValueError):
+            index_xyz_trajectory_file(self.file_path, use_cache=False)
+
+
+class TestReadXyzFrames(unittest.TestCase):
+    """
+    Test case for the 'read_xyz_frames' function.
+
+    Methods
+    -------
+    test_same_as_full_parsing():
+        Test that the selected frames are the same as with a parsing of the whole file.
+    test_out_of_range():
+        Test that a frame index out of range raises an IndexError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "traj.xyz"
+        self.file_path.write_text(
+            "".join(
+                f"2\nmax_f_std={0.1 * (_ + 1):.1f}\nO 0 0 {_}\nH 1 0 {_}\n"
+                for _ in range(6)
+            )
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_same_as_full_parsing(self):
+        """Test that the selected frames are the same as with a parsing of the whole file."""
+        frame_indexes = [4, 0, 5]
+        trajectory = parse_xyz_trajectory_file(self.file_path)
+        frames = read_xyz_frames(self.file_path, frame_indexes)
+        for full_array, frames_array in zip(trajectory[:3], frames[:3]):
+            np.testing.assert_array_equal(full_array[frame_indexes], frames_array)
+        for full_list, frames_list in zip(trajectory[3:], frames[3:]):
+            self.assertEqual([full_list[_] for _ in frame_indexes], frames_list)
+
+    def test_out_of_range(self):
+        """Test that a frame index out of range raises an IndexError."""
+        with self.assertRaises(IndexError):
+            read_xyz_frames(self.file_path, [6])
+
+
+class TestWriteXyzFrames(unittest.TestCase):
+    """
+    Test case for the 'write_xyz_frames' function.
+
+    Methods
+    -------
+    test_files_and_single_file():
+        Test that the per-frame files and the multi-frame file hold the same text as 'write_xyz_frame'.
+    test_lattice():
+        Test the comment line written from the cell information, and the round trip with the parser.
+    test_append():
+        Test that the frames are appended to an existing multi-frame file.
+    test_errors():
+        Test that a frame index out of range raises an IndexError and a wrong number of files a ValueError.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.local_path = Path(self.temp_dir.name)
+        self.atom_counts = np.array([2, 2, 2])
+        self.atomic_symbols = np.array([["O", "H"]] * 3)
+        self.atomic_coordinates = np.arange(18, dtype=float).reshape(3, 2, 3) / 7.0
+        self.comments = ["first", "second", "third"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_files_and_single_file(self):
+        """Test that the per-frame files and the multi-frame file hold the same text as 'write_xyz_frame'."""
+        frame_indexes = [2, 0]
+        frame_files = [self.local_path / f"frame_{_}.xyz" for _ in frame_indexes]
+        write_xyz_frames(
+            frame_files,
+            frame_indexes,
+            self.atom_counts,
+            self.atomic_symbols,
+            self.atomic_coordinates,
+            np.array([]),
+            self.comments,
+        )
+        write_xyz_frames(
+            self.local_path / "frames.xyz",
+            frame_indexes,
+            self.atom_counts,
+            self.atomic_symbols,
+            self.atomic_coordinates,
+            np.array([]),
+            self.comments,
+        )
+        texts = []
+        for frame_idx in frame_indexes:
+            write_xyz_frame(
+                self.local_path / "reference.xyz",
+                frame_idx,
+                self.atom_counts,
+                self.atomic_symbols,
+                self.atomic_coordinates,
+                np.array([]),
+                self.comments,
+            )
+            texts.append((self.local_path / "reference.xyz").read_text())
+        self.assertEqual(
+            texts[0],
+            "2\nthird\nO 1.714286 1.857143 2.000000\nH 2.142857 2.285714 2.428571\n",
+        )
+        self.assertEqual([_.read_text() for _ in frame_files], texts)
+        self.assertEqual((self.local_path / "frames.xyz").read_text(), "".join(texts))
+
+    def test_lattice(self):
+        """Test the comment line written from the cell information, and the round trip with the parser."""
+        cell_info = np.tile(np.diag([10.0, 11.0, 12.0]).ravel(), (3, 1))
+        write_xyz_frames(
+            self.local_path / "frames.xyz",
+            [0, 1, 2],
+            self.atom_counts,
+            self.atomic_symbols,
+            self.atomic_coordinates,
+            cell_info,
+            self.comments,
+        )
+        trajectory = parse_xyz_trajectory_file(self.local_path / "frames.xyz")
+        self.assertTrue(trajectory[3][1].startswith('Lattice="10.0 0.0 0.0 0.0 11.0'))
+        np.testing.assert_array_equal(trajectory[4][2], cell_info[2])
+        np.testing.assert_allclose(trajectory[2], self.atomic_coordinates, atol=1e-6)
+
+    def test_append(self):
+        """Test that the frames are appended to an existing multi-frame file."""
+        arrays = (self.atom_counts, self.atomic_symbols, self.atomic_coordinates)
+        write_xyz_frames(
+            self.local_path / "frames.xyz",
+            [0, 1, 2],
+            *arrays,
+            np.array([]),
+            self.comments,
+        )
+        for frame_indexes in [[0], [1, 2]]:
+            write_xyz_frames(
+                self.local_path / "appended.xyz",
+                frame_indexes,
+                *arrays,
+                np.array([]),
+                self.comments,
+                append=True,
+            )
+        self.assertEqual(
+            (self.local_path / "appended.xyz").read_text(),
+            (self.local_path / "frames.xyz").read_text(),
+        )
+
+    def test_errors(self):
+        """Test that a frame index out of range raises an IndexError and a wrong number of files a ValueError."""
+        arrays = (self.atom_counts, self.atomic_symbols, self.atomic_coordinates)
+        with self.assertRaises(IndexError):
+            write_xyz_frames(
+                self.local_path / "frames.xyz", [3], *arrays, np.array([]), []
+            )
+        with self.assertRaises(ValueError):
+            write_xyz_frames(
+                [self.local_path / "frame.xyz"], [0, 1], *arrays, np.array([]), []
+            )
 
 
 if __name__ == "__main__":
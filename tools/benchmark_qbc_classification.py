@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Micro-benchmark of the Query-by-Committee classification (exploration deviate phase).
+
+Compares the former boolean-mask classification (one mask per class on the 2-D model deviation array, then np.vstack of the rejected rows)
+with 'classify_deviation' on a synthetic trajectory, and checks that both give the same frames.
+
+Usage: python benchmark_qbc_classification.py [nb_frames] (default: 10000000)
+"""
+
+# Standard library modules
+import sys
+import time
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.exploration.utils import classify_deviation
+
+
+def legacy_classification(model_deviation, sigma_low, sigma_high, start, end):
+    window = model_deviation[start:end, :]
+    mean = np.mean(model_deviation[start:end, 4])
+    median = np.median(model_deviation[start:end, 4])
+    std = np.std(model_deviation[start:end, 4])
+    good = window[model_deviation[start:end, 4] <= sigma_low]
+    rejected = window[model_deviation[start:end, 4] >= sigma_high]
+    candidates = window[
+        (model_deviation[start:end, 4] > sigma_low)
+        & (model_deviation[start:end, 4] < sigma_high)
+    ]
+    rejected = np.vstack((rejected, model_deviation[end:, :]))
+    return (
+        good[:, 0].astype(int),
+        candidates[:, 0].astype(int),
+        rejected[:, 0].astype(int),
+        (mean, median, std),
+    )
+
+
+def best_of(func, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    nb_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    sigma_low, sigma_high = 0.2, 0.7
+    start, end = 100, nb_frames - nb_frames // 10
+
+    rng = np.random.default_rng(42)
+    model_deviation = np.zeros((nb_frames, 7))
+    model_deviation[:, 0] = np.arange(nb_frames) * 10
+    model_deviation[:, 4] = np.abs(rng.normal(0.3, 0.25, nb_frames))
+
+    legacy_time, legacy = best_of(
+        lambda: legacy_classification(
+            model_deviation, sigma_low, sigma_high, start, end
+        )
+    )
+    kernel_time, kernel = best_of(
+        lambda: classify_deviation(
+            model_deviation[:, 0],
+            model_deviation[:, 4],
+            sigma_low,
+            sigma_high,
+            start,
+            end,
+        )
+    )
+
+    for legacy_indexes, kernel_indexes in zip(legacy[:3], kernel[:3]):
+        assert np.array_equal(legacy_indexes, kernel_indexes)
+    assert legacy[3] == tuple(kernel[3].values())
+
+    print(f"Frames: {nb_frames}")
+    print(f"Boolean masks:       {legacy_time:8.3f} s")
+    print(f"classify_deviation:  {kernel_time:8.3f} s")
+    print(f"Speedup:             {legacy_time / kernel_time:8.2f}x")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+#----------------------------------------------------------------------------------------------------#
+#   ArcaNN: Automatic training of Reactive Chemical Architecture with Neural Networks                #
+#   Copyright 2022-2024 ArcaNN developers group <https://github.com/arcann-chem>                     #
+#                                                                                                    #
+#   SPDX-License-Identifier: AGPL-3.0-only                                                           #
+#----------------------------------------------------------------------------------------------------#
+Created: 2026/10/17
+Last modified: 2026/10/17
+
+Micro-benchmark of the XYZ frame writers (exploration extract and labeling prepare phases).
+
+Compares the former per-frame writer (one file per frame, one f-string per coordinate) with 'write_xyz_frames'
+(one file per frame, and one multi-frame file) on a synthetic trajectory, and checks that all give the same text.
+
+Usage: python benchmark_xyz_writer.py [nb_frames] [nb_atoms] (default: 10000 500)
+"""
+
+# Standard library modules
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Third-party modules
+import numpy as np
+
+# Local imports
+from arcann_training.common.xyz import write_xyz_frames
+
+
+def legacy_write_xyz_frame(
+    trajectory_file_path, frame_idx, atom_counts, atomic_symbols, atomic_coordinates
+):
+    with trajectory_file_path.open("w") as file:
+        file.write(f"{atom_counts[frame_idx]}\n")
+        file.write("\n")
+        for atom_index in range(atom_counts[frame_idx]):
+            symbol = atomic_symbols[frame_idx, atom_index]
+            coords = atomic_coordinates[frame_idx, atom_index]
+            coords_line = " ".join(f"{coord:.6f}" for coord in coords)
+            file.write(f"{symbol} {coords_line}\n")
+
+
+def timed(func):
+    start_time = time.perf_counter()
+    func()
+    return time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    nb_frames = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    nb_atoms = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    rng = np.random.default_rng(42)
+    atom_counts = np.full(nb_frames, nb_atoms)
+    atomic_symbols = np.resize(np.array(["O", "H", "H"], dtype="<U3"), nb_atoms)
+    atomic_symbols = np.tile(atomic_symbols, (nb_frames, 1))
+    atomic_coordinates = rng.uniform(-20.0, 20.0, (nb_frames, nb_atoms, 3))
+    comments = [""] * nb_frames
+    frame_indexes = list(range(nb_frames))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy_path = Path(temp_dir) / "legacy"
+        files_path = Path(temp_dir) / "files"
+        legacy_path.mkdir()
+        files_path.mkdir()
+        legacy_files = [legacy_path / f"{_:05d}.xyz" for _ in frame_indexes]
+        frame_files = [files_path / f"{_:05d}.xyz" for _ in frame_indexes]
+        single_file = Path(temp_dir) / "trajectory.xyz"
+
+        legacy_time = timed(
+            lambda: [
+                legacy_write_xyz_frame(
+                    legacy_files[_], _, atom_counts, atomic_symbols, atomic_coordinates
+                )
+                for _ in frame_indexes
+            ]
+        )
+        files_time = timed(
+            lambda: write_xyz_frames(
+                frame_files,
+                frame_indexes,
+                atom_counts,
+                atomic_symbols,
+                atomic_coordinates,
+                np.array([]),
+                comments,
+            )
+        )
+        single_time = timed(
+            lambda: write_xyz_frames(
+                single_file,
+                frame_indexes,
+                atom_counts,
+                atomic_symbols,
+                atomic_coordinates,
+                np.array([]),
+                comments,
+            )
+        )
+
+        legacy_text = "".join(_.read_text() for _ in legacy_files)
+        assert legacy_text == "".join(_.read_text() for _ in frame_files)
+        assert legacy_text == single_file.read_text()
+
+    print(f"Frames: {nb_frames}, atoms: {nb_atoms}")
+    print(f"Per-frame writer:              {legacy_time:8.3f} s")
+    print(f"write_xyz_frames (files):      {files_time:8.3f} s")
+    print(f"write_xyz_frames (one file):   {single_time:8.3f} s")
+    print(
+        f"Speedup (files / one file):    {legacy_time / files_time:8.2f}x / {legacy_time / single_time:.2f}x"
+    )